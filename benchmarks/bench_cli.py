@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the CLI hot paths, compared against saved baselines.
+
+    python benchmarks/bench_cli.py               # run and compare with baselines.json
+    python benchmarks/bench_cli.py -k user       # only benchmarks whose name contains 'user'
+    python benchmarks/bench_cli.py --save        # record the current numbers as the baselines
+
+Everything runs offline on synthetic data in a temporary directory
+(employee CSVs of 10 to 100k rows, a project config, a launch script) with
+a temporary LOGICLANCE_CACHE_DIR, so the user's caches are left alone. The
+flow graph benchmark resolves the repo's own configs/flow_setup.json.
+
+Each benchmark reports the median time per call over --repeat timeit
+rounds. A result more than --tolerance times its baseline is reported as a
+regression and makes the run exit 1. Baselines are machine dependent:
+re-save them on the machine that compares against them. Startup import
+time has its own budget check in bench_startup.py.
+"""
+import io
+import os
+import sys
+import json
+import timeit
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+FLOW_GUI = os.path.join(ROOT, "flow_gui")
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+CSV_ROWS = (10, 1000, 100000)
+CSV_HEADER = "name,email,password,linting,synthesis,lec,pnr,default_emails,team\n"
+# sha256("bench")
+PASSWORD_HASH = "1b32c28cb38c05480eccc1bd60ff97029b57a05c96718b96dad7e9d84894f549"
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register factory(workdir) -> callable under name; the factory does the setup."""
+    def register(factory):
+        BENCHMARKS.append((name, factory))
+        return factory
+    return register
+
+
+def write_employees(path, rows):
+    """Synthetic employees.csv with rows users (user000000, user000001, ...)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(CSV_HEADER)
+        for i in range(rows):
+            flags = ",".join("yes" if (i >> bit) & 1 else "no" for bit in range(4))
+            f.write(f"user{i:06d},user{i:06d}@example.com,{PASSWORD_HASH},{flags},,team{i % 10}\n")
+    return path
+
+
+def write_project(workdir):
+    """CONFIG_ROOT with a config.json whose Cadence tool has a launch script."""
+    config_root = os.path.join(workdir, "project")
+    os.makedirs(config_root, exist_ok=True)
+    launch = os.path.join(config_root, "cadence_launch.sh")
+    with open(launch, "w") as f:
+        f.write("export LM_LICENSE_FILE=5280@license-server\n")
+        f.write("export PATH=/opt/cadence/GENUS/bin:$PATH\n")
+        f.write("export CDS_LIC_ONLY=1\n")
+    with open(os.path.join(config_root, "config.json"), "w") as f:
+        json.dump({
+            "eda_tool": "cadence",
+            "tool_config": [{"tool": "Cadence", "launch_sh_path": launch}, {"tool": "Synopsys", "launch_sh_path": ""}],
+        }, f)
+    return config_root, launch
+
+
+def _user_lookup(rows):
+    def factory(workdir):
+        import main
+        config_root = os.path.join(workdir, f"users{rows}")
+        write_employees(os.path.join(config_root, "employees.csv"), rows)
+        os.environ["CONFIG_ROOT"] = config_root
+        last = f"user{rows - 1:06d}"
+        main.find_user_in_csv("bench", last)  # build the index once
+        return lambda: main.find_user_in_csv("bench", last)
+    return factory
+
+
+def _authenticate(rows):
+    def factory(workdir):
+        from utils.auth import authenticate_user
+        user_dir = os.path.join(workdir, f"auth{rows}")
+        write_employees(os.path.join(user_dir, "employee_details.csv"), rows)
+        # authenticate_user reads employee_details.csv from the working directory
+        os.chdir(user_dir)
+        last = f"user{rows - 1:06d}"
+        authenticate_user(last, "bench")
+        return lambda: authenticate_user(last, "bench")
+    return factory
+
+
+for _rows in CSV_ROWS:
+    benchmark(f"find_user_in_csv[{_rows}]")(_user_lookup(_rows))
+    benchmark(f"authenticate_user[{_rows}]")(_authenticate(_rows))
+
+
+@benchmark("find_user_index_build[100000]")
+def bench_index_build(workdir):
+    from utils.user_index import find_user
+    csv_path = write_employees(os.path.join(workdir, "rebuild", "employees.csv"), 100000)
+    mtime = [os.stat(csv_path).st_mtime_ns]
+
+    def rebuild():
+        # A new mtime invalidates the index, so every call pays for the rebuild
+        mtime[0] += 1000
+        os.utime(csv_path, ns=(mtime[0], mtime[0]))
+        find_user(csv_path, name="user099999")
+    return rebuild
+
+
+@benchmark("getEdaTool")
+def bench_get_eda_tool(workdir):
+    from cli import commands
+    os.environ["CONFIG_ROOT"], _ = write_project(workdir)
+    commands.session_eda_tool = None
+    return commands.getEdaTool
+
+
+@benchmark("setEdaTool")
+def bench_set_eda_tool(workdir):
+    from cli import commands
+    os.environ["CONFIG_ROOT"], _ = write_project(workdir)
+    return lambda: commands.setEdaTool("cadence")
+
+
+@benchmark("flow_graph[pnr]")
+def bench_flow_graph(workdir):
+    from utils.config_loader import get_flow_setup
+    from cli.flow_runner import build_stage_graph
+
+    def resolve():
+        flows = get_flow_setup(ROOT).flows
+        return build_stage_graph(flows, ["pnr"], "cadence", ROOT)
+    return resolve
+
+
+@benchmark("source_env_file[cached]")
+def bench_source_cached(workdir):
+    from cli.logiclance_terminal import source_env_file
+    _, launch = write_project(workdir)
+    env = dict(os.environ)
+
+    def source():
+        # Sourcing changes the environment, which is part of the cache key
+        os.environ.clear()
+        os.environ.update(env)
+        source_env_file(launch)
+    return source
+
+
+@benchmark("source_env_file[refresh]")
+def bench_source_refresh(workdir):
+    from cli.logiclance_terminal import source_env_file
+    _, launch = write_project(workdir)
+    return lambda: source_env_file(launch, refresh=True)
+
+
+@benchmark("dispatch[getEdaTool]")
+def bench_dispatch_get(workdir):
+    from cli import commands
+    from cli.logiclance_terminal import dispatch_command
+    os.environ["CONFIG_ROOT"], _ = write_project(workdir)
+    commands.session_eda_tool = None
+    return lambda: dispatch_command("getEdaTool", "bench")
+
+
+@benchmark("dispatch[setEdaTool cadence]")
+def bench_dispatch_set(workdir):
+    from cli.logiclance_terminal import dispatch_command
+    os.environ["CONFIG_ROOT"], _ = write_project(workdir)
+    return lambda: dispatch_command("setEdaTool cadence", "bench")
+
+
+def time_call(func, repeat):
+    """Median seconds per call over repeat rounds, each sized by timeit's autorange."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return statistics.median(total / number for total in timer.repeat(repeat=repeat, number=number))
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def load_baselines():
+    try:
+        with open(BASELINES, "r") as f:
+            return json.load(f).get("results", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baselines(results):
+    data = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(BASELINES, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def run(names, repeat):
+    """{name: seconds per call}; each benchmark gets a fresh environment and working directory."""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="logiclance-bench-")
+    saved_env, saved_cwd = dict(os.environ), os.getcwd()
+    try:
+        for name, factory in BENCHMARKS:
+            if name not in names:
+                continue
+            os.environ["LOGICLANCE_CACHE_DIR"] = os.path.join(workdir, "cache")
+            # The commands print status lines; only the numbers matter here
+            with contextlib.redirect_stdout(io.StringIO()):
+                func = factory(workdir)
+                results[name] = time_call(func, repeat)
+            os.environ.clear()
+            os.environ.update(saved_env)
+            os.chdir(saved_cwd)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the logiclance CLI hot paths.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timeit rounds per benchmark")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown vs baseline that counts as a regression")
+    parser.add_argument("--save", action="store_true", help="write the results to baselines.json")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, FLOW_GUI)
+    names = [name for name, _ in BENCHMARKS if args.pattern in name]
+    results = run(names, args.repeat)
+    baselines = load_baselines()
+
+    regressions = 0
+    print(f"{'Benchmark'.ljust(32)}{'Time'.rjust(12)}{'Baseline'.rjust(12)}{'Ratio'.rjust(8)}  Status")
+    print("-" * 76)
+    for name in names:
+        seconds = results[name]
+        baseline = baselines.get(name)
+        ratio = seconds / baseline if baseline else None
+        if ratio is None:
+            status = "new"
+        elif ratio > args.tolerance:
+            status = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 / args.tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        ratio_text = f"{ratio:.2f}x" if ratio else "-"
+        print(f"{name.ljust(32)}{format_time(seconds).rjust(12)}{format_time(baseline).rjust(12)}{ratio_text.rjust(8)}  {status}")
+
+    if args.save:
+        baselines.update(results)
+        save_baselines(baselines)
+        print(f"\n💾 Baselines saved to {BASELINES}")
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
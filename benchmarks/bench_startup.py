@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Startup time budget for the logiclance CLI.
+
+Each startup path runs in a fresh interpreter under `python -X importtime`.
+The import time of everything the path loads (interpreter startup excluded)
+is checked against its budget, and modules a path must not load at all are
+checked too, since that is how startup regressions usually creep in.
+
+    python benchmarks/bench_startup.py [--runs N] [--top N]
+
+Exits 1 when a path is over budget or imports a forbidden module.
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+FLOW_GUI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flow_gui")
+
+# name -> (python arguments, import budget in ms, modules it must not import)
+STARTUP_PATHS = {
+    # `logiclance` with missing arguments prints usage and nothing else
+    "usage": (["main.py"], 20, ("cli.commands", "cli.logiclance_terminal", "asyncio")),
+    # `logiclance run ...` up to the login: a bad token or project fails fast
+    "batch": (["-c", "import cli.main_cli"], 80, (
+        "asyncio", "cli.shell", "prompt_toolkit", "cli.commands",
+        "utils.config_loader", "utils.filelist", "utils.log_parser",
+    )),
+    # ... and after it, with the commands but not the interactive shell
+    "batch-run": (["-c", "import cli.main_cli, cli.logiclance_terminal"], 200,
+                  ("asyncio", "cli.shell", "prompt_toolkit")),
+    # The interactive shell, loaded while the password is typed
+    "shell": (["-c", "import cli.shell"], 250, ()),
+}
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] for the imports after interpreter startup."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), self_us, cumulative_us, depth))
+    # site is the last module the interpreter imports before running the code
+    starts = [i for i, entry in enumerate(entries) if entry[0] == "site" and entry[3] == 0]
+    return entries[starts[-1] + 1:] if starts else entries
+
+
+def measure(args, runs):
+    """(median import ms, entries of the last run) for one startup path."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("LOGICLANCE_ENV")}
+    totals = []
+    entries = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime"] + args,
+            cwd=FLOW_GUI,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        entries = parse_importtime(proc.stderr.decode(errors="replace"))
+        totals.append(sum(cumulative for _, _, cumulative, depth in entries if depth == 0) / 1000)
+    return statistics.median(totals), entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check logiclance startup import time against its budget.")
+    parser.add_argument("--runs", type=int, default=5, help="runs per path (median is reported)")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list per path")
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'Path'.ljust(10)}{'Import ms'.rjust(12)}{'Budget ms'.rjust(12)}  Status")
+    print("-" * 60)
+    for name, (python_args, budget, forbidden) in STARTUP_PATHS.items():
+        median, entries = measure(python_args, args.runs)
+        loaded = {module for module, _, _, _ in entries}
+        leaked = [module for module in forbidden if module in loaded]
+        ok = median <= budget and not leaked
+        failed |= not ok
+        print(f"{name.ljust(10)}{median:12.1f}{budget:12d}  {'ok' if ok else 'OVER BUDGET' if not leaked else 'FAIL'}")
+        for module in leaked:
+            print(f"{''.ljust(10)}imports {module}")
+        for module, self_us, _, _ in sorted(entries, key=lambda e: -e[1])[:args.top]:
+            print(f"{''.ljust(10)}{self_us / 1000:12.1f}  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import argparse
+from utils.executors import EXECUTORS
+
+
+def build_batch_parser():
+    parser = argparse.ArgumentParser(
+        prog="logiclance run",
+        description="Run flows and shell commands non-interactively (cron, regressions).",
+        epilog=(
+            "Authentication uses --token / $LOGICLANCE_TOKEN (issued with 'token new' in "
+            "the shell) or $LOGICLANCE_PASSWORD. Exit status: 0 success, "
+            "1 a command failed, 2 usage, project or login error."
+        ),
+    )
+    parser.add_argument("-p", "--project", required=True, help="Project name (e.g. axl)")
+    parser.add_argument("-u", "--user", required=True, help="User name or email from employees.csv")
+    parser.add_argument("--token", help="Batch token from 'token new' in the shell")
+    parser.add_argument(
+        "-c", "--commands", metavar="FILE",
+        help="File with one shell command per line ('-' reads stdin)",
+    )
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="Parallel stages for the flows given on the command line")
+    parser.add_argument("--top", metavar="TOP[,TOP...]",
+                        help="Top module(s) for the flows; several tops run in parallel")
+    parser.add_argument("--executor", choices=sorted(EXECUTORS),
+                        help="Where stages run (default: flow_setup.json executor.backend, else local)")
+    parser.add_argument("--force", action="store_true", help="Rerun stages even if up to date")
+    parser.add_argument("--no-preflight", action="store_true",
+                        help="Launch the tools without checking scripts and inputs first")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="Keep executing commands after one fails")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the whole run (pstats + folded stacks in LOG_PATH/profiles)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record timed spans of every step (JSONL and Chrome trace in LOG_PATH/traces)")
+    parser.add_argument("flows", nargs="*", help="Flows to run before the command file (e.g. synthesis lec)")
+    return parser
@@ -1,8 +1,401 @@
 import os
+import csv
 import json
-import subprocess
+import time
+from utils.config_loader import ConfigError, get_flow_setup, get_project_config
+from utils import auth
+from utils.executors import get_executor
+from utils.licenses import LicensePool
+from utils import tool_session
+from utils.filelist import EXCLUDE_DIRS, build_filelist
+from utils import liberty_index
+from utils import lef_index
+from utils.preflight import run_preflight
+from utils.techkit import load_techkit, techkit_path
+from utils.tool_discovery import TOOL_BINARY_MAP, discover_binaries, version_matches
+from utils.log_parser import parse_log_file
+from utils.process_runner import logs_root, terminal_input
+from utils import run_history
+from utils import env_manifest
+from utils.tracing import enable_tracing, span, trace_paths, tracing_enabled
+from .flow_runner import (
+    DEFAULT_MAX_WORKERS,
+    FlowScheduler,
+    build_stage_graph,
+    build_sweep_stages,
+    run_stage,
+)
+
+
+def _row(label, value):
+    """One "label: value" line of a report table."""
+    print(f"{str(label).ljust(20)}: {value}")
+
+
+def load_executor(name, logiclance_root):
+    """Executor named on the command line, else the one in flow_setup.json (default local)."""
+    try:
+        settings = get_flow_setup(logiclance_root).raw.get("executor", {})
+        return get_executor(name, settings)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return None
+
+
+def load_license_pool(logiclance_root):
+    """LicensePool for the "licenses" section of flow_setup.json (empty pool if none)."""
+    try:
+        return LicensePool(get_flow_setup(logiclance_root).raw.get("licenses", {}))
+    except (OSError, ValueError):
+        return LicensePool()
+
+
+def load_tool_manifest(eda_tool=None):
+    """Env manifest of the EDA tool's launch_sh_path in config.json (None when it has none)."""
+    eda_tool = eda_tool or getEdaTool()
+    try:
+        script = get_project_config().launch_script(eda_tool) if eda_tool else ""
+    except (OSError, ConfigError):
+        return None
+    if not script:
+        return None
+    try:
+        return env_manifest.load_manifest(script)
+    except OSError as e:
+        print(f"⚠️ Could not load launch script {script}: {e}")
+        return None
+
 
-def run_synthesis(script_flag=None, custom_script_path=None):
+def attach_tool_env(stages, eda_tool):
+    manifest = load_tool_manifest(eda_tool)
+    for stage in stages.values():
+        stage.manifest = manifest
+
+
+def open_session(binary, logiclance_root):
+    """Start (or reuse) this user's session for binary using the "sessions" section of flow_setup.json."""
+    try:
+        settings = get_flow_setup(logiclance_root).raw.get("sessions", {})
+    except (OSError, ValueError):
+        settings = {}
+    try:
+        return tool_session.start_session(
+            binary,
+            max_jobs=int(settings.get("max_jobs", tool_session.MAX_JOBS)),
+            command=settings.get("commands", {}).get(binary),
+            licenses=load_license_pool(logiclance_root),
+            env=env_manifest.apply_manifest(load_tool_manifest() or {}, dict(os.environ)),
+        )
+    except (OSError, tool_session.SessionError) as e:
+        print(f"❌ Could not start {binary} session: {e}")
+        return None
+
+
+def prepare_filelist(stages=None, verbose=False):
+    """Build the RTL filelist for RTL_PATH and export it as FILELIST, if one of stages reads it.
+
+    RTL_INCLUDE_PATH and RTL_EXCLUDE_DIRS are ':'-separated, RTL_DEFINES space-separated.
+    """
+    if stages is not None and not any(stage.filelist for stage in stages.values()):
+        return None
+    rtl_path = os.environ.get("RTL_PATH")
+    if not rtl_path or not os.path.exists(rtl_path):
+        if verbose:
+            print(f"❌ RTL_PATH not found: {rtl_path}")
+        return None
+
+    include_dirs = [d for d in os.environ.get("RTL_INCLUDE_PATH", "").split(os.pathsep) if d]
+    defines = os.environ.get("RTL_DEFINES", "").split()
+    exclude_dirs = os.environ.get("RTL_EXCLUDE_DIRS")
+    exclude_dirs = [d for d in exclude_dirs.split(os.pathsep) if d] if exclude_dirs is not None else EXCLUDE_DIRS
+    out_path = os.path.join(os.environ.get("OUTPUTS_PATH") or logs_root(), "filelist", "rtl.f")
+    start = time.time()
+    try:
+        with span("env.filelist", rtl_path=rtl_path) as s:
+            result = build_filelist(rtl_path, include_dirs, defines, out_path, exclude_dirs)
+            s.set(sources=len(result["sources"]), rescanned=result["stats"]["rescanned"])
+    except OSError as e:
+        print(f"⚠️ Could not build RTL filelist: {e}")
+        return None
+
+    for path, includes in result["missing_includes"].items():
+        print(f"⚠️ Unresolved include(s) in {path}: {', '.join(includes)}")
+    os.environ["FILELIST"] = out_path
+    if verbose:
+        stats = result["stats"]
+        print(f"\n📄 RTL filelist {out_path}")
+        print("-" * 60)
+        _row("Sources", len(result["sources"]))
+        _row("Headers", len(result["headers"]))
+        _row("Include dirs", len(result["incdirs"]))
+        _row("Scanned", f"{stats['files']} files in {stats['dirs']} dirs, {stats['rescanned']} re-read")
+        _row("Time", f"{time.time() - start:.2f} s")
+        print("-" * 60)
+    return result
+
+
+def prepare_corner_libs():
+    """Export MAX_LIB/MIN_LIB from the indexed libraries when LIB_PATH has no slow.lib/fast.lib."""
+    lib_path = os.environ.get("LIB_PATH")
+    if not lib_path or os.environ.get("MAX_LIB") or os.path.exists(os.path.join(lib_path, "slow.lib")):
+        return None
+    try:
+        with span("env.corner_libs", lib_path=lib_path):
+            picked = liberty_index.select_corner_libs(liberty_index.index_libraries(lib_path))
+    except OSError as e:
+        print(f"⚠️ Could not index libraries in {lib_path}: {e}")
+        return None
+    if "slow" in picked:
+        os.environ["MAX_LIB"] = picked["slow"]
+        os.environ.setdefault("MIN_LIB", picked.get("fast", picked["slow"]))
+        print(f"📚 Corner libraries   : {os.path.basename(os.environ['MAX_LIB'])} / {os.path.basename(os.environ['MIN_LIB'])}")
+    return picked
+
+
+def lib_info(cell=None, show_body=False):
+    """Without a cell, list the indexed libraries; with one, show it in every library."""
+    lib_path = os.environ.get("LIB_PATH")
+    if not lib_path or not os.path.isdir(lib_path):
+        print(f"❌ LIB_PATH not found: {lib_path}")
+        return False
+    start = time.time()
+    indexes = liberty_index.index_libraries(lib_path)
+    if not indexes:
+        print(f"❌ No .lib files in {lib_path}")
+        return False
+
+    if not cell:
+        print(f"\n📚 Libraries in {lib_path}")
+        print("-" * 60)
+        for index in indexes:
+            header = index["header"]
+            pvt = "/".join(header[k] for k in ("nom_process", "nom_voltage", "nom_temperature") if k in header)
+            name = os.path.basename(index["path"])
+            _row(name, f"{len(index['cells'])} cells, corner {index['corner'] or '?'} {pvt}")
+        _row("Time", f"{time.time() - start:.2f} s")
+        print("-" * 60)
+        return True
+
+    found = liberty_index.find_cell(indexes, cell)
+    if not found:
+        print(f"❌ Cell '{cell}' not found in {len(indexes)} librar{'y' if len(indexes) == 1 else 'ies'}")
+        return False
+    for index, info in found:
+        print(f"\n🔬 {cell} in {os.path.basename(index['path'])} ({index['library']})")
+        print("-" * 60)
+        _row("Area", info["area"])
+        _row("Dont use", info["dont_use"])
+        for pin, direction in info["pins"].items():
+            _row("pin " + pin, direction)
+        if show_body:
+            print(liberty_index.cell_text(index, cell))
+        print("-" * 60)
+    return True
+
+
+def lib_check():
+    """Validate the techkit's cell lists (tie, buffer, filler, dont-use, ...) against LIB_PATH."""
+    try:
+        techkit = load_techkit()
+    except OSError as e:
+        print(f"❌ Could not read techkit {techkit_path()}: {e}")
+        return False
+    indexes = liberty_index.index_libraries()
+    if not indexes:
+        print(f"❌ No .lib files in {os.environ.get('LIB_PATH')}")
+        return False
+    problems = liberty_index.validate_techkit(indexes, techkit)
+    for level, message in problems:
+        print(f"{'❌' if level == 'error' else '⚠️'} {message}")
+    cells = sum(len(index["cells"]) for index in indexes)
+    if not problems:
+        print(f"✅ Techkit cells match {cells} cells in {len(indexes)} librar{'y' if len(indexes) == 1 else 'ies'}")
+    return not any(level == "error" for level, _ in problems)
+
+
+def lef_info(macro=None):
+    """Without a macro, summarize the indexed LEFs; with one, show its size, site and pins."""
+    lef_path = os.environ.get("LEF_PATH")
+    if not lef_path or not os.path.isdir(lef_path):
+        print(f"❌ LEF_PATH not found: {lef_path}")
+        return False
+    start = time.time()
+    indexes = lef_index.index_lefs(lef_path)
+    if not indexes:
+        print(f"❌ No .lef files in {lef_path}")
+        return False
+
+    if not macro:
+        print(f"\n📐 LEFs in {lef_path}")
+        print("-" * 60)
+        for index in indexes:
+            name = os.path.basename(index["path"])
+            _row(name, f"{len(index['layers'])} layers, {len(index['sites'])} sites, {len(index['macros'])} macros")
+        _row("Time", f"{time.time() - start:.2f} s")
+        print("-" * 60)
+        return True
+
+    found = lef_index.find_macro(indexes, macro)
+    if not found:
+        print(f"❌ Macro '{macro}' not found in {len(indexes)} LEF file(s)")
+        return False
+    for index, info in found:
+        print(f"\n📐 {macro} in {os.path.basename(index['path'])}")
+        print("-" * 60)
+        size = f"{info['size'][0]} x {info['size'][1]} um" if info["size"] else "?"
+        _row("Class", info["class"])
+        _row("Size", size)
+        _row("Site", info["site"])
+        for pin, pin_info in info["pins"].items():
+            _row("pin " + pin, f"{pin_info['direction']} {pin_info['use'].lower()}")
+        print("-" * 60)
+    return True
+
+
+def check_physical_libs(verbose=False):
+    """Check LEF_PATH macros against LIB_PATH cells; passes when either directory has nothing indexed."""
+    try:
+        lib_indexes = liberty_index.index_libraries()
+        lef_indexes = lef_index.index_lefs()
+    except OSError as e:
+        print(f"⚠️ Could not index libraries/LEFs: {e}")
+        return True
+    if not any(index["cells"] for index in lib_indexes) or not any(index["macros"] for index in lef_indexes):
+        if verbose:
+            print("ℹ️  Nothing to compare: no cells under LIB_PATH or no macros under LEF_PATH")
+        return True
+
+    problems = lef_index.compare_with_libs(lef_indexes, lib_indexes)
+    errors = [message for level, message in problems if level == "error"]
+    for level, message in problems:
+        if level == "error" or verbose:
+            print(f"{'❌' if level == 'error' else '⚠️'} {message}")
+    if errors:
+        print(f"❌ {len(errors)} LEF/library mismatch(es); fix them before launching the tools.")
+    elif verbose:
+        macros = sum(len(index["macros"]) for index in lef_indexes)
+        print(f"✅ {macros} LEF macros match the library cells")
+    return not errors
+
+
+def expected_tool_versions():
+    """Map tool binary -> version declared in flow_setup.json."""
+    try:
+        flows = get_flow_setup().flows
+    except (OSError, ConfigError):
+        return {}
+    return {
+        info.tool: info.version
+        for flow in flows.values()
+        for info in flow.tools.values()
+    }
+
+
+def check_tool_installation(detect_versions=False):
+    print("\n🧪 Verifying EDA Tool Installations")
+    print("-" * 50)
+
+    CONFIG_ROOT = os.environ.get("CONFIG_ROOT")
+    if not CONFIG_ROOT:
+        print("❌ CONFIG_ROOT environment variable not set.")
+        return
+
+    try:
+        config = get_project_config(CONFIG_ROOT)
+    except FileNotFoundError as e:
+        print(f"❌ Config file not found at: {e.filename}")
+        return
+    except (OSError, ConfigError) as e:
+        print(f"❌ Error reading config.json: {e}")
+        return
+
+    try:
+        # 🔍 Collect tools from tool_config
+        configured_tools = config.configured_tools()
+
+        # 🧩 Add open-source tools manually to always check
+        configured_tools += ["yosys", "openlane", "openroad", "verilator"]
+        unique_tools = sorted(set(configured_tools))
+
+        all_binaries = sorted({b for t in unique_tools for b in TOOL_BINARY_MAP.get(t, [])})
+        found = discover_binaries(all_binaries, detect_versions=detect_versions)
+        expected = expected_tool_versions() if detect_versions else {}
+
+        for tool in unique_tools:
+            binaries = TOOL_BINARY_MAP.get(tool, [])
+            if not binaries:
+                print(f"⚠️ Unknown tool: {tool}")
+                continue
+
+            all_found = True
+            for bin_name in binaries:
+                if not found[bin_name]["path"]:
+                    print(f"❌ {tool.capitalize()} missing binary: '{bin_name}' (not in $PATH)")
+                    all_found = False
+                    continue
+
+                print(f"✅ {tool.capitalize()} binary '{bin_name}' found")
+                version = found[bin_name]["version"]
+                if bin_name not in expected:
+                    continue
+                if not version:
+                    print(f"⚠️ Could not detect {bin_name} version (flow_setup.json expects '{expected[bin_name]}')")
+                elif not version_matches(expected[bin_name], version):
+                    print(f"⚠️ {bin_name} version '{version}' does not match flow_setup.json '{expected[bin_name]}'")
+
+            if all_found:
+                print(f"🎯 {tool.capitalize()} is fully installed.\n")
+
+    except Exception as e:
+        print(f"❌ Error reading config.json: {e}")
+
+
+def top_available(tops):
+    """False (with a message) for a background job that would have to prompt for the top module."""
+    if tops or os.environ.get("DESIGN") or terminal_input.get():
+        return True
+    print("❌ top module required (-top): background jobs cannot prompt for it.")
+    return False
+
+
+def preflight_stages(stages, executor=None, verbose=False):
+    """Check every stage's inputs, scripts and tools at once; False when a run would fail."""
+    local = executor is None or executor.name == "local"
+    with span("preflight", stages=len(stages)) as s:
+        problems, elapsed = run_preflight(stages.values(), local=local)
+        s.set(problems=len(problems))
+    errors = [message for level, message in problems if level == "error"]
+    for level, message in problems:
+        print(f"{'❌' if level == 'error' else '⚠️'} {message}")
+    if errors:
+        print(f"❌ Preflight found {len(errors)} problem(s) in {elapsed:.2f} s; nothing was launched."
+              " Use -no_preflight to launch anyway.")
+    elif verbose or problems:
+        print(f"✅ Preflight passed for {len(stages)} stage(s) in {elapsed:.2f} s")
+    return not errors
+
+
+def preflight_command(flow_names=None, tops=None):
+    """Run the preflight checks for flows (default synthesis) without launching anything."""
+    LOGICLANCE_ROOT = os.environ.get("LOGICLANCE_ROOT")
+    eda_tool = getEdaTool()
+    if not LOGICLANCE_ROOT or not eda_tool:
+        print("❌ LOGICLANCE_ROOT or the EDA tool is not set.")
+        return False
+    prepare_corner_libs()
+    try:
+        flows = get_flow_setup(LOGICLANCE_ROOT).flows
+        stages = build_stage_graph(flows, flow_names or ["synthesis"], eda_tool.lower(), LOGICLANCE_ROOT, tops=tops)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not build flow graph: {e}")
+        return False
+    attach_tool_env(stages, eda_tool.lower())
+    prepare_filelist(stages)
+    return preflight_stages(stages, load_executor(None, LOGICLANCE_ROOT), verbose=True)
+
+
+def run_synthesis(script_flag=None, custom_script_path=None, force=False, tops=None, executor=None,
+                  session=False, resume=None, preflight=True):
     print("🚀 Running synthesis flow...")
 
     CONFIG_ROOT = os.environ.get("CONFIG_ROOT")
@@ -10,80 +403,446 @@ def run_synthesis(script_flag=None, custom_script_path=None):
 
     if not CONFIG_ROOT or not LOGICLANCE_ROOT:
         print("❌ CONFIG_ROOT or LOGICLANCE_ROOT environment variable not set.")
-        return
+        return False
 
     eda_tool = getEdaTool()
     if not eda_tool:
         print("❌ No EDA tool set in session or project config.")
-        return
+        return False
     eda_tool = eda_tool.lower()
+    if not top_available(tops):
+        return False
+    prepare_corner_libs()
 
-    # Determine script path
+    # Load tool and script from flow_setup.json
+    try:
+        flows = get_flow_setup(LOGICLANCE_ROOT).flows
+        stages = build_stage_graph(flows, ["synthesis"], eda_tool, LOGICLANCE_ROOT, tops=tops)
+    except (OSError, ValueError):
+        print(f"❌ Could not locate synthesis script for '{eda_tool}' in flow_setup.json.")
+        return False
+    attach_tool_env(stages, eda_tool)
+    prepare_filelist(stages)
+
+    # Use custom user-provided script
     if script_flag == "-f" and custom_script_path:
-        # Use custom user-provided script
-        script_path = os.path.abspath(custom_script_path)
-        if not os.path.exists(script_path):
-            print(f"❌ Provided script not found at: {script_path}")
-            return
+        custom_script_path = os.path.abspath(custom_script_path)
+        if not os.path.exists(custom_script_path):
+            print(f"❌ Provided script not found at: {custom_script_path}")
+            return False
+        for stage in stages.values():
+            stage.script = custom_script_path
+
+    executor = load_executor(executor, LOGICLANCE_ROOT)
+    if not executor:
+        return False
+
+    stage = next(iter(stages.values()))
+    print(f"🔧 Using EDA Tool      : {eda_tool}")
+    print(f"📂 Synthesis Script   : {stage.script}")
+    if tops:
+        print(f"🧩 Top module(s)      : {', '.join(tops)}")
+    if executor.name != "local":
+        print(f"🖥️  Executor           : {executor.name}")
+
+    if eda_tool == "cadence":
+        print(f"📜 Script execution order: {stage.env.get('order', '')}")
+    if resume:
+        if not stage.checkpoints:
+            print("❌ The synthesis flow does not declare checkpoints in flow_setup.json.")
+            return False
+        if not tops and not os.environ.get("DESIGN"):
+            print("❌ Resuming needs the top module: use -top <name> or set DESIGN.")
+            return False
+
+    for s in stages.values():
+        s.force = force
+        s.executor = executor
+        s.resume = resume
+
+    if session:
+        # The session reads its jobs from stdin, so scripts must not prompt for the top
+        if not tops and not os.environ.get("DESIGN"):
+            print("❌ Session runs need the top module: use -top <name> or set DESIGN.")
+            return False
+        tool = open_session(stage.binary, LOGICLANCE_ROOT)
+        if not tool:
+            return False
+        print(f"🔁 Using {stage.binary} session (pid {tool.proc.pid}, job {tool.jobs + 1}/{tool.max_jobs})")
+        for s in stages.values():
+            s.session = tool
+
+    if preflight and not preflight_stages(stages, executor):
+        return False
+
+    licenses = load_license_pool(LOGICLANCE_ROOT)
+
+    # Several tops: synthesize them side by side
+    if len(stages) > 1:
+        results = FlowScheduler(stages, max_workers=len(stages), executor=executor, licenses=licenses).run()
+        return all(status == "passed" for status in results.values())
+
+    # A session already holds its license
+    lease, queued = licenses.acquire(stage.binary) if not session else ([], 0)
+    if licenses.features_for(stage.binary) and not session:
+        stage.queue_seconds = round(queued, 3)
+    try:
+        returncode = run_stage(stage)
+    finally:
+        licenses.release(lease)
+    if stage.up_to_date:
+        print("⏩ Synthesis is up to date (inputs, scripts and tool unchanged). Use -force to rerun.")
+    elif returncode == 0:
+        print(f"✅ Synthesis completed. Log: {stage.log_path}")
     else:
-        # Load script from flow_setup.json
-        flow_setup_path = os.path.join(LOGICLANCE_ROOT, "configs", "flow_setup.json")
-        try:
-            with open(flow_setup_path, "r") as f:
-                flow_config = json.load(f)
-            synthesis_tool_info = flow_config["flows"]["synthesis"]["tools"][eda_tool]
-            script_path = os.path.join(LOGICLANCE_ROOT, synthesis_tool_info["script"])
-        except (FileNotFoundError, KeyError):
-            print(f"❌ Could not locate synthesis script for '{eda_tool}' in flow_setup.json.")
-            return
+        print(f"❌ Synthesis failed with exit code {returncode}." + (f" Log: {stage.log_path}" if stage.log_path else ""))
+    return returncode == 0
 
-    
-        print(f"🔧 Using EDA Tool      : {eda_tool}")
-        print(f"📂 Synthesis Script   : {script_path}")
 
-        # Set 'order' if cadence tool is used
-        if eda_tool == "cadence":
-            synthesis_order = flow_config["flows"]["synthesis"].get("order", [])
-            os.environ["order"] = ",".join(synthesis_order)
-            print(f"📜 Script execution order: {os.environ['order']}")
+def run_flow(flow_names, max_workers=DEFAULT_MAX_WORKERS, with_deps=True, force=False, tops=None,
+             executor=None, preflight=True):
+    LOGICLANCE_ROOT = os.environ.get("LOGICLANCE_ROOT")
+    if not LOGICLANCE_ROOT:
+        print("❌ LOGICLANCE_ROOT environment variable not set.")
+        return False
 
+    eda_tool = getEdaTool()
+    if not eda_tool:
+        print("❌ No EDA tool set in session or project config.")
+        return False
+    if not top_available(tops):
+        return False
 
-        try:
-            if eda_tool == "cadence":
-                cmd = f"genus -f {script_path}"
-            elif eda_tool == "openlane":
-                cmd = f"yosys {script_path}"
-            elif eda_tool == "synopsys":
-                cmd = f"dc_shell -f {script_path}"
-            else:
-                print(f"❌ Unsupported EDA tool: {eda_tool}")
-                return
+    prepare_corner_libs()
+    try:
+        flows = get_flow_setup(LOGICLANCE_ROOT).flows
+        stages = build_stage_graph(
+            flows, flow_names, eda_tool.lower(), LOGICLANCE_ROOT, with_deps, tops=tops
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not build flow graph: {e}")
+        return False
+    attach_tool_env(stages, eda_tool.lower())
+    prepare_filelist(stages)
+
+    executor = load_executor(executor, LOGICLANCE_ROOT)
+    if not executor:
+        return False
+
+    if preflight and not preflight_stages(stages, executor):
+        return False
+
+    for stage in stages.values():
+        stage.force = force
+
+    print(f"🧭 Flow plan ({max_workers} workers, {executor.name}): {' -> '.join(stages)}")
+    results = FlowScheduler(
+        stages, max_workers=max_workers, executor=executor, licenses=load_license_pool(LOGICLANCE_ROOT)
+    ).run()
+
+    print("\n📋 Flow summary")
+    print("-" * 60)
+    for name, stage in stages.items():
+        status = "up to date" if stage.up_to_date else stage.status
+        if stage.queue_seconds:
+            status += f" (queued {stage.queue_seconds:.1f} s for license)"
+        _row(name, status)
+    print("-" * 60)
+    return all(status == "passed" for status in results.values())
 
-            subprocess.run(cmd, shell=True, check=True, executable="/bin/bash")
-            print("✅ Synthesis completed.")
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Synthesis failed with error: {e}")
 
 
+def token_command(action):
+    """token new|revoke: the logged-in user's token for 'logiclance run' (batch mode)."""
+    username = os.environ.get("LOGICLANCE_USER")
+    if not username or not os.environ.get("CONFIG_ROOT"):
+        print("❌ Not logged in to a project.")
+        return False
+    try:
+        if action == "new":
+            token = auth.issue_token(username)
+            print(f"🔑 Batch token for {username} (shown only once; any older token stops working):")
+            print(f"   export LOGICLANCE_TOKEN={token}")
+            return True
+        if action == "revoke":
+            print(f"🗑️  Batch token of {username} revoked" if auth.revoke_token(username)
+                  else f"ℹ️  {username} has no batch token")
+            return True
+    except OSError as e:
+        print(f"❌ Could not update {auth.token_path()}: {e}")
+        return False
+    print("❌ Usage: token new|revoke")
+    return False
+
+
+def trace_command(action="status"):
+    """Turn span tracing on or off for this shell and show where the spans go."""
+    if action in ("on", "off"):
+        enable_tracing(action == "on")
+    elif action != "status":
+        print("❌ Usage: trace [on|off]")
+        return False
+    jsonl_path, chrome_path = trace_paths()
+    print(f"🧭 Tracing {'on' if tracing_enabled() else 'off'}")
+    print(f"📄 Spans        : {jsonl_path}")
+    print(f"📊 Chrome trace : {chrome_path}  (chrome://tracing, ui.perfetto.dev)")
+    return True
+
+
+def session_command(action="status", binary=None, script=None):
+    """session start|stop|status [tool], session run <script> [tool]."""
+    LOGICLANCE_ROOT = os.environ.get("LOGICLANCE_ROOT")
+    if not binary:
+        # Default to the synthesis tool of the current EDA tool (genus, yosys)
+        try:
+            flows = get_flow_setup(LOGICLANCE_ROOT).flows
+            binary = flows["synthesis"].tools[(getEdaTool() or "").lower()].tool
+        except (KeyError, OSError, ValueError):
+            print("❌ No synthesis tool for the current EDA tool; pass one, e.g. 'session start genus'.")
+            return False
+
+    if action == "start":
+        return open_session(binary, LOGICLANCE_ROOT) is not None
+    if action == "stop":
+        if tool_session.stop_session(binary):
+            print(f"🛑 {binary} session stopped")
+            return True
+        print(f"⚠️ No {binary} session running")
+        return False
+    if action == "run":
+        if not script or not os.path.isfile(script):
+            print(f"❌ Script not found: {script}")
+            return False
+        tool = tool_session.get_session(binary) or open_session(binary, LOGICLANCE_ROOT)
+        if not tool:
+            return False
+        name = os.path.splitext(os.path.basename(script))[0]
+        log_path = os.path.join(logs_root(), "sessions", f"{name}.log")
+        start = time.time()
+        try:
+            returncode = tool.run_script(script, log_path, dict(os.environ))
+        except tool_session.SessionError as e:
+            print(f"❌ {e}")
+            return False
+        icon = "✅" if returncode == 0 else "❌"
+        print(f"{icon} {script} finished in {time.time() - start:.1f} s (exit code {returncode}), log: {log_path}")
+        return returncode == 0
+    if action == "status":
+        sessions = tool_session.list_sessions()
+        if not sessions:
+            print("ℹ️  No tool sessions running")
+        for info in sessions:
+            state = f"pid {info['pid']}, up {info['uptime_seconds']} s" if info["alive"] else "dead"
+            print(f"🔁 {info['binary'].ljust(10)}: {state}, {info['jobs']}/{info['max_jobs']} jobs")
+        return True
+
+    print("❌ Usage: session start|stop|status [tool] | session run <script> [tool]")
+    return False
+
+
+SWEEP_COLUMNS = ("wns", "tns", "area", "leakage_power", "cells")
+
+
+def run_sweep(flow_name, max_workers=DEFAULT_MAX_WORKERS, force=False, tops=None, executor=None,
+              preflight=True):
+    """Run every point of the flow's sweep matrix in parallel and compare their QoR."""
+    LOGICLANCE_ROOT = os.environ.get("LOGICLANCE_ROOT")
+    if not LOGICLANCE_ROOT:
+        print("❌ LOGICLANCE_ROOT environment variable not set.")
+        return False
+
+    eda_tool = getEdaTool()
+    if not eda_tool:
+        print("❌ No EDA tool set in session or project config.")
+        return False
+    if not top_available(tops):
+        return False
+
+    prepare_corner_libs()
+    try:
+        flows = get_flow_setup(LOGICLANCE_ROOT).flows
+        if flow_name not in flows:
+            raise ValueError(f"Unknown flow '{flow_name}' in flow_setup.json")
+        matrix = flows[flow_name].raw.get("sweep")
+        if not matrix:
+            raise ValueError(f"Flow '{flow_name}' has no sweep matrix in flow_setup.json")
+        stages = build_sweep_stages(flows, flow_name, eda_tool.lower(), LOGICLANCE_ROOT, matrix, tops)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not build sweep: {e}")
+        return False
+    attach_tool_env(stages, eda_tool.lower())
+    prepare_filelist(stages)
+
+    executor = load_executor(executor, LOGICLANCE_ROOT)
+    if not executor:
+        return False
+
+    if preflight and not preflight_stages(stages, executor):
+        return False
+
+    for stage in stages.values():
+        stage.force = force
+
+    print(f"🧪 Sweep of {flow_name}: {len(stages)} points over {', '.join(matrix)} ({max_workers} workers)")
+    results = FlowScheduler(
+        stages, max_workers=max_workers, executor=executor, licenses=load_license_pool(LOGICLANCE_ROOT)
+    ).run()
+
+    rows = []
+    for name, stage in stages.items():
+        metrics = stage.metrics or latest_metrics(name)[1] or {}
+        qor = metrics.get("qor", {})
+        rows.append(
+            [name, "up to date" if stage.up_to_date else stage.status,
+             stage.duration, metrics.get("peak_memory_mb")]
+            + [qor.get(key) for key in SWEEP_COLUMNS]
+        )
+
+    header = ["stage", "status", "runtime_s", "peak_mem_mb"] + list(SWEEP_COLUMNS)
+    cell = lambda v: "-" if v is None else str(v)
+    widths = [max(len(header[i]), *(len(cell(r[i])) for r in rows)) for i in range(len(header))]
+    print(f"\n📊 Sweep results ({flow_name})")
+    print("-" * (sum(widths) + 2 * len(widths)))
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(cell(v).ljust(w) for v, w in zip(row, widths)))
+    print("-" * (sum(widths) + 2 * len(widths)))
+
+    reports_root = os.environ.get("REPORTS_PATH") or logs_root()
+    csv_path = os.path.join(reports_root, "sweep", f"{flow_name}_sweep.csv")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    print(f"📝 Comparison table written to {csv_path}")
+    return all(status == "passed" for status in results.values())
+
+
+def latest_metrics(stage_name):
+    """Return (path, metrics) of the stage's most recent recorded run, or (None, None)."""
+    metrics_dir = os.path.join(logs_root(), stage_name, "metrics")
+    runs = sorted(os.listdir(metrics_dir)) if os.path.isdir(metrics_dir) else []
+    if not runs:
+        return None, None
+    path = os.path.join(metrics_dir, runs[-1])
+    with open(path, "r") as f:
+        return path, json.load(f)["metrics"]
+
+
+def show_metrics(target):
+    """Print parsed metrics for a stage's latest run, or for any tool log file."""
+    if os.path.isfile(target):
+        metrics = parse_log_file(target)
+        source = target
+    else:
+        source, metrics = latest_metrics(target)
+        if not metrics:
+            print(f"❌ No metrics recorded for '{target}' under {os.path.join(logs_root(), target, 'metrics')}")
+            return False
+
+    print(f"\n📈 Metrics from {source}")
+    print("-" * 60)
+    startup = sum(metrics["startup_seconds"].values())
+    if startup:
+        _row("Tool startup", f"{startup} s")
+    license_info = metrics["license"]
+    if "feature" in license_info:
+        _row("License", f"{license_info['feature']} (wait {license_info.get('wait_seconds', '?')} s)")
+    if "queue_seconds" in license_info:
+        _row("License queue", f"{license_info['queue_seconds']} s before launch")
+    for step, values in metrics["steps"].items():
+        fields = ", ".join(f"{k}={v}" for k, v in values.items())
+        _row(step, fields)
+    if metrics["peak_memory_mb"] is not None:
+        _row("Peak memory", f"{metrics['peak_memory_mb']} MB")
+    for key, value in metrics["qor"].items():
+        _row(key, value)
+    print("-" * 60)
+    return True
+
+
+def show_history(query="recent", flow=None):
+    """Query the run history: recent, slowest, stats or regressions."""
+    if query not in ("recent", "slowest", "stats", "regressions"):
+        print("❌ Usage: history [recent|slowest|stats|regressions] [flow]")
+        return False
+
+    path = run_history.history_path()
+    if not os.path.exists(path):
+        print(f"❌ No run history yet at {path}")
+        return False
+
+    fmt = lambda secs: "-" if secs is None else f"{secs:.1f}s"
+    print(f"\n🗂️  Run history ({query}) from {path}")
+    print("-" * 80)
+    if query == "recent":
+        for run_id, flow_name, tool, user, host, start, duration, status in run_history.recent_runs(path, flow):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(start))
+            print(f"{when}  {flow_name.ljust(16)} {tool.ljust(10)} {status.ljust(7)} {fmt(duration).rjust(9)}  {user}@{host}")
+    elif query == "slowest":
+        print(f"{'flow'.ljust(16)} {'step'.ljust(24)} {'runs'.rjust(5)} {'p50'.rjust(9)} {'p95'.rjust(9)}")
+        for flow_name, step, count, p50, p95 in run_history.slowest_steps(path, flow):
+            print(f"{flow_name.ljust(16)} {step.ljust(24)} {str(count).rjust(5)} {fmt(p50).rjust(9)} {fmt(p95).rjust(9)}")
+    elif query == "stats":
+        print(f"{'flow'.ljust(16)} {'tool'.ljust(10)} {'runs'.rjust(5)} {'p50'.rjust(9)} {'p95'.rjust(9)} {'max'.rjust(9)}")
+        for flow_name, tool, count, p50, p95, longest in run_history.runtime_stats(path, flow):
+            print(f"{flow_name.ljust(16)} {tool.ljust(10)} {str(count).rjust(5)} {fmt(p50).rjust(9)} {fmt(p95).rjust(9)} {fmt(longest).rjust(9)}")
+    elif query == "regressions":
+        found = run_history.regressions(path)
+        if not found:
+            print("✅ No runtime regressions after script changes.")
+        for flow_name, old_hash, new_hash, before, after, ratio in found:
+            print(f"⚠️ {flow_name}: scripts {old_hash} -> {new_hash} median {fmt(before)} -> {fmt(after)} (x{ratio:.2f})")
+    print("-" * 80)
+    return True
+
+
+COMMAND_HELP = {
+    "run_synthesis [-f script] [-top a,b] [-force] [-no_preflight] [-resume [generic|map|auto]] [-session] [-executor local|lsf|slurm]": "Run synthesis flow (skipped when nothing changed).",
+    "run_flow <flows> [-top a,b] [-j N] [-only] [-force] [-no_preflight] [-executor local|lsf|slurm]": "Run flows and their dependencies in parallel (e.g., pnr).",
+    "run_sweep <flow> [-top a,b] [-j N] [-force] [-no_preflight] [-executor name]": "Run the flow's sweep matrix and compare QoR.",
+    "session start|stop|status [tool]": "Keep a genus/yosys process alive between runs (opt-in).",
+    "session run <script> [tool]": "Source a script in the running tool session.",
+    "filelist": "Build the RTL filelist (.f) from RTL_PATH and show what it found.",
+    "lib_info [cell] [-body]": "List the indexed .lib files, or show a cell's area and pins.",
+    "lib_check": "Check the techkit cell lists (tie, buffer, dont-use, ...) against the libraries.",
+    "profile <command>": "Run a command under cProfile and a stack sampler (output in LOG_PATH/profiles).",
+    "token new|revoke": "Issue (or revoke) your token for 'logiclance run' batch logins.",
+    "trace [on|off]": "Record timed spans of every step (JSONL and Chrome trace in LOG_PATH/traces).",
+    "check_tools [-versions]": "Verify the configured EDA tool binaries (and versions) on PATH.",
+    "preflight [flows] [-top a,b]": "Check scripts, inputs, libraries, LEFs and tools without launching.",
+    "lef_info [macro]": "List the indexed .lef files, or show a macro's size, site and pins.",
+    "lef_check": "Check that every library cell has a matching LEF macro.",
+    "metrics <stage|log_file>": "Show runtime, memory, license and QoR metrics.",
+    "history [recent|slowest|stats|regressions] [flow]": "Query past runs and p50/p95 runtimes.",
+    "source <file.sh> [-refresh]": "Import the variables a launch script exports (cached).",
+    "setEdaTool <tool_name>": "Set the EDA tool to use (e.g., openlane, cadence).",
+    "getEdaTool": "Show the current EDA tool in use.",
+    "<command> &": "Run any command as a background job (run_* commands always are).",
+    "jobs": "List background jobs with their status and last output line.",
+    "wait [%N]": "Wait for a job (default: all running jobs) to finish.",
+    "kill %N": "Cancel a job and terminate the tools it started.",
+    "tail %N [-n N] [-f]": "Show a job's output; -f follows it until the job ends.",
+    "exit / quit": "Exit the Logic Lance CLI shell.",
+    "help": "Show this help message.",
+}
+
+
+def show_help():
+    width = max(len(cmd) for cmd in COMMAND_HELP)
+    for cmd, desc in COMMAND_HELP.items():
+        print(f"📌 {cmd.ljust(width)} - {desc}")
+    return True
 
 
 session_eda_tool = None
 
 def setEdaTool(tool_name, command=None):
-    COMMAND_HELP = {
-        "run_synthesis": "Run synthesis flow for the project.",
-        "setEdaTool <tool_name>": "Set the EDA tool to use (e.g., openlane, cadence).",
-        "getEdaTool": "Show the current EDA tool in use.",
-        "exit / quit": "Exit the Logic Lance CLI shell.",
-        "help": "Show this help message.",
-    }
-
     # Show help if requested
     if command == "help":
-        for cmd, desc in COMMAND_HELP.items():
-            print(f"📌 {cmd.ljust(25)} - {desc}")
-        return
+        return show_help()
 
     global session_eda_tool
 
@@ -97,33 +856,25 @@ def setEdaTool(tool_name, command=None):
     if tool_name == "openlane":
         session_eda_tool = tool_name
         print(f"✅ Session EDA Tool set to: {tool_name}")
-        return
+        return True
 
     # For other tools, validate from config.json
-    CONFIG_ROOT = os.environ.get("CONFIG_ROOT")
-    if not CONFIG_ROOT:
-        print("❌ CONFIG_ROOT environment variable not set.")
-        return
-
-    config_path = os.path.join(CONFIG_ROOT, "config.json")
-    if not os.path.exists(config_path):
-        print(f"❌ Project config not found at {config_path}")
-        return
-
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
-
-        # Check if the tool is present in the config
-        tool_exists = any(tool["tool"].lower() == tool_name for tool in config.get("tool_config", []))
-        if tool_exists:
-            session_eda_tool = tool_name
-            print(f"✅ Session EDA Tool set to: {tool_name}")
-        else:
-            print(f"❌ Tool '{tool_name}' not found in tool_config. Please add it to your config.")
-
-    except Exception as e:
+        config = get_project_config()
+    except FileNotFoundError as e:
+        print(f"❌ Project config not found at {e.filename}")
+        return False
+    except (OSError, ConfigError) as e:
         print(f"❌ Error setting EDA tool: {e}")
+        return False
+
+    # Check if the tool is present in the config
+    if config.has_tool(tool_name):
+        session_eda_tool = tool_name
+        print(f"✅ Session EDA Tool set to: {tool_name}")
+        return True
+    print(f"❌ Tool '{tool_name}' not found in tool_config. Please add it to your config.")
+    return False
 
 
 def getEdaTool():
@@ -131,16 +882,9 @@ def getEdaTool():
     if session_eda_tool:
         return session_eda_tool.lower()
 
-    CONFIG_ROOT = os.environ.get("CONFIG_ROOT")
-    if not CONFIG_ROOT:
-        return None
-
-    config_path = os.path.join(CONFIG_ROOT, "config.json")
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
-        return config.get("eda_tool", "").lower()
-    except Exception:
+        return get_project_config().eda_tool
+    except (OSError, ValueError):
         return None
     
 
@@ -167,4 +911,5 @@ def project_info(project_name):
     for key, value in info.items():
         print(f"{key.ljust(15)}: {value}")
     print("-" * 60)
+    return True
 
@@ -0,0 +1,472 @@
+import os
+import re
+import json
+import subprocess
+import time
+import uuid
+import socket
+import getpass
+import hashlib
+import sqlite3
+import itertools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.checkpoints import checkpoint_dir, checkpoint_mtimes, find_checkpoint, record_checkpoints
+from utils.fingerprint import (
+    compute_fingerprint,
+    design_digest,
+    fingerprint_path,
+    load_fingerprint,
+    record_fingerprint,
+)
+from utils.env_manifest import apply_manifest
+from utils.executors import CANCELLED_EXIT, LocalExecutor
+from utils.licenses import LICENSE_POLL
+from utils.log_parser import ToolLogParser, write_metrics
+from utils.process_runner import cancel_requested, stage_log_path, terminal_input
+from utils.run_history import history_path, record_run
+from utils.tracing import record_span, span
+
+DEFAULT_MAX_WORKERS = 4
+
+# Command line used to launch each tool named in flow_setup.json.
+# {tool_log} keeps the tool's own .log/.cmd files out of the working
+# directory so parallel runs do not overwrite each other.
+TOOL_COMMANDS = {
+    "genus": "genus -f {script} -log {tool_log}",
+    "innovus": "innovus -files {script} -log {tool_log}",
+    "tempus": "tempus -files {script} -log {tool_log}",
+    "lec": "lec -xl -nogui -tclmode -dofile {script}",
+    "dc_shell": "dc_shell -f {script}",
+    "primeTime": "pt_shell -f {script}",
+    "yosys": "yosys {script}",
+    "openroad": "openroad -exit {script}",
+    "openSTA": "sta -exit {script}",
+}
+
+
+class Stage:
+    """One flow/tool invocation inside the dependency graph."""
+
+    def __init__(self, name, flow, tool, binary, version, script, deps, env=None, design=None):
+        self.name = name
+        self.design = design
+        self.flow = flow
+        self.tool = tool
+        self.binary = binary
+        self.version = version
+        self.script = script
+        self.deps = list(deps)
+        self.env = env or {}
+        self.status = "pending"
+        self.returncode = None
+        self.force = False
+        self.upstream = {}
+        self.digest = None
+        self.up_to_date = False
+        self.log_path = None
+        self.echo_prefix = ""
+        self.line_handlers = []
+        self.run_id = None
+        self.metrics = None
+        self.metrics_path = None
+        self.executor = None
+        self.lease = None
+        self.queued_at = None
+        self.queue_seconds = None
+        self.duration = None
+        self.session = None
+        self.checkpoints = False
+        self.filelist = False
+        self.resume = None
+        self.manifest = None
+
+    def command(self):
+        template = TOOL_COMMANDS.get(self.binary, self.binary + " {script}")
+        log_dir = os.path.dirname(self.log_path or stage_log_path(self.name, self.env_for_run()))
+        return template.format(script=self.script, tool_log=os.path.join(log_dir, self.binary))
+
+    def env_for_run(self):
+        env = dict(os.environ)
+        # The tool's launch script, applied from its cached manifest instead of sourcing it
+        if self.manifest:
+            apply_manifest(self.manifest, env)
+        env.update(self.env)
+        return env
+
+
+def expand_aliases(flows, names):
+    """Replace alias flows (e.g. pnr) by the flows they stand for, keeping order."""
+    expanded = []
+    for name in names:
+        if name not in flows:
+            raise ValueError(f"Unknown flow '{name}' in flow_setup.json")
+        if flows[name].alias_for:
+            for sub in expand_aliases(flows, flows[name].alias_for):
+                if sub not in expanded:
+                    expanded.append(sub)
+        elif name not in expanded:
+            expanded.append(name)
+    return expanded
+
+
+def collect_flows(flows, requested, with_deps=True):
+    """Return the requested flows (plus their transitive dependencies) in topological order."""
+    wanted = expand_aliases(flows, requested)
+    ordered = []
+    visiting = set()
+
+    def visit(name, chain):
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError("Dependency cycle in flow_setup.json: " + " -> ".join(chain + [name]))
+        visiting.add(name)
+        for dep in expand_aliases(flows, flows[name].dependencies):
+            if with_deps or dep in wanted:
+                visit(dep, chain + [name])
+        visiting.discard(name)
+        ordered.append(name)
+
+    for name in wanted:
+        visit(name, [])
+    return ordered
+
+
+def build_stage_graph(flows, requested, eda_tool, logiclance_root, with_deps=True, tops=None):
+    """Build the stage graph for the requested flows, with the top module passed as DESIGN.
+
+    Several tops replicate the chain (synthesis.<top>, ...), each with its own OUTPUTS_PATH/REPORTS_PATH.
+    """
+    tops = list(tops or [])
+    flow_names = collect_flows(flows, requested, with_deps)
+
+    for flow_name in flow_names:
+        if eda_tool not in flows[flow_name].tools:
+            raise ValueError(f"Flow '{flow_name}' has no '{eda_tool}' tool in flow_setup.json")
+
+    stages = {}
+    for top in tops or [None]:
+        suffix = f".{top}" if len(tops) > 1 else ""
+        for flow_name in flow_names:
+            flow = flows[flow_name]
+            tool_info = flow.tools[eda_tool]
+
+            env = {}
+            if flow.order:
+                env["order"] = ",".join(flow.order)
+            if top:
+                env["DESIGN"] = top
+            if suffix:
+                for var in ("OUTPUTS_PATH", "REPORTS_PATH"):
+                    if os.environ.get(var):
+                        env[var] = os.path.join(os.environ[var], top)
+
+            deps = [
+                d + suffix for d in expand_aliases(flows, flow.dependencies)
+                if d + suffix in stages
+            ]
+            stage = Stage(
+                name=flow_name + suffix,
+                flow=flow_name,
+                tool=eda_tool,
+                binary=tool_info.tool,
+                version=tool_info.version,
+                script=os.path.join(logiclance_root, tool_info.script),
+                deps=deps,
+                env=env,
+                design=top,
+            )
+            stage.checkpoints = bool(flow.raw.get("checkpoints"))
+            stage.filelist = bool(flow.raw.get("filelist"))
+            stages[stage.name] = stage
+    return stages
+
+
+def sweep_points(matrix):
+    """Expand a sweep matrix into [(label, env)], one entry per point of its cartesian product.
+
+    A list sweeps the env var named by its key ("SYN_EFF": ["low", "high"]);
+    an object maps labels to env overrides ("corner": {"wc": {"MAX_LIB": "slow.lib"}}).
+    """
+    axes = []
+    for key, values in matrix.items():
+        if isinstance(values, dict):
+            axes.append([(label, dict(env)) for label, env in values.items()])
+        else:
+            axes.append([(str(value), {key: str(value)}) for value in values])
+
+    points = []
+    for combo in itertools.product(*axes):
+        label = "-".join(re.sub(r"[^\w.]+", "_", name) for name, _ in combo)
+        env = {}
+        for _, overrides in combo:
+            env.update(overrides)
+        points.append((label, env))
+    return points
+
+
+def build_sweep_stages(flows, flow_name, eda_tool, logiclance_root, matrix, tops=None):
+    """One independent stage per sweep point (and top), named <flow>@<label>, writing under sweep/<label>."""
+    stages = {}
+    for label, point_env in sweep_points(matrix):
+        for stage in build_stage_graph(flows, [flow_name], eda_tool, logiclance_root, False, tops).values():
+            stage.name = f"{stage.name}@{label}"
+            for var in ("OUTPUTS_PATH", "REPORTS_PATH"):
+                base = stage.env.get(var) or os.environ.get(var)
+                if base:
+                    stage.env[var] = os.path.join(base, "sweep", label)
+            stage.env.update(point_env)
+            stage.design = stage.env.get("DESIGN", stage.design)
+            stages[stage.name] = stage
+    return stages
+
+
+def run_stage(stage):
+    """Launch a stage (in its session or through its executor) unless its fingerprint is unchanged."""
+    with span("stage", stage=stage.name, tool=stage.binary, design=stage.design) as s:
+        returncode = _run_stage(stage)
+        s.set(exit_code=returncode, up_to_date=stage.up_to_date, log=stage.log_path)
+        return returncode
+
+
+def _run_stage(stage):
+    env = stage.env_for_run()
+    if cancel_requested():
+        print(f"{stage.echo_prefix}🛑 {stage.name} cancelled before launch")
+        return CANCELLED_EXIT
+
+    outputs_root = env.get("OUTPUTS_PATH")
+    record_path = fingerprint_path(outputs_root, stage.name) if outputs_root else None
+    with span("stage.fingerprint", stage=stage.name) as s:
+        previous = load_fingerprint(record_path) if record_path else None
+        fingerprint = compute_fingerprint(stage, env, stage.upstream, previous)
+        stage.digest = fingerprint["digest"]
+        s.set(unchanged=bool(previous and previous.get("digest") == stage.digest))
+
+    if not stage.force and previous and previous.get("digest") == stage.digest:
+        stage.up_to_date = True
+        return 0
+
+    # Outputs are about to be overwritten; the old fingerprint no longer describes them
+    if previous:
+        os.remove(record_path)
+
+    # Resume from a checkpoint made from the same design inputs (constraints may differ)
+    env.pop("RESUME_FROM", None)
+    env.pop("RESUME_DB", None)
+    design = env.get("DESIGN")
+    checkpoints = stage.checkpoints and design and outputs_root
+    if stage.resume and checkpoints:
+        step, db = find_checkpoint(
+            checkpoint_dir(env, stage.flow), design, design_digest(fingerprint), stage.resume
+        )
+        if step:
+            env["RESUME_FROM"] = step
+            env["RESUME_DB"] = db
+            print(f"{stage.echo_prefix}↩️  Resuming {stage.name} from '{step}' checkpoint {db}")
+        else:
+            print(f"{stage.echo_prefix}⚠️ No usable checkpoint for {stage.name}; running from the start")
+    before = checkpoint_mtimes(checkpoint_dir(env, stage.flow), design) if checkpoints else {}
+
+    parser = ToolLogParser()
+    # [seconds, lines]: parsing happens line by line while the tool runs, so the
+    # log.parse span reports the accumulated total next to writing the metrics
+    parse_stats = [0.0, 0]
+
+    def on_line(stream, line):
+        fed = time.perf_counter()
+        parser.feed(line)
+        parse_stats[0] += time.perf_counter() - fed
+        parse_stats[1] += 1
+        for handler in stage.line_handlers:
+            handler(stream, line)
+
+    stage.run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    stage.log_path = stage_log_path(stage.name, env)
+    start = time.time()
+    if stage.session:
+        # Persistent tool process: no startup or license checkout per run
+        returncode = stage.session.run_script(
+            stage.script, stage.log_path, env, on_line=on_line, prefix=stage.echo_prefix
+        )
+    else:
+        executor = stage.executor or LocalExecutor()
+        returncode = executor.run(
+            stage.name,
+            stage.command(),
+            stage.log_path,
+            env,
+            on_line=on_line,
+            prefix=stage.echo_prefix,
+            # With the top module passed in, or in a background job, nothing may wait on the terminal
+            stdin=subprocess.DEVNULL if env.get("DESIGN") or not terminal_input.get() else None,
+        )
+    end = time.time()
+    stage.duration = round(end - start, 3)
+
+    # Checkpoints written before a later step failed are still good to resume from
+    if checkpoints:
+        try:
+            record_checkpoints(checkpoint_dir(env, stage.flow), design, design_digest(fingerprint), before)
+        except OSError as e:
+            print(f"⚠️ Could not record checkpoints of {stage.name}: {e}")
+
+    stage.metrics = parser.metrics
+    if stage.queue_seconds is not None:
+        stage.metrics["license"]["queue_seconds"] = stage.queue_seconds
+    with span("log.parse", stage=stage.name, lines=parse_stats[1], feed_seconds=round(parse_stats[0], 6)):
+        stage.metrics_path = write_metrics(
+            os.path.join(os.path.dirname(stage.log_path), "metrics"),
+            stage.run_id,
+            stage.metrics,
+            stage=stage.name,
+            tool=stage.binary,
+            exit_code=returncode,
+            log=stage.log_path,
+        )
+
+    try:
+        with span("history.record", stage=stage.name):
+            record_run(
+                history_path(),
+                run_id=stage.run_id,
+                flow=stage.name,
+                tool=stage.binary,
+                script_hash=hashlib.sha256(
+                    json.dumps(fingerprint["scripts"], sort_keys=True).encode()
+                ).hexdigest()[:16],
+                user=env.get("LOGICLANCE_USER") or getpass.getuser(),
+                host=socket.gethostname(),
+                start=start,
+                end=end,
+                exit_code=returncode,
+                log_path=stage.log_path,
+                metrics=stage.metrics,
+            )
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not record {stage.name} in run history: {e}")
+    if returncode == 0 and record_path:
+        record_fingerprint(record_path, fingerprint)
+    return returncode
+
+
+class FlowScheduler:
+    """Runs a stage graph, launching every stage whose dependencies have passed.
+
+    At most max_workers stages run at once; a failure skips only the stages
+    downstream of it. With a LicensePool, stages queue here for a free license.
+    """
+
+    def __init__(self, stages, max_workers=DEFAULT_MAX_WORKERS, runner=run_stage, executor=None,
+                 licenses=None):
+        self.stages = stages
+        self.max_workers = max(1, int(max_workers))
+        self.runner = runner
+        self.executor = executor
+        self.licenses = licenses
+
+    def _lease(self, stage):
+        """Take license slots for stage, or return None (and report it once) when none are free."""
+        if stage.session or not self.licenses or not self.licenses.features_for(stage.binary):
+            return []
+        if stage.queued_at is None:
+            stage.queued_at = time.time()
+        lease = self.licenses.try_acquire(stage.binary)
+        if lease is None:
+            if stage.status != "queued":
+                stage.status = "queued"
+                features = ", ".join(self.licenses.features_for(stage.binary))
+                print(f"⏳ {stage.name} queued: no free {features} license")
+            return None
+        now = time.time()
+        stage.queue_seconds = round(now - stage.queued_at, 3)
+        record_span("license.queue", stage.queued_at, now, stage=stage.name, binary=stage.binary)
+        return lease
+
+    def _skip_downstream(self):
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages.values():
+                if stage.status not in ("pending", "queued"):
+                    continue
+                if any(self.stages[d].status in ("failed", "skipped") for d in stage.deps):
+                    stage.status = "skipped"
+                    print(f"⏭️  Skipping {stage.name}: upstream stage did not pass")
+                    changed = True
+
+    def _cancel_pending(self):
+        for stage in self.stages.values():
+            if stage.status in ("pending", "queued"):
+                stage.status = "skipped"
+                print(f"🛑 Skipping {stage.name}: cancelled")
+
+    def _ready(self):
+        self._skip_downstream()
+        return [
+            stage for stage in self.stages.values()
+            if stage.status in ("pending", "queued")
+            and all(self.stages[d].status == "passed" for d in stage.deps)
+        ]
+
+    def run(self):
+        with span("flow.schedule", stages=len(self.stages), max_workers=self.max_workers) as s:
+            statuses = self._run()
+            s.set(
+                failed=sorted(name for name, status in statuses.items() if status == "failed"),
+                skipped=sorted(name for name, status in statuses.items() if status == "skipped"),
+            )
+            return statuses
+
+    def _run(self):
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                queued = False
+                if cancel_requested():
+                    self._cancel_pending()
+                for stage in self._ready():
+                    if len(running) >= self.max_workers:
+                        break
+                    stage.lease = self._lease(stage)
+                    if stage.lease is None:
+                        queued = True
+                        continue
+                    stage.status = "running"
+                    stage.upstream = {d: self.stages[d].digest for d in stage.deps}
+                    stage.executor = self.executor
+                    if self.max_workers > 1:
+                        stage.echo_prefix = f"[{stage.name}] "
+                    if stage.session:
+                        print(f"🚀 Starting {stage.name} in {stage.binary} session: {stage.script}")
+                    else:
+                        print(f"🚀 Starting {stage.name} ({stage.binary}): {stage.command()}")
+                    # Workers inherit the shell job's context (its cancel token and output)
+                    running[pool.submit(contextvars.copy_context().run, self.runner, stage)] = stage
+
+                if not running:
+                    if not queued:
+                        break
+                    # Every license is held elsewhere; check again shortly
+                    time.sleep(LICENSE_POLL)
+                    continue
+
+                done, _ = wait(running, timeout=LICENSE_POLL if queued else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    if self.licenses:
+                        self.licenses.release(stage.lease)
+                    try:
+                        stage.returncode = future.result()
+                    except Exception as e:
+                        print(f"❌ {stage.name} could not be launched: {e}")
+                        stage.returncode = -1
+                    stage.status = "passed" if stage.returncode == 0 else "failed"
+                    if stage.up_to_date:
+                        print(f"⏩ {stage.name} is up to date, skipped")
+                        continue
+                    icon = "✅" if stage.status == "passed" else "❌"
+                    print(f"{icon} {stage.name} {stage.status} (exit code {stage.returncode}), log: {stage.log_path}")
+
+        return {name: stage.status for name, stage in self.stages.items()}
@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.process_runner import CancelToken, current_cancel, logs_root, rotate_log, terminal_input
+
+# Commands that run in the background without a trailing '&'
+BACKGROUND_COMMANDS = ("run_synthesis", "run_flow", "run_sweep")
+MAX_JOBS = 8
+TAIL_LINES = 20
+
+current_job = contextvars.ContextVar("current_job", default=None)
+
+
+class JobOutput:
+    """sys.stdout/sys.stderr stand-in that sends writes to the current context's job, else the console."""
+
+    def __init__(self, console):
+        self.console = console
+
+    def write(self, text):
+        job = current_job.get()
+        if job is None:
+            return self.console.write(text)
+        job.write(text)
+        return len(text)
+
+    def flush(self):
+        job = current_job.get()
+        if job is None:
+            self.console.flush()
+        elif job.foreground:
+            job.console.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+
+class Job:
+    """One shell command running on a worker thread, with its own log and cancel token."""
+
+    def __init__(self, job_id, command, console, foreground=False):
+        self.id = job_id
+        self.command = command
+        self.console = console
+        self.foreground = foreground
+        self.token = CancelToken()
+        self.status = "running"
+        self.started = time.time()
+        self.ended = None
+        self.last_line = ""
+        self.log_path = os.path.join(logs_root(), "jobs", f"job{job_id}.log")
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        # Foreground commands share job0.log; keep the previous ones as job0.log.1, .2, ...
+        if foreground:
+            rotate_log(self.log_path)
+        self._log = open(self.log_path, "w")
+        self._lock = threading.Lock()
+        self.task = None
+
+    def write(self, text):
+        with self._lock:
+            if self._log.closed:
+                return
+            self._log.write(text)
+            self._log.flush()
+            lines = [line for line in text.splitlines() if line.strip()]
+            if lines:
+                self.last_line = lines[-1].strip()
+            if self.foreground:
+                self.console.write(text)
+
+    def finish(self, ok):
+        if self.token.cancelled:
+            self.status = "killed"
+        else:
+            self.status = "done" if ok else "failed"
+        self.ended = time.time()
+        with self._lock:
+            self._log.close()
+
+    @property
+    def elapsed(self):
+        return (self.ended or time.time()) - self.started
+
+    def describe(self):
+        return f"[{self.id}] {self.status.ljust(8)} {self.elapsed:7.1f}s  {self.command}"
+
+
+class JobManager:
+    """Runs shell commands as foreground or background jobs on a thread pool."""
+
+    def __init__(self, dispatch, console, notify=None):
+        self.dispatch = dispatch
+        self.console = console
+        self.notify = notify or (lambda message: console.write(message + "\n"))
+        self.jobs = {}
+        self.next_id = 1
+        self.pool = ThreadPoolExecutor(max_workers=MAX_JOBS)
+
+    def _run(self, job):
+        current_job.set(job)
+        current_cancel.set(job.token)
+        terminal_input.set(job.foreground)
+        try:
+            return bool(self.dispatch(job.command, job.foreground))
+        except Exception as e:
+            job.write(f"❌ {job.command} failed: {e}\n")
+            return False
+
+    def start(self, command, foreground=False):
+        """Launch command on the pool; returns the Job (its task resolves to True/False)."""
+        loop = asyncio.get_running_loop()
+        # Foreground commands are not listed as jobs; they all log to job0.log (rotated)
+        job = Job(0 if foreground else self.next_id, command, self.console, foreground)
+        if not foreground:
+            self.jobs[job.id] = job
+            self.next_id += 1
+        # Each job gets a fresh context so its job/cancel variables do not leak
+        job.task = loop.run_in_executor(self.pool, contextvars.Context().run, self._run, job)
+        job.task.add_done_callback(lambda task: self._finished(job, task))
+        if not foreground:
+            self.notify(f"[{job.id}] started  {command}  (log: {job.log_path})")
+        return job
+
+    def _finished(self, job, task):
+        job.finish(not task.cancelled() and task.exception() is None and task.result())
+        if not job.foreground:
+            self.notify(job.describe())
+
+    def running(self):
+        return [job for job in self.jobs.values() if job.status == "running"]
+
+    def get(self, job_id):
+        try:
+            return self.jobs.get(int(str(job_id).lstrip("%")))
+        except ValueError:
+            return None
+
+    def kill(self, job):
+        job.token.cancel()
+
+    async def wait(self, jobs):
+        tasks = [job.task for job in jobs if job.status == "running"]
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def tail(self, job, lines=TAIL_LINES):
+        with open(job.log_path, "r", errors="replace") as f:
+            return list(deque(f, maxlen=lines))
+
+    def shutdown(self):
+        for job in self.running():
+            job.token.cancel()
+        self.pool.shutdown(wait=True)
+
+
+async def follow(job, out, poll=0.5):
+    """tail -f: copy the job's log to out until the job ends."""
+    with open(job.log_path, "r", errors="replace") as f:
+        for line in deque(f, maxlen=TAIL_LINES):
+            out.write(line)
+        while True:
+            chunk = f.read()
+            if chunk:
+                out.write(chunk)
+                out.flush()
+            elif job.status != "running":
+                return
+            else:
+                await asyncio.sleep(poll)
+
+
+def install_output(stdout=None, stderr=None):
+    """Route sys.stdout/sys.stderr through JobOutput; returns the previous streams."""
+    previous = (sys.stdout, sys.stderr)
+    sys.stdout = JobOutput(stdout or sys.stdout)
+    sys.stderr = JobOutput(stderr or sys.stderr)
+    return previous
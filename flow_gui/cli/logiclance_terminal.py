@@ -1,14 +1,40 @@
 import os
-import readline
 import subprocess
-import json
 import sys
-from .commands import run_synthesis, setEdaTool, getEdaTool, project_info
+from utils.config_loader import get_project_config
+from .commands import (
+    run_synthesis,
+    run_flow,
+    run_sweep,
+    show_metrics,
+    prepare_filelist,
+    lib_info,
+    lib_check,
+    lef_info,
+    check_physical_libs,
+    preflight_command,
+    check_tool_installation,
+    session_command,
+    trace_command,
+    token_command,
+    show_history,
+    show_help,
+    setEdaTool,
+    getEdaTool,
+    project_info,
+)
+from .flow_runner import DEFAULT_MAX_WORKERS
+from utils.env_manifest import apply_manifest, load_manifest
+from utils.process_runner import current_cancel
+from utils.profiling import profile_call, profiling_active, profiling_enabled
+from utils.tracing import span
 
 
 HISTORY_FILE = os.path.expanduser("~/.logiclance_history")
 
+# readline is only loaded for the interactive shell; batch runs never touch the terminal
 def setup_readline():
+    import readline
     readline.parse_and_bind("tab: complete")
     try:
         readline.read_history_file(HISTORY_FILE)
@@ -16,19 +42,215 @@ def setup_readline():
         pass
 
 def save_history():
+    import readline
     try:
         readline.write_history_file(HISTORY_FILE)
     except Exception:
         pass
 
-def source_env_file(env_file):
-    """Source a .bin/.sh file and import variables into os.environ"""
-    command = f"bash -c 'source {env_file} && env'"
-    proc = subprocess.Popen(command, stdout=subprocess.PIPE, shell=True, executable="/bin/bash")
-    for line in proc.stdout:
-        key, _, value = line.decode().partition("=")
-        os.environ[key.strip()] = value.strip()
-    proc.communicate()
+def source_env_file(env_file, refresh=False):
+    """Import the variables a .bin/.sh file exports into os.environ (from its cached manifest)"""
+    try:
+        manifest = load_manifest(env_file, refresh=refresh)
+    except OSError as e:
+        print(f"❌ Could not source {env_file}: {e}")
+        return False
+    apply_manifest(manifest)
+    print(f"✅ {len(manifest['set'])} variable(s) set, {len(manifest['unset'])} unset from {env_file}")
+    return True
+
+def pop_tops(args):
+    """Remove '-top a,b,c' from args and return the list of top modules (or None)."""
+    if "-top" not in args:
+        return None
+    idx = args.index("-top")
+    tops = [t for t in args[idx + 1].split(",") if t]
+    del args[idx:idx + 2]
+    return tops
+
+
+def pop_executor(args):
+    """Remove '-executor <name>' from args and return the name (or None)."""
+    if "-executor" not in args:
+        return None
+    idx = args.index("-executor")
+    name = args[idx + 1]
+    del args[idx:idx + 2]
+    return name
+
+
+def parse_run_flow_args(args):
+    """Split run_flow arguments into (flow_names, max_workers, with_deps, force)."""
+    max_workers = DEFAULT_MAX_WORKERS
+    flow_names = []
+    i = 0
+    while i < len(args):
+        if args[i] == "-j":
+            max_workers = int(args[i + 1])
+            i += 2
+            continue
+        if args[i] not in ("-only", "-force", "-no_preflight"):
+            flow_names.append(args[i])
+        i += 1
+    return flow_names, max_workers, "-only" not in args, "-force" in args
+
+
+def run_shell_command(cmd):
+    """Run a system command for a background job, passing its output through sys.stdout."""
+    proc = subprocess.Popen(cmd, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT)
+    token = current_cancel.get()
+    if token:
+        token.track(proc)
+    try:
+        for line in proc.stdout:
+            sys.stdout.write(line.decode(errors="replace"))
+    finally:
+        proc.stdout.close()
+        if token:
+            token.untrack(proc)
+    return proc.wait() == 0
+
+
+def dispatch_command(cmd, project_name, interactive=True):
+    """Run one shell command line; True on success. interactive=False keeps it off the terminal."""
+    tokens = cmd.split()
+    base_cmd = tokens[0]
+    args = tokens[1:]
+
+    # `logiclance --profile` profiles every command; `profile <command>` just one
+    if base_cmd == "profile" and args:
+        return profile_call(" ".join(args), dispatch_command, " ".join(args), project_name, interactive)
+    if profiling_enabled() and not profiling_active():
+        return profile_call(cmd, dispatch_command, cmd, project_name, interactive)
+
+    with span("command", cmd=cmd, project=project_name) as s:
+        ok = _dispatch(base_cmd, args, cmd, project_name, interactive)
+        s.set(ok=bool(ok))
+        return ok
+
+
+def _dispatch(base_cmd, args, cmd, project_name, interactive):
+    if base_cmd in ("run_synthesis", "run_flow", "run_sweep"):
+        try:
+            tops = pop_tops(args)
+        except IndexError:
+            print("❌ Error: Please provide top module name(s) after -top.")
+            return False
+        try:
+            executor = pop_executor(args)
+        except IndexError:
+            print("❌ Error: Please provide local, lsf or slurm after -executor.")
+            return False
+        preflight = "-no_preflight" not in args
+
+    if base_cmd == "run_synthesis":
+        force = "-force" in args
+        session = "-session" in args
+        resume = None
+        if "-resume" in args:
+            idx = args.index("-resume")
+            resume = "auto"
+            if idx + 1 < len(args) and not args[idx + 1].startswith("-"):
+                resume = args.pop(idx + 1)
+            if resume not in ("generic", "map", "auto"):
+                print("❌ Error: -resume takes generic, map or auto.")
+                return False
+        if "-f" in args:
+            try:
+                idx = args.index("-f")
+                script_path = args[idx + 1]
+            except IndexError:
+                print("❌ Error: Please provide a script path after -f.")
+                return False
+            return run_synthesis(script_flag="-f", custom_script_path=script_path, force=force,
+                                 tops=tops, executor=executor, session=session, resume=resume,
+                                 preflight=preflight)
+        return run_synthesis(force=force, tops=tops, executor=executor, session=session, resume=resume,
+                             preflight=preflight)
+
+    if base_cmd == "run_flow":
+        try:
+            flow_names, max_workers, with_deps, force = parse_run_flow_args(args)
+        except (IndexError, ValueError):
+            print("❌ Error: Please provide a worker count after -j.")
+            return False
+        if not flow_names:
+            print("❌ Usage: run_flow <flow> [<flow> ...] [-top a,b] [-j N] [-only] [-executor name]")
+            return False
+        return run_flow(flow_names, max_workers=max_workers, with_deps=with_deps, force=force,
+                        tops=tops, executor=executor, preflight=preflight)
+
+    if base_cmd == "run_sweep":
+        try:
+            flow_names, max_workers, _, force = parse_run_flow_args(args)
+        except (IndexError, ValueError):
+            print("❌ Error: Please provide a worker count after -j.")
+            return False
+        if len(flow_names) != 1:
+            print("❌ Usage: run_sweep <flow> [-top a,b] [-j N] [-force] [-executor name]")
+            return False
+        return run_sweep(flow_names[0], max_workers=max_workers, force=force, tops=tops, executor=executor,
+                         preflight=preflight)
+
+    if base_cmd == "session":
+        if args[:1] == ["run"]:
+            if len(args) < 2:
+                print("❌ Usage: session run <script> [tool]")
+                return False
+            return session_command("run", *args[2:3], script=args[1])
+        return session_command(*args[:2])
+
+    if base_cmd == "check_tools":
+        check_tool_installation(detect_versions="-versions" in args)
+        return True
+    if base_cmd == "trace":
+        return trace_command(args[0] if args else "status")
+    if base_cmd == "token":
+        return token_command(args[0] if args else "")
+    if base_cmd == "preflight":
+        try:
+            tops = pop_tops(args)
+        except IndexError:
+            print("❌ Error: Please provide top module name(s) after -top.")
+            return False
+        return preflight_command(args or None, tops)
+
+    if base_cmd == "source" and args:
+        return source_env_file(args[0], refresh="-refresh" in args)
+    if base_cmd == "filelist":
+        return prepare_filelist(verbose=True) is not None
+    if base_cmd == "lib_info":
+        names = [a for a in args if a != "-body"]
+        return lib_info(names[0] if names else None, show_body="-body" in args)
+    if base_cmd == "lib_check":
+        return lib_check()
+    if base_cmd == "lef_info":
+        return lef_info(args[0] if args else None)
+    if base_cmd == "lef_check":
+        return check_physical_libs(verbose=True)
+    if base_cmd == "metrics" and args:
+        return show_metrics(args[0])
+    if base_cmd == "history":
+        return show_history(*args[:2])
+    if base_cmd == "setEdaTool" and args:
+        return setEdaTool(args[0])
+    if base_cmd == "getEdaTool":
+        print(f"🔍 Current EDA Tool: {getEdaTool()}")
+        return True
+    if base_cmd == "project":
+        return project_info(project_name)
+    if base_cmd == "help":
+        return show_help()
+
+    try:
+        if not interactive:
+            return run_shell_command(cmd)
+        return subprocess.run(cmd, shell=True).returncode == 0
+    except Exception as e:
+        print(f"❌ Command failed: {e}")
+        return False
+
 
 # Assuming environment variables are set up earlier in the code
 def terminal_shell(user, project_name):
@@ -45,13 +267,7 @@ def terminal_shell(user, project_name):
     print(f" LOGS_PATH   : {os.environ.get('LOG_PATH', 'N/A')}")
     
     
-    config_root = os.environ.get("CONFIG_ROOT")
-    config_path = os.path.join(config_root, "config.json")
-
-
-    with open(config_path, "r") as f:
-        project_config = json.load(f)
-    eda_tool = project_config.get("eda_tool", "N/A")
+    eda_tool = get_project_config().raw.get("eda_tool", "N/A")
 
     print(f" EDA Tool      : {eda_tool} and Openlane")
     print(f" Logic Lance(v): {os.environ.get('VERSION', 'N/A')}")
@@ -59,46 +275,15 @@ def terminal_shell(user, project_name):
 
     print("\nType 'help' to see commands, project to see paths. Type 'exit' to quit.\n")
 
-    setup_readline()
-    command_counter = 1
+    # Recorded with every run in the run history
+    os.environ["LOGICLANCE_USER"] = user["name"]
 
-    while True:
-        cmd = input(f"\033[92mlogiclance:{command_counter}\033[0m> ").strip()
-        if not cmd:
-            continue
+    # The asyncio shell is only loaded here, so batch runs do not import it
+    import asyncio
+    from .shell import shell_loop
 
-        tokens = cmd.split()
-        base_cmd = tokens[0]
-        args = tokens[1:]
-
-        if base_cmd in ["exit", "quit"]:
-            print("👋 Exiting Logic Lance shell. Goodbye!")
-            break
-
-        if base_cmd == "run_synthesis":
-            if "-f" in args:
-                try:
-                    idx = args.index("-f")
-                    script_path = args[idx + 1]
-                    run_synthesis(script_flag="-f", custom_script_path=script_path)
-                except IndexError:
-                    print("❌ Error: Please provide a script path after -f.")
-            else:
-                run_synthesis()
-            command_counter += 1
-
-        elif base_cmd == "setEdaTool" and args:
-            setEdaTool(args[0])
-            command_counter += 1
-        elif base_cmd == "getEdaTool":
-            print(f"🔍 Current EDA Tool: {getEdaTool()}")
-            command_counter += 1
-        elif base_cmd == "project":
-            project_info(project_name)
-
-        else:
-            try:
-                subprocess.run(cmd, shell=True)
-                command_counter += 1
-            except Exception as e:
-                print(f"❌ Command failed: {e}")
+    setup_readline()
+    try:
+        asyncio.run(shell_loop(project_name))
+    finally:
+        save_history()
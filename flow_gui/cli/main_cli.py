@@ -0,0 +1,104 @@
+import os
+import sys
+from utils.auth import verify_credentials
+from utils.env_manifest import apply_project_env
+from utils.tracing import enable_tracing, span
+from utils.user_index import find_user
+from .arg_parser import build_batch_parser
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def read_commands(path):
+    """Yield the non-empty, non-comment lines of a command file ('-' for stdin)."""
+    stream = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(argv):
+    """Entry point for `logiclance run ...`. Returns the process exit status."""
+    args = build_batch_parser().parse_args(argv)
+    if args.trace:
+        enable_tracing()
+    with span("batch", project=args.project, flows=" ".join(args.flows), commands=args.commands) as s:
+        if args.profile:
+            from utils.profiling import profile_call
+            # One profile for the whole run, login and config loading included
+            status = profile_call(f"batch-{args.project}", _run_batch, args)
+        else:
+            status = _run_batch(args)
+        s.set(exit_status=status)
+        return status
+
+
+def _run_batch(args):
+    root = os.environ.get("LOGICLANCE_ROOT")
+    if not root or not os.path.isdir(os.path.join(root, "projects", args.project)):
+        print(f"❌ Project '{args.project}' not found (LOGICLANCE_ROOT={root})")
+        return EXIT_USAGE
+    apply_project_env(root, args.project)
+    os.environ.setdefault("PROJECT_NAME", args.project)
+    os.environ.setdefault("CONFIG_ROOT", os.path.join(root, "configs", "projects", args.project))
+
+    csv_path = os.path.join(os.environ["CONFIG_ROOT"], "employees.csv")
+    if not os.path.isfile(csv_path):
+        print(f"❌ employees.csv not found at {csv_path}")
+        return EXIT_USAGE
+    username = args.user.strip().lower()
+    user = find_user(csv_path, email=username) if "@" in username else find_user(csv_path, name=username)
+    if not user:
+        print(f"❌ User '{args.user}' not found in employees.csv")
+        return EXIT_USAGE
+
+    token = args.token or os.environ.get("LOGICLANCE_TOKEN")
+    if not verify_credentials(user, os.environ.get("LOGICLANCE_PASSWORD"), token, os.environ["CONFIG_ROOT"]):
+        print("❌ Authentication failed: set LOGICLANCE_PASSWORD, or LOGICLANCE_TOKEN / --token"
+              " (issued with 'token new' in the shell).")
+        return EXIT_USAGE
+    os.environ["LOGICLANCE_USER"] = user["name"]
+
+    commands_file = args.commands
+    if not args.flows and not commands_file and not sys.stdin.isatty():
+        commands_file = "-"
+    if not args.flows and not commands_file:
+        print("❌ Nothing to run: give flows, -c FILE or pipe commands on stdin.")
+        return EXIT_USAGE
+
+    # The flow machinery is only loaded once the login went through
+    from .commands import run_flow
+    from .flow_runner import DEFAULT_MAX_WORKERS
+    from .logiclance_terminal import dispatch_command
+
+    status = EXIT_OK
+    if args.flows:
+        tops = [t for t in args.top.split(",") if t] if args.top else None
+        if not run_flow(args.flows, max_workers=args.jobs or DEFAULT_MAX_WORKERS, force=args.force, tops=tops,
+                        executor=args.executor, preflight=not args.no_preflight):
+            status = EXIT_FAILED
+            if not args.keep_going:
+                return status
+
+    if commands_file:
+        try:
+            for cmd in read_commands(commands_file):
+                if cmd.split()[0] in ("exit", "quit"):
+                    break
+                print(f"▶️  {cmd}")
+                if not dispatch_command(cmd, args.project):
+                    status = EXIT_FAILED
+                    if not args.keep_going:
+                        break
+        except OSError as e:
+            print(f"❌ Could not read commands: {e}")
+            return EXIT_USAGE
+
+    return status
@@ -0,0 +1,179 @@
+import sys
+import signal
+import asyncio
+import readline
+from .jobs import BACKGROUND_COMMANDS, TAIL_LINES, JobManager, follow, install_output
+from .logiclance_terminal import dispatch_command
+
+
+def make_prompt_session():
+    """prompt_toolkit session with a job status bar, or None to fall back to input()."""
+    try:
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.history import InMemoryHistory
+    except ImportError:
+        return None
+    if not sys.stdin.isatty():
+        return None
+    history = InMemoryHistory()
+    for i in range(1, readline.get_current_history_length() + 1):
+        history.append_string(readline.get_history_item(i))
+    return PromptSession(history=history, refresh_interval=1)
+
+
+def job_toolbar(manager):
+    """Live status line: every running job, its runtime and its latest output line."""
+    running = manager.running()
+    if not running:
+        return None
+    return "  |  ".join(f"[{job.id}] {job.command.split()[0]} {job.elapsed:.0f}s: {job.last_line[:40]}" for job in running)
+
+
+async def read_command(session, prompt, manager):
+    if session:
+        from prompt_toolkit.formatted_text import ANSI
+        return await session.prompt_async(ANSI(prompt), bottom_toolbar=lambda: job_toolbar(manager))
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+async def job_command(manager, base_cmd, args):
+    """jobs, wait [%N], kill %N and tail %N [-n N] [-f]. Returns True when it succeeded."""
+    if base_cmd == "jobs":
+        if not manager.jobs:
+            print("ℹ️  No jobs")
+        for job in manager.jobs.values():
+            print(job.describe() + (f"\n      {job.last_line}" if job.status == "running" and job.last_line else ""))
+        return True
+
+    lines = TAIL_LINES
+    if base_cmd == "tail" and "-n" in args:
+        i = args.index("-n")
+        count = args[i + 1:i + 2]
+        if not count or not count[0].isdigit():
+            print("❌ Usage: tail %N [-n N] [-f]")
+            return False
+        lines = int(count[0])
+        args = args[:i] + args[i + 2:]
+
+    specs = [a for a in args if a.startswith("%") or a.isdigit()]
+    jobs = [manager.get(spec) for spec in specs]
+    if None in jobs:
+        print(f"❌ No such job: {specs[jobs.index(None)]}")
+        return False
+
+    if base_cmd == "wait":
+        # Each job reports itself when it ends
+        jobs = jobs or manager.running()
+        await manager.wait(jobs)
+        return all(job.status == "done" for job in jobs)
+    if not jobs:
+        print(f"❌ Usage: {base_cmd} %N")
+        return False
+    if base_cmd == "kill":
+        for job in jobs:
+            manager.kill(job)
+            print(f"🛑 Killing [{job.id}] {job.command}")
+        return True
+    if base_cmd == "tail":
+        if "-f" in args:
+            await follow(jobs[0], sys.stdout)
+            return True
+        sys.stdout.write("".join(manager.tail(jobs[0], lines)))
+        return True
+    return False
+
+
+def is_job_command(base_cmd, args):
+    # kill/tail with a %N job spec; plain 'kill 1234' or 'tail file' go to the system
+    if base_cmd in ("jobs", "wait"):
+        return True
+    return base_cmd in ("kill", "tail") and any(a.startswith("%") for a in args)
+
+
+async def shell_loop(project_name):
+    """Read commands without blocking on running jobs; flow commands and 'cmd &' run in the background."""
+    loop = asyncio.get_running_loop()
+    session = make_prompt_session()
+    if session:
+        from prompt_toolkit.patch_stdout import patch_stdout
+        # Job notices and background output are drawn above the prompt
+        patched = patch_stdout()
+        patched.__enter__()
+    console = sys.stdout
+    notices = []
+
+    def notify(message):
+        if session:
+            print(message)
+        else:
+            notices.append(message)
+
+    manager = JobManager(
+        lambda job_cmd, foreground: dispatch_command(job_cmd, project_name, interactive=foreground),
+        console,
+        notify,
+    )
+    foreground = []
+
+    def on_interrupt():
+        if foreground:
+            manager.kill(foreground[-1])
+        else:
+            console.write("\n(type 'exit' to quit)\n")
+
+    loop.add_signal_handler(signal.SIGINT, on_interrupt)
+    previous = install_output()
+    command_counter = 1
+    exit_warned = False
+    try:
+        while True:
+            for message in notices:
+                print(message)
+            notices.clear()
+            try:
+                cmd = (await read_command(session, f"\033[92mlogiclance:{command_counter}\033[0m> ", manager)).strip()
+            except KeyboardInterrupt:
+                continue
+            except EOFError:
+                cmd = "exit"
+            if not cmd:
+                continue
+            readline.add_history(cmd)
+
+            tokens = cmd.split()
+            if tokens[0] in ["exit", "quit"]:
+                running = manager.running()
+                if running and not exit_warned:
+                    print(f"⚠️ {len(running)} job(s) still running; 'exit' again kills them.")
+                    exit_warned = True
+                    continue
+                print("👋 Exiting Logic Lance shell. Goodbye!")
+                break
+            exit_warned = False
+
+            if is_job_command(tokens[0], tokens[1:]):
+                # A mistyped job command must not end the shell (and its jobs)
+                try:
+                    await job_command(manager, tokens[0], tokens[1:])
+                except Exception as e:
+                    print(f"❌ {cmd} failed: {e}")
+            elif cmd.endswith("&") or tokens[0] in BACKGROUND_COMMANDS:
+                background = cmd.rstrip("&").strip()
+                if background:
+                    manager.start(background)
+                else:
+                    print("❌ Usage: <command> &")
+            else:
+                job = manager.start(cmd, foreground=True)
+                foreground.append(job)
+                try:
+                    await asyncio.wait([job.task])
+                finally:
+                    foreground.remove(job)
+            command_counter += 1
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+        await loop.run_in_executor(None, manager.shutdown)
+        sys.stdout, sys.stderr = previous
+        if session:
+            patched.__exit__(None, None, None)
@@ -20,11 +20,7 @@ set order [split $::env(order) ","]
 if {[llength $order] == 0} {
     set order {
         "setup-session.tcl"
-        "designer-interface.tcl"
-        "read-design.tcl"
-        "constraints.tcl"
-        "compile.tcl"
-        "generate-results.tcl"
+        "synthesis.tcl"
     }
 }
 
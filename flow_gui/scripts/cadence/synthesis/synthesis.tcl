@@ -1,13 +1,28 @@
-puts "Enter the TOP module Name"
-gets stdin DESIGN
+# Top module is passed in by Logic Lance (DESIGN); prompt only when run by hand
+if {[info exists ::env(DESIGN)] && $::env(DESIGN) ne ""} {
+    set DESIGN $::env(DESIGN)
+} else {
+    puts "Enter the TOP module Name"
+    gets stdin DESIGN
+}
 
-set SYN_EFF high
+# Effort level; Logic Lance sweeps pass SYN_EFF (low/medium/high)
+if {[info exists ::env(SYN_EFF)] && $::env(SYN_EFF) ne ""} {
+    set SYN_EFF $::env(SYN_EFF)
+} else {
+    set SYN_EFF high
+}
 set DATE [clock format [clock seconds] -format "%b%d-%T"] 
 
-# Genus folders
-set LOG_PATH $LOG_PATH/synthesis/
-set OUTPUTS_PATH $OUTPUTS_PATH/synthesis/
-set REPORTS_PATH $REPORTS_PATH/synthesis/
+# Genus folders. Logic Lance gives every top (and sweep point) its own
+# OUTPUTS_PATH/REPORTS_PATH in the environment, so those win over the
+# project-wide values set by the setup scripts.
+foreach var {LOG_PATH OUTPUTS_PATH REPORTS_PATH} {
+    if {[info exists ::env($var)] && $::env($var) ne ""} {
+        set $var $::env($var)
+    }
+    set $var [set $var]/synthesis/
+}
 
 # Subdirectories
 set early_CD_report_path ${REPORTS_PATH}/Check_design/early
@@ -52,46 +67,112 @@ foreach dir [list \
 # Input Paths
 ##############################
 
+# Project input folders come from the environment when START.tcl sources this
+foreach var {RTL_PATH LIB_PATH LEF_PATH SDC_PATH} {
+    if {![info exists $var] && [info exists ::env($var)]} {
+        set $var $::env($var)
+    }
+}
+
+# Library corner; MAX_LIB/MIN_LIB may be names under LIB_PATH or absolute paths
 set SLOW_LIB $LIB_PATH/slow.lib
 set FAST_LIB $LIB_PATH/fast.lib
+if {[info exists ::env(MAX_LIB)] && $::env(MAX_LIB) ne ""} {
+    set SLOW_LIB [file join $LIB_PATH $::env(MAX_LIB)]
+}
+if {[info exists ::env(MIN_LIB)] && $::env(MIN_LIB) ne ""} {
+    set FAST_LIB [file join $LIB_PATH $::env(MIN_LIB)]
+}
 set LEF1 $LEF_PATH/gsclib045_tech.lef
 set LEF2 $LEF_PATH/gsclib045_macro.lef
 
-##############################
-# Load Libraries
-##############################
-
-read_libs -min_libs ${FAST_LIB} -max_libs ${SLOW_LIB}
-
-##############################
-# Load Design
-##############################
+# Checkpoints (read_db/write_db) let Logic Lance resume after syn_gen or syn_map.
+# RESUME_FROM is 'generic' or 'map' and RESUME_DB the checkpoint to load.
+set CHECKPOINT_PATH ${OUTPUTS_PATH}/checkpoints
+file mkdir $CHECKPOINT_PATH
+set RESUME_FROM ""
+if {[info exists ::env(RESUME_FROM)] && $::env(RESUME_FROM) ne ""} {
+    set RESUME_FROM $::env(RESUME_FROM)
+}
 
-if {[llength $RTL_PATH] == 0} {
-    puts "Error: No HDL files found or specified."
-    exit 1
-} else {
-    puts "Reading the following HDL files: $RTL_PATH"
-    foreach file $RTL_PATH {
-        puts "Processing file: $file"
-        if {[string match *.sv $file]} {
-            read_hdl -language sv $file
-        } else {
-            read_hdl $file
+if {$RESUME_FROM eq ""} {
+    ##############################
+    # Load Libraries
+    ##############################
+
+    read_libs -min_libs ${FAST_LIB} -max_libs ${SLOW_LIB}
+
+    ##############################
+    # Load Design
+    ##############################
+
+    if {[info exists ::env(FILELIST)] && [file exists $::env(FILELIST)]} {
+        # Filelist built by Logic Lance: +incdir+/+define+ lines, then sources in compile order
+        set incdirs {}
+        set define_args {}
+        set hdl_files {}
+        set fp [open $::env(FILELIST) r]
+        foreach line [split [read $fp] "\n"] {
+            set line [string trim $line]
+            if {$line eq "" || [string match "//*" $line]} {
+                continue
+            } elseif {[string match "+incdir+*" $line]} {
+                lappend incdirs [string range $line 8 end]
+            } elseif {[string match "+define+*" $line]} {
+                lappend define_args -define [string range $line 8 end]
+            } else {
+                lappend hdl_files $line
+            }
+        }
+        close $fp
+
+        set_db init_hdl_search_path $incdirs
+        puts "Reading [llength $hdl_files] HDL files from $::env(FILELIST)"
+        foreach file $hdl_files {
+            if {[string match *.vhd* $file]} {
+                read_hdl -vhdl $file
+            } elseif {[string match *.sv $file]} {
+                read_hdl -language sv {*}$define_args $file
+            } else {
+                read_hdl {*}$define_args $file
+            }
+        }
+    } elseif {[llength $RTL_PATH] == 0} {
+        puts "Error: No HDL files found or specified."
+        exit 1
+    } else {
+        puts "Reading the following HDL files: $RTL_PATH"
+        foreach file $RTL_PATH {
+            puts "Processing file: $file"
+            if {[string match *.sv $file]} {
+                read_hdl -language sv $file
+            } else {
+                read_hdl $file
+            }
         }
     }
-}
 
-puts "Elaborating Design"
-elaborate $DESIGN
-puts "Runtime & Memory after 'read_hdl'"
+    puts "Elaborating Design"
+    elaborate $DESIGN
+    puts "Runtime & Memory after 'read_hdl'"
 
-check_design 
-check_design -all > ${early_CD_report_path}/all_CD.rpt
+    check_design 
+    check_design -all > ${early_CD_report_path}/all_CD.rpt
 
-uniquify $DESIGN -verbose
+    uniquify $DESIGN -verbose
+} else {
+    puts "Resuming from '$RESUME_FROM' checkpoint: $::env(RESUME_DB)"
+    read_db $::env(RESUME_DB)
+    # Constraints may have changed since the checkpoint was written
+    reset_design
+}
 
-read_sdc ${SDC_PATH}/${DESIGN}_Constraints.sdc
+# SDC variant; SDC_FILE may be a name under SDC_PATH or an absolute path
+if {[info exists ::env(SDC_FILE)] && $::env(SDC_FILE) ne ""} {
+    read_sdc [file join $SDC_PATH $::env(SDC_FILE)]
+} else {
+    read_sdc ${SDC_PATH}/${DESIGN}_Constraints.sdc
+}
 
 path_adjust -from [all_inputs] -to [all_registers] -delay -1500 -name PA_I2O
 path_adjust -from [all_inputs] -to [all_outputs] -delay -1500 -name PA_I2C
@@ -104,38 +185,46 @@ report timing -lint -verbose > ${early_TL_report_path}/all_TL.rpt
 # Synthesize Design - Generic
 ##############################
 
-set_db syn_generic_effort $SYN_EFF
-syn_gen
-puts "Runtime & Memory after 'syn_gen'"
-time_info GENERIC
+if {$RESUME_FROM eq ""} {
+    set_db syn_generic_effort $SYN_EFF
+    syn_gen
+    puts "Runtime & Memory after 'syn_gen'"
+    time_info GENERIC
 
-report_dp > $generic_report_path/${DESIGN}_datapath.rpt
-write_snapshot -directory $generic_report_path -tag generic
-report_summary -directory $generic_report_path
-write_hdl > ${OUTPUTS_PATH}/${DESIGN}_generic.v
-write_sdc > ${OUTPUTS_PATH}/${DESIGN}_generic.sdc
+    report_dp > $generic_report_path/${DESIGN}_datapath.rpt
+    write_snapshot -directory $generic_report_path -tag generic
+    report_summary -directory $generic_report_path
+    write_hdl > ${OUTPUTS_PATH}/${DESIGN}_generic.v
+    write_sdc > ${OUTPUTS_PATH}/${DESIGN}_generic.sdc
+
+    write_db -to_file ${CHECKPOINT_PATH}/${DESIGN}_generic.db
+}
 
 ##############################
 # Synthesize Design - Map Gates
 ##############################
 
-set_db syn_map_effort $SYN_EFF
-syn_map
-puts "Runtime & Memory after 'syn_map'"
-time_info MAPPED
-
-report_dp > $map_report_path/${DESIGN}_datapath.rpt
-write_snapshot -directory $map_report_path -tag map
-report_summary -directory $map_report_path
-write_hdl > ${OUTPUTS_PATH}/${DESIGN}_map.v
-write_sdc > ${OUTPUTS_PATH}/${DESIGN}_map.sdc
-
-write_do_lec -golden_design rtl \
-             -revised_design ${OUTPUTS_PATH}/${DESIGN}_map.v \
-             -checkpoint ${OUTPUTS_PATH}/${DESIGN}_check_point.ckp \
-             -no_exit \
-             -verbose \
-             -logfile ${LEC_LOG_PATH}/rtl_to_map.lec.log > ${LEC_PATH}/rtl_to_map.lec.do
+if {$RESUME_FROM ne "map"} {
+    set_db syn_map_effort $SYN_EFF
+    syn_map
+    puts "Runtime & Memory after 'syn_map'"
+    time_info MAPPED
+
+    report_dp > $map_report_path/${DESIGN}_datapath.rpt
+    write_snapshot -directory $map_report_path -tag map
+    report_summary -directory $map_report_path
+    write_hdl > ${OUTPUTS_PATH}/${DESIGN}_map.v
+    write_sdc > ${OUTPUTS_PATH}/${DESIGN}_map.sdc
+
+    write_do_lec -golden_design rtl \
+                 -revised_design ${OUTPUTS_PATH}/${DESIGN}_map.v \
+                 -checkpoint ${OUTPUTS_PATH}/${DESIGN}_check_point.ckp \
+                 -no_exit \
+                 -verbose \
+                 -logfile ${LEC_LOG_PATH}/rtl_to_map.lec.log > ${LEC_PATH}/rtl_to_map.lec.do
+
+    write_db -to_file ${CHECKPOINT_PATH}/${DESIGN}_map.db
+}
 
 ##############################
 # Optimize Netlist
@@ -172,7 +261,7 @@ report timing -lint -verbose > ${late_TL_report_path}/all_TL.rpt
 
 write_sdf -version 2.1 -recrem split -setuphold merge_when_paired -edges check_edge > ${OUTPUTS_PATH}/${DESIGN}.sdf
 
-write_tempus -libs ${LIB_PATH}/${SLOW_LIB} \
+write_tempus -libs ${SLOW_LIB} \
              -netlist ${OUTPUTS_PATH}/${DESIGN}_netlist.v \
              -no_exit \
              -sdf ${OUTPUTS_PATH}/${DESIGN}.sdf \
@@ -186,5 +275,10 @@ puts "============================"
 puts "Synthesis Finished ........."
 puts "============================"
 
-file rename genus.cmd ${LOG_PATH}/genus_${DATE}.cmd     
-file rename genus.log ${LOG_PATH}/genus_${DATE}.log
+# Logic Lance launches genus with -log, so these only exist for manual runs
+if {[file exists genus.cmd]} {
+    file rename genus.cmd ${LOG_PATH}/genus_${DESIGN}_${DATE}.cmd
+}
+if {[file exists genus.log]} {
+    file rename genus.log ${LOG_PATH}/genus_${DESIGN}_${DATE}.log
+}
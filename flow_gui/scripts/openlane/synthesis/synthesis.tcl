@@ -1,11 +1,58 @@
 set RTL_PATH $::env(RTL_PATH)
 set LIB_PATH $::env(LIB_PATH)
-set OUTPUTS_PATH $::env(OUTPUTS_PATH)
+# Per-top OUTPUTS_PATH/REPORTS_PATH from Logic Lance; the Tcl values when run by hand
+foreach var {OUTPUTS_PATH REPORTS_PATH} {
+    if {[info exists ::env($var)] && $::env($var) ne ""} {
+        set $var $::env($var)
+    }
+    set $var [set $var]/synthesis
+    file mkdir [set $var]
+}
 
-puts "Enter top design name:"
-set TOP_NAME [gets stdin]
+# Top module is passed in by Logic Lance (DESIGN); prompt only when run by hand
+if {[info exists ::env(DESIGN)] && $::env(DESIGN) ne ""} {
+    set TOP_NAME $::env(DESIGN)
+} else {
+    puts "Enter top design name:"
+    set TOP_NAME [gets stdin]
+}
 
-read_verilog -sv $RTL_PATH/*.sv
+# Library corner; MAX_LIB/MIN_LIB may be names under LIB_PATH or absolute paths
+set MAX_LIB $LIB_PATH/slow.lib
+set MIN_LIB $LIB_PATH/fast.lib
+if {[info exists ::env(MAX_LIB)] && $::env(MAX_LIB) ne ""} {
+    set MAX_LIB [file join $LIB_PATH $::env(MAX_LIB)]
+}
+if {[info exists ::env(MIN_LIB)] && $::env(MIN_LIB) ne ""} {
+    set MIN_LIB [file join $LIB_PATH $::env(MIN_LIB)]
+}
+
+if {[info exists ::env(FILELIST)] && [file exists $::env(FILELIST)]} {
+    # Filelist built by Logic Lance: +incdir+/+define+ lines, then sources in compile order
+    set read_args {}
+    set hdl_files {}
+    set fp [open $::env(FILELIST) r]
+    foreach line [split [read $fp] "\n"] {
+        set line [string trim $line]
+        if {$line eq "" || [string match "//*" $line]} {
+            continue
+        } elseif {[string match "+incdir+*" $line]} {
+            lappend read_args -I[string range $line 8 end]
+        } elseif {[string match "+define+*" $line]} {
+            lappend read_args -D[string range $line 8 end]
+        } elseif {[string match *.vhd* $line]} {
+            puts "Warning: skipping VHDL file $line"
+        } else {
+            lappend hdl_files $line
+        }
+    }
+    close $fp
+    foreach file $hdl_files {
+        read_verilog -sv {*}$read_args $file
+    }
+} else {
+    read_verilog -sv $RTL_PATH/*.sv
+}
 hierarchy -check -top $TOP_NAME
 proc
 opt
@@ -13,10 +60,11 @@ fsm
 opt
 memory
 opt
-read_liberty -ignore_miss_func $LIB_PATH/slow.lib 
-read_liberty -overwrite -ignore_miss_func $LIB_PATH/fast.lib 
+read_liberty -ignore_miss_func $MAX_LIB
+read_liberty -overwrite -ignore_miss_func $MIN_LIB
 techmap
 opt
-abc -liberty $LIB_PATH/slow.lib -script +strash;dretime;dch;-f;map,-D 1000
+abc -liberty $MAX_LIB -script +strash;dretime;dch;-f;map,-D 1000
 clean
+tee -o $REPORTS_PATH/${TOP_NAME}_stat.rpt stat -liberty $MAX_LIB
 write_verilog -noattr -sv -output $OUTPUTS_PATH/$TOP_NAME.v
@@ -1,13 +1,78 @@
-import csv
+import os
+import hmac
+import json
+import time
 import hashlib
+import secrets
+from .user_index import password_hash
+
+# Batch tokens issued with the shell's 'token new', next to employees.csv.
+# Only sha256 of each token is stored; the token itself is shown once.
+TOKEN_FILE = "batch_tokens.json"
 
 def authenticate_user(username, password):
     try:
-        with open("employee_details.csv", "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row["name"].strip().lower() == username.lower():
-                    return row["password"] == hashlib.sha256(password.encode()).hexdigest()
+        stored = password_hash("employee_details.csv", username)
+        if stored:
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
     except Exception as e:
         print(f"⚠️ Auth error: {e}")
     return False
+
+
+def token_path(config_root=None):
+    return os.path.join(config_root or os.environ.get("CONFIG_ROOT", ""), TOKEN_FILE)
+
+
+def employees_path(config_root=None):
+    return os.path.join(config_root or os.environ.get("CONFIG_ROOT", ""), "employees.csv")
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.strip().encode()).hexdigest()
+
+
+def _load_tokens(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_tokens(path, tokens):
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(tokens, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def issue_token(username, config_root=None):
+    """Create a new batch token for username (replacing any older one) and return it."""
+    token = secrets.token_urlsafe(32)
+    path = token_path(config_root)
+    tokens = _load_tokens(path)
+    tokens[username] = {"sha256": _token_hash(token), "created": time.time()}
+    _save_tokens(path, tokens)
+    return token
+
+
+def revoke_token(username, config_root=None):
+    """Drop username's batch token; False if there was none."""
+    path = token_path(config_root)
+    tokens = _load_tokens(path)
+    if tokens.pop(username, None) is None:
+        return False
+    _save_tokens(path, tokens)
+    return True
+
+
+def verify_credentials(user, password=None, token=None, config_root=None):
+    """Non-interactive login with a plain password or a 'token new' batch token, never the password hash."""
+    if token:
+        entry = _load_tokens(token_path(config_root)).get(user.get("name", ""))
+        return bool(entry) and hmac.compare_digest(_token_hash(token), entry.get("sha256", ""))
+    if password:
+        stored = password_hash(employees_path(config_root), user.get("name", ""))
+        return bool(stored) and hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    return False
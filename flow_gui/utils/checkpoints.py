@@ -0,0 +1,57 @@
+import os
+import json
+
+# Checkpoints written by the synthesis scripts (write_db), in flow order
+CHECKPOINT_STEPS = ("generic", "map")
+MANIFEST_FILE = "manifest.json"
+
+
+def checkpoint_dir(env, flow):
+    """Where the flow's scripts write <DESIGN>_<step>.db (OUTPUTS_PATH/<flow>/checkpoints)."""
+    return os.path.join(env["OUTPUTS_PATH"], flow, "checkpoints")
+
+
+def load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def checkpoint_mtimes(directory, design):
+    """{step: mtime} of the design's checkpoint files that exist right now."""
+    mtimes = {}
+    for step in CHECKPOINT_STEPS:
+        try:
+            mtimes[step] = os.stat(os.path.join(directory, f"{design}_{step}.db")).st_mtime_ns
+        except OSError:
+            pass
+    return mtimes
+
+
+def record_checkpoints(directory, design, digest, before):
+    """Tag the checkpoints written since the before snapshot (checkpoint_mtimes) with digest."""
+    manifest = load_manifest(directory)
+    for step, mtime in checkpoint_mtimes(directory, design).items():
+        if before.get(step) != mtime:
+            path = os.path.join(directory, f"{design}_{step}.db")
+            manifest.setdefault(design, {})[step] = {"path": path, "digest": digest, "written": mtime / 1e9}
+
+    if manifest:
+        tmp_path = os.path.join(directory, MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(directory, MANIFEST_FILE))
+    return manifest
+
+
+def find_checkpoint(directory, design, digest, step="auto"):
+    """(step, path) of a checkpoint of the same design inputs, or (None, None); "auto" picks the latest."""
+    entries = load_manifest(directory).get(design, {})
+    steps = reversed(CHECKPOINT_STEPS) if step == "auto" else [step]
+    for name in steps:
+        entry = entries.get(name)
+        if entry and entry["digest"] == digest and os.path.exists(entry["path"]):
+            return name, entry["path"]
+    return None, None
@@ -10,15 +10,11 @@ def create_cli_symlink():
 
     repo_root = Path(__file__).resolve().parents[2]
     cli_script = repo_root / "flow_gui" / "main.py"
-    configs_dir = repo_root / "flow_gui" / "configs"
+    launcher = repo_root / "tools" / "bin" / "logiclance"
     symlink_path = bin_dir / "logiclance"
 
-    # Find a launch.sh script if present
-    launch_scripts = list(configs_dir.glob("*.sh"))
-    launch_script = launch_scripts[0] if launch_scripts else None
-
-    if not cli_script.exists():
-        print(f"CLI script not found at {cli_script}")
+    if not cli_script.exists() or not launcher.exists():
+        print(f"CLI script not found at {cli_script} / {launcher}")
         return
 
     python_exec = shutil.which("python3")
@@ -26,12 +22,14 @@ def create_cli_symlink():
         print("python3 not found in PATH")
         return
 
-    # Write wrapper script
+    # Write wrapper script. tools/bin/logiclance finds the project's .env and the
+    # launch_sh_path entries of configs/projects/<project>/config.json and hands them
+    # to the CLI in LOGICLANCE_ENV_SCRIPTS; the CLI applies their cached env manifests.
     with open(symlink_path, "w") as f:
         f.write("#!/bin/bash\n")
-        if launch_script:
-            f.write(f"source \"{launch_script}\"\n")
-        f.write(f"\"{python_exec}\" \"{cli_script}\" \"$@\"\n")
+        f.write(f"export LOGICLANCE_ROOT=\"${{LOGICLANCE_ROOT:-{repo_root}}}\"\n")
+        f.write(f"export LOGICLANCE_PYTHON=\"{python_exec}\"\n")
+        f.write(f"exec \"{launcher}\" \"$@\"\n")
 
     symlink_path.chmod(symlink_path.stat().st_mode | stat.S_IEXEC)
     print(f"CLI command 'logiclance' created at {symlink_path}")
@@ -1,9 +1,17 @@
 import os
 import json
+import time
+import threading
+from dataclasses import dataclass, field
+from .tracing import span
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_DIR = os.path.join(BASE_DIR, "..", "configs")
 
+# Minimum seconds between two stat() calls on the same config file
+STAT_INTERVAL = 1.0
+
+
 def load_setup_config():
     config_path = os.path.join(CONFIG_DIR, "setup_config.json")
     with open(config_path) as f:
@@ -13,3 +21,167 @@ def load_flow_config():
     config_path = os.path.join(CONFIG_DIR, "flow_config.json")
     with open(config_path) as f:
         return json.load(f)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ToolConfig:
+    tool: str
+    launch_sh_path: str = ""
+
+    @property
+    def names(self):
+        return [t.strip().lower() for t in self.tool.split(",") if t.strip()]
+
+
+@dataclass(frozen=True)
+class ProjectConfig:
+    path: str
+    eda_tool: str
+    tool_config: tuple
+    raw: dict = field(repr=False)
+
+    def has_tool(self, tool_name):
+        return any(tool_name.lower() in entry.names for entry in self.tool_config)
+
+    def configured_tools(self):
+        return [name for entry in self.tool_config for name in entry.names]
+
+    def launch_script(self, tool_name):
+        """launch_sh_path of the tool_config entry for tool_name ("" if none)."""
+        for entry in self.tool_config:
+            if tool_name.lower() in entry.names and entry.launch_sh_path:
+                return entry.launch_sh_path
+        return ""
+
+
+@dataclass(frozen=True)
+class FlowTool:
+    name: str
+    tool: str
+    version: str
+    script: str
+
+
+@dataclass(frozen=True)
+class FlowDefinition:
+    name: str
+    tools: dict
+    dependencies: tuple = ()
+    order: tuple = ()
+    alias_for: tuple = ()
+    raw: dict = field(default_factory=dict, repr=False)
+
+
+@dataclass(frozen=True)
+class FlowSetup:
+    path: str
+    flows: dict
+    raw: dict = field(repr=False)
+
+
+def _parse_project_config(path, data):
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: top level must be an object")
+
+    tool_config = []
+    for entry in data.get("tool_config", []):
+        if not isinstance(entry, dict) or not isinstance(entry.get("tool"), str):
+            raise ConfigError(f"{path}: every tool_config entry needs a 'tool' name")
+        tool_config.append(ToolConfig(entry["tool"], entry.get("launch_sh_path", "")))
+
+    return ProjectConfig(
+        path=path,
+        eda_tool=str(data.get("eda_tool", "")).lower(),
+        tool_config=tuple(tool_config),
+        raw=data,
+    )
+
+
+def _parse_flow_setup(path, data):
+    flows_data = data.get("flows") if isinstance(data, dict) else None
+    if not isinstance(flows_data, dict):
+        raise ConfigError(f"{path}: missing 'flows' object")
+
+    flows = {}
+    for name, flow in flows_data.items():
+        tools = {}
+        for vendor, info in flow.get("tools", {}).items():
+            if "tool" not in info or "script" not in info:
+                raise ConfigError(f"{path}: flow '{name}' tool '{vendor}' needs 'tool' and 'script'")
+            tools[vendor] = FlowTool(vendor, info["tool"], str(info.get("version", "")), info["script"])
+        flows[name] = FlowDefinition(
+            name=name,
+            tools=tools,
+            dependencies=tuple(flow.get("dependencies", [])),
+            order=tuple(flow.get("order", [])),
+            alias_for=tuple(flow.get("alias_for", [])),
+            raw=flow,
+        )
+
+    for flow in flows.values():
+        sweep = flow.raw.get("sweep", {})
+        if not isinstance(sweep, dict) or not all(isinstance(v, (list, dict)) and v for v in sweep.values()):
+            raise ConfigError(f"{path}: flow '{flow.name}' sweep must map names to non-empty lists or objects")
+        for ref in flow.dependencies + flow.alias_for:
+            if ref not in flows:
+                raise ConfigError(f"{path}: flow '{flow.name}' refers to unknown flow '{ref}'")
+
+    for feature, spec in data.get("licenses", {}).items():
+        if not isinstance(spec, dict) or not isinstance(spec.get("count", 1), int) or spec.get("count", 1) < 1:
+            raise ConfigError(f"{path}: license '{feature}' needs a positive integer 'count'")
+
+    return FlowSetup(path=path, flows=flows, raw=data)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _load_cached(path, parser):
+    """Parse a JSON config once and reuse it until its inode, mtime or size changes."""
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached and now - cached["checked"] < STAT_INTERVAL:
+        return cached["value"]
+
+    st = os.stat(path)
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if cached and cached["key"] == key:
+        cached["checked"] = now
+        return cached["value"]
+
+    # Only a real parse is traced; cache hits are too cheap to show up
+    with span("config.load", path=path):
+        with open(path, "r") as f:
+            value = parser(path, json.load(f))
+    with _cache_lock:
+        _cache[path] = {"key": key, "checked": now, "value": value}
+    return value
+
+
+def get_project_config(config_root=None):
+    """Return the ProjectConfig for $CONFIG_ROOT/config.json."""
+    config_root = config_root or os.environ.get("CONFIG_ROOT")
+    if not config_root:
+        raise ConfigError("CONFIG_ROOT environment variable not set.")
+    return _load_cached(os.path.join(config_root, "config.json"), _parse_project_config)
+
+
+def get_flow_setup(logiclance_root=None):
+    """Return the FlowSetup for $LOGICLANCE_ROOT/configs/flow_setup.json."""
+    logiclance_root = logiclance_root or os.environ.get("LOGICLANCE_ROOT")
+    if not logiclance_root:
+        raise ConfigError("LOGICLANCE_ROOT environment variable not set.")
+    return _load_cached(
+        os.path.join(logiclance_root, "configs", "flow_setup.json"), _parse_flow_setup
+    )
+
+
+def clear_config_cache():
+    with _cache_lock:
+        _cache.clear()
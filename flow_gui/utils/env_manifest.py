@@ -0,0 +1,191 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import subprocess
+from .paths import user_cache_dir
+from .tracing import span
+
+MANIFEST_VERSION = 1
+# Manifests kept per launch script; older ones (an edited script, a changed PATH) are removed
+MAX_MANIFESTS = 4
+
+# Caller variables a launch script can build on. Only these, license settings and the
+# variables the script itself references reach bash, and only they are hashed into
+# the cache key, so per-login values (SSH_AUTH_SOCK, DISPLAY, ...) and variables the
+# shell sets later (FILELIST, MAX_LIB, ...) do not invalidate the manifest.
+BASE_VARS = (
+    "PATH", "LD_LIBRARY_PATH", "HOME", "USER", "LOGNAME", "SHELL", "LANG", "TMPDIR",
+    "MODULESHOME", "MODULEPATH", "LOADEDMODULES", "_LMFILES_",
+)
+# LM_LICENSE_FILE, CDSLMD_LICENSE_FILE, SNPSLMD_LICENSE_FILE, CDS_LIC_FILE, ...
+LICENSE_VAR_RE = re.compile(r"LICENSE|_LIC_")
+VAR_REF_RE = re.compile(r"\$\{?([A-Za-z_][A-Za-z0-9_]*)")
+# 'unset A B' drops variables the script never expands
+UNSET_RE = re.compile(r"\bunset\s+(?:-v\s+)?([A-Za-z_][A-Za-z0-9_ \t]*)")
+
+# Set by bash itself: never part of what a script exports
+VOLATILE_VARS = ("_", "PWD", "OLDPWD", "SHLVL")
+
+# Read the environment back NUL-separated so values may hold newlines.
+# The script's own output goes to stderr to keep stdout for env.
+SOURCE_CMD = 'source "$1" >&2 </dev/null; exec env -0'
+
+
+def _stable(env):
+    return {k: v for k, v in env.items() if k not in VOLATILE_VARS}
+
+
+def base_env(script, env):
+    """The part of env the script can depend on: BASE_VARS, license variables and what it references."""
+    with open(script, "r", errors="replace") as f:
+        text = f.read()
+    referenced = set(VAR_REF_RE.findall(text))
+    referenced.update(name for names in UNSET_RE.findall(text) for name in names.split())
+    return _stable({
+        k: v for k, v in env.items()
+        if k in BASE_VARS or k in referenced or LICENSE_VAR_RE.search(k) or k.startswith("BASH_FUNC_")
+    })
+
+
+def manifest_key(script, env):
+    """sha1 over the script's path and content plus the part of env it is sourced into."""
+    digest = hashlib.sha1(script.encode())
+    with open(script, "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps(base_env(script, env), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _source(script, env):
+    proc = subprocess.run(
+        ["/bin/bash", "-c", SOURCE_CMD, "logiclance", script],
+        env=env,
+        # bash reads ~/.bashrc even for -c when its stdin is a socket (ssh, rsh)
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if proc.stderr:
+        sys.stderr.write(proc.stderr.decode(errors="replace"))
+    after = {}
+    for entry in proc.stdout.split(b"\0"):
+        key, sep, value = entry.decode(errors="replace").partition("=")
+        if sep and key:
+            after[key] = value
+    return after
+
+
+def compile_manifest(script, env):
+    """Source script once on top of base_env(env) and return what it changed: {"set": {...}, "unset": [...]}."""
+    before = base_env(script, env)
+    after = _stable(_source(script, before))
+    return {
+        "set": {k: v for k, v in after.items() if before.get(k) != v},
+        "unset": sorted(k for k in before if k not in after),
+    }
+
+
+def _write(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def _evict(cache_dir, script_id, keep=MAX_MANIFESTS):
+    """Remove all but the keep newest manifests of one script."""
+    entries = [e for e in os.scandir(cache_dir) if e.name.startswith(script_id + "-") and e.name.endswith(".json")]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def read_manifest(path):
+    """A manifest file written by load_manifest or write_manifest, or None if unusable."""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(path, values):
+    """Write a manifest that just sets values (no script to source)."""
+    _write(path, {"version": MANIFEST_VERSION, "set": dict(values), "unset": []})
+
+
+def load_manifest(script, env=None, refresh=False):
+    """Env diff of sourcing a launch script into env (default os.environ), cached per script and base env.
+
+    Scripts it sources in turn are not part of the key: use refresh=True
+    (or LOGICLANCE_ENV_REFRESH=1) after editing those.
+    """
+    env = dict(os.environ if env is None else env)
+    script = os.path.abspath(os.path.expanduser(script))
+    script_id = hashlib.sha1(script.encode()).hexdigest()[:12]
+    cache_dir = user_cache_dir("env")
+    cache_file = os.path.join(cache_dir, f"{script_id}-{manifest_key(script, env)}.json")
+    refresh = refresh or env.get("LOGICLANCE_ENV_REFRESH") == "1"
+
+    with span("env.manifest", script=script) as s:
+        manifest = None if refresh else read_manifest(cache_file)
+        s.set(cached=manifest is not None)
+        if manifest is None:
+            manifest = {"version": MANIFEST_VERSION, "script": script, "created": time.time()}
+            manifest.update(compile_manifest(script, env))
+            try:
+                _write(cache_file, manifest)
+                _evict(cache_dir, script_id)
+            except OSError:
+                pass
+    return manifest
+
+
+def apply_manifest(manifest, env=None):
+    """Apply a manifest to env (default os.environ) in place and return it."""
+    env = os.environ if env is None else env
+    for key in manifest.get("unset", []):
+        env.pop(key, None)
+    env.update(manifest.get("set", {}))
+    return env
+
+
+def apply_env_scripts(scripts=None, env=None):
+    """Apply the manifests of scripts (default LOGICLANCE_ENV_SCRIPTS); returns the scripts that could not be read."""
+    env = os.environ if env is None else env
+    if scripts is None:
+        scripts = [s for s in env.get("LOGICLANCE_ENV_SCRIPTS", "").split(os.pathsep) if s]
+    missing = []
+    for script in scripts:
+        try:
+            apply_manifest(load_manifest(script, env), env)
+        except OSError:
+            missing.append(script)
+    return missing
+
+
+def project_manifest_path(project_root, project_name):
+    """Manifest written next to .env_<project>.sh by the setup GUI."""
+    return os.path.join(project_root, f".env_{project_name}.json")
+
+
+def apply_project_env(logiclance_root, project_name, env=None):
+    """Fill in the project's paths from its manifest; variables already set win. Returns the manifest path or None."""
+    env = os.environ if env is None else env
+    path = project_manifest_path(os.path.join(logiclance_root, "projects", project_name), project_name)
+    manifest = read_manifest(path)
+    if manifest is None:
+        return None
+    for key, value in manifest.get("set", {}).items():
+        env.setdefault(key, value)
+    return path
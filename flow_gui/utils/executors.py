@@ -0,0 +1,229 @@
+import os
+import re
+import sys
+import time
+import subprocess
+from abc import ABC, abstractmethod
+from .process_runner import current_cancel, rotate_log, run_streaming
+from .tracing import span
+
+POLL_INTERVAL = 10
+# Polls in a row the scheduler may not know a job before it is given up as lost
+# (sacct can lag behind a fresh submission; bjobs forgets jobs after CLEAN_PERIOD)
+MISSING_POLLS = 6
+# Exit code reported for a job cancelled from the shell (as for SIGTERM)
+CANCELLED_EXIT = 143
+
+
+class LocalExecutor:
+    """Run the stage as a child process of this shell."""
+
+    name = "local"
+
+    def __init__(self, settings=None):
+        self.settings = settings or {}
+
+    def run(self, job_name, cmd, log_path, env, on_line=None, prefix="", stdin=None):
+        return run_streaming(cmd, log_path, env=env, on_line=on_line, prefix=prefix, stdin=stdin)
+
+
+class BatchExecutor(ABC):
+    """Base for batch-scheduler backends: submit a job script, then poll it and follow its output."""
+
+    name = None
+    commands = {}
+
+    def __init__(self, settings=None):
+        self.settings = settings or {}
+        self.poll_interval = float(self.settings.get("poll_interval", POLL_INTERVAL))
+        self.missing_polls = int(self.settings.get("missing_polls", MISSING_POLLS))
+
+    def command(self, key):
+        return self.settings.get(key, self.commands[key])
+
+    def write_job_script(self, job_name, cmd, log_path):
+        script_path = os.path.join(os.path.dirname(log_path), f"{job_name}.job.sh")
+        with open(script_path, "w") as f:
+            f.write("#!/bin/bash\n")
+            f.write(f"cd {subprocess.list2cmdline([os.getcwd()])}\n")
+            f.write(f"{cmd}\n")
+        os.chmod(script_path, 0o755)
+        return script_path
+
+    @abstractmethod
+    def submit_args(self, job_name, script_path, log_path):
+        """argv that submits script_path and sends its output to log_path."""
+
+    @abstractmethod
+    def parse_job_id(self, output):
+        """Job id from the submit command's output, or None."""
+
+    @abstractmethod
+    def job_state(self, job_id):
+        """Return (finished, exit_code) for a submitted job, or None when the scheduler does not know it."""
+
+    @abstractmethod
+    def cancel_args(self, job_id):
+        """argv that cancels the job."""
+
+    def cancel(self, job_id):
+        subprocess.run(self.cancel_args(job_id), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def run(self, job_name, cmd, log_path, env, on_line=None, prefix="", stdin=None):
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        rotate_log(log_path)
+        script_path = self.write_job_script(job_name, cmd, log_path)
+
+        # The job inherits the stage environment from the submitting process
+        with span("batch.submit", executor=self.name, job=job_name) as s:
+            result = subprocess.run(
+                self.submit_args(job_name, script_path, log_path),
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+            output = result.stdout.decode(errors="replace")
+            job_id = self.parse_job_id(output) if result.returncode == 0 else None
+            s.set(job_id=job_id)
+        if not job_id:
+            print(f"❌ {self.name} submission of {job_name} failed: {output.strip()}")
+            return result.returncode or 1
+        print(f"{prefix}📤 Submitted {job_name} to {self.name} as job {job_id}")
+
+        offset = 0
+        pending = b""
+        missing = 0
+        token = current_cancel.get()
+        # Covers the time the job waits in the batch queue as well as its run
+        with span("batch.wait", executor=self.name, job_id=job_id) as s:
+            try:
+                while True:
+                    state = self.job_state(job_id)
+                    missing = missing + 1 if state is None else 0
+                    finished, exit_code = state or (False, None)
+                    if missing >= self.missing_polls:
+                        print(f"{prefix}❌ {self.name} job {job_id} is no longer known to the scheduler")
+                        finished, exit_code = True, 1
+                    offset, pending = self._follow(log_path, offset, pending, on_line, prefix)
+                    if finished:
+                        if pending:
+                            self._emit(pending, on_line, prefix)
+                        s.set(exit_code=exit_code)
+                        return exit_code
+                    if token and token.wait(self.poll_interval):
+                        self.cancel(job_id)
+                        print(f"{prefix}🛑 Cancelled {self.name} job {job_id}")
+                        s.set(cancelled=True)
+                        return CANCELLED_EXIT
+                    if not token:
+                        time.sleep(self.poll_interval)
+            except BaseException:
+                self.cancel(job_id)
+                raise
+
+    def _follow(self, log_path, offset, pending, on_line, prefix):
+        try:
+            with open(log_path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return offset, pending
+        data = pending + chunk
+        *lines, rest = data.split(b"\n")
+        for raw in lines:
+            self._emit(raw, on_line, prefix)
+        return offset + len(chunk), rest
+
+    def _emit(self, raw, on_line, prefix):
+        line = raw.decode(errors="replace")
+        sys.stdout.write(prefix + line + "\n")
+        sys.stdout.flush()
+        if on_line:
+            on_line("stdout", line)
+
+
+class LsfExecutor(BatchExecutor):
+    name = "lsf"
+    commands = {"bsub": "bsub", "bjobs": "bjobs", "bkill": "bkill"}
+    JOB_ID_RE = re.compile(r"Job <(\d+)> is submitted")
+
+    def submit_args(self, job_name, script_path, log_path):
+        args = [self.command("bsub"), "-J", job_name, "-o", log_path]
+        if self.settings.get("queue"):
+            args += ["-q", self.settings["queue"]]
+        return args + list(self.settings.get("options", [])) + [script_path]
+
+    def parse_job_id(self, output):
+        match = self.JOB_ID_RE.search(output)
+        return match.group(1) if match else None
+
+    def job_state(self, job_id):
+        result = subprocess.run(
+            [self.command("bjobs"), "-noheader", "-o", "stat exit_code", job_id],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        fields = result.stdout.decode(errors="replace").split()
+        if not fields:
+            return None
+        if fields[0] == "DONE":
+            return True, 0
+        if fields[0] == "EXIT":
+            code = fields[1] if len(fields) > 1 and fields[1].isdigit() else "1"
+            return True, int(code)
+        return False, None
+
+    def cancel_args(self, job_id):
+        return [self.command("bkill"), job_id]
+
+
+class SlurmExecutor(BatchExecutor):
+    name = "slurm"
+    commands = {"sbatch": "sbatch", "sacct": "sacct", "scancel": "scancel"}
+    DONE_STATES = ("COMPLETED", "FAILED", "CANCELLED", "TIMEOUT", "OUT_OF_MEMORY", "NODE_FAIL", "PREEMPTED")
+
+    def submit_args(self, job_name, script_path, log_path):
+        args = [self.command("sbatch"), "--parsable", "-J", job_name, "-o", log_path]
+        if self.settings.get("partition"):
+            args += ["-p", self.settings["partition"]]
+        return args + list(self.settings.get("options", [])) + [script_path]
+
+    def parse_job_id(self, output):
+        first = output.strip().splitlines()[-1] if output.strip() else ""
+        job_id = first.split(";")[0]
+        return job_id if job_id.isdigit() else None
+
+    def job_state(self, job_id):
+        result = subprocess.run(
+            [self.command("sacct"), "-n", "-P", "-X", "-j", job_id, "-o", "State,ExitCode"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        line = result.stdout.decode(errors="replace").strip().splitlines()
+        if not line:
+            return None
+        state, _, exit_code = line[0].partition("|")
+        state = state.split()[0] if state else ""
+        if state not in self.DONE_STATES:
+            return False, None
+        code = int(exit_code.split(":")[0] or 0)
+        return True, code if state == "COMPLETED" else (code or 1)
+
+    def cancel_args(self, job_id):
+        return [self.command("scancel"), job_id]
+
+
+EXECUTORS = {
+    "local": LocalExecutor,
+    "lsf": LsfExecutor,
+    "slurm": SlurmExecutor,
+}
+
+
+def get_executor(name=None, settings=None):
+    """Build the executor named in flow_setup.json's "executor" section (default local)."""
+    settings = settings or {}
+    name = name or settings.get("backend", "local")
+    if name not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{name}' (choose from {', '.join(EXECUTORS)})")
+    return EXECUTORS[name](settings.get(name, {}))
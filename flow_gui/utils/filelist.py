@@ -0,0 +1,306 @@
+import os
+import re
+import json
+import fnmatch
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .paths import user_cache_dir
+
+RTL_EXTENSIONS = {
+    ".sv": "sv",
+    ".v": "verilog",
+    ".svh": "header",
+    ".vh": "header",
+    ".inc": "header",
+    ".vhd": "vhdl",
+    ".vhdl": "vhdl",
+}
+
+# Testbench and simulation trees under the RTL root are not synthesizable;
+# RTL_EXCLUDE_DIRS (':'-separated names or globs) replaces this list.
+EXCLUDE_DIRS = ("tb", "tbs", "testbench", "sim", "test", "tests")
+
+WALK_WORKERS = 16
+CACHE_VERSION = 1
+
+COMMENT_RE = re.compile(rb"//[^\n]*|/\*.*?\*/", re.S)
+VHDL_COMMENT_RE = re.compile(rb"--[^\n]*")
+INCLUDE_RE = re.compile(rb'`include\s+"([^"]+)"')
+DEFINE_RE = re.compile(rb"`define\s+(\w+)")
+IFDEF_RE = re.compile(rb"`(?:ifdef|ifndef|elsif)\s+(\w+)")
+MACRO_USE_RE = re.compile(rb"`(\w+)")
+PACKAGE_RE = re.compile(rb"^\s*package\s+(?:automatic\s+|static\s+)?(\w+)\s*;", re.M)
+IMPORT_RE = re.compile(rb"\b(\w+)::")
+MODULE_RE = re.compile(rb"^\s*(?:module|interface|program)\s+(?:automatic\s+|static\s+)?(\w+)", re.M)
+VHDL_PACKAGE_RE = re.compile(rb"^\s*package\s+(\w+)\s+is\b", re.M | re.I)
+VHDL_USE_RE = re.compile(rb"\buse\s+work\.(\w+)\.", re.I)
+VHDL_ENTITY_RE = re.compile(rb"^\s*entity\s+(\w+)\s+is\b", re.M | re.I)
+
+# Compiler directives that look like macro uses
+DIRECTIVES = {
+    "include", "define", "undef", "undefineall", "ifdef", "ifndef", "elsif", "else", "endif",
+    "timescale", "default_nettype", "resetall", "celldefine", "endcelldefine", "line",
+    "pragma", "begin_keywords", "end_keywords", "unconnected_drive", "nounconnected_drive",
+    "__FILE__", "__LINE__",
+}
+
+
+def _cache_file(rtl_root, include_dirs, exclude_dirs):
+    key = hashlib.sha1(json.dumps([os.path.abspath(rtl_root)] + list(include_dirs) + [list(exclude_dirs)]).encode()).hexdigest()
+    return os.path.join(user_cache_dir("filelists"), f"{key}.json")
+
+
+def _list_dir(path, cached):
+    """[mtime_ns, rtl file names, subdirectory names]; reuses cached when the directory is unchanged."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if cached and cached[0] == mtime:
+        return cached
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif os.path.splitext(entry.name)[1].lower() in RTL_EXTENSIONS:
+                    files.append(entry.name)
+    except OSError:
+        return None
+    return [mtime, sorted(files), sorted(subdirs)]
+
+
+def _excluded(name, exclude_dirs):
+    return any(fnmatch.fnmatch(name.lower(), pattern.lower()) for pattern in exclude_dirs)
+
+
+def _walk(roots, cached_dirs, pool, exclude_dirs=()):
+    """List every directory under roots concurrently (except exclude_dirs): {dir: [mtime, files, subdirs]}."""
+    dirs = {}
+    seen = set()
+    pending = {}
+
+    def submit(path):
+        real = os.path.realpath(path)
+        if real in seen:
+            return
+        seen.add(real)
+        pending[pool.submit(_list_dir, path, cached_dirs.get(path))] = path
+
+    for root in roots:
+        submit(root)
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            path = pending.pop(future)
+            listing = future.result()
+            if listing is None:
+                continue
+            dirs[path] = listing
+            for sub in listing[2]:
+                if not _excluded(sub, exclude_dirs):
+                    submit(os.path.join(path, sub))
+    return dirs
+
+
+def _scan_file(path, kind, cached):
+    """Parse one file for includes, defines, packages and macro uses; reuses cached if unchanged."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if cached and cached["size"] == st.st_size and cached["mtime"] == st.st_mtime_ns:
+        return cached
+
+    with open(path, "rb") as f:
+        text = f.read()
+
+    info = {"size": st.st_size, "mtime": st.st_mtime_ns, "kind": kind}
+    if kind == "vhdl":
+        text = VHDL_COMMENT_RE.sub(b"", text)
+        info.update(
+            includes=[],
+            defines=[],
+            macros=[],
+            packages=[m.decode() for m in VHDL_PACKAGE_RE.findall(text)],
+            imports=sorted({m.decode().lower() for m in VHDL_USE_RE.findall(text)}),
+            units=[m.decode() for m in VHDL_ENTITY_RE.findall(text)],
+        )
+        info["packages"] = [p.lower() for p in info["packages"]]
+        return info
+
+    text = COMMENT_RE.sub(b"", text)
+    defines = sorted({m.decode() for m in DEFINE_RE.findall(text)})
+    used = {m.decode() for m in MACRO_USE_RE.findall(text)} | {m.decode() for m in IFDEF_RE.findall(text)}
+    packages = [m.decode() for m in PACKAGE_RE.findall(text)]
+    info.update(
+        includes=[m.decode() for m in INCLUDE_RE.findall(text)],
+        defines=defines,
+        macros=sorted(used - DIRECTIVES - set(defines)),
+        packages=packages,
+        imports=sorted({m.decode() for m in IMPORT_RE.findall(text)} - set(packages)),
+        units=[m.decode() for m in MODULE_RE.findall(text)],
+    )
+    return info
+
+
+def _order_sources(sources, files, resolved_includes):
+    """Topologically order sources so packages and macro definitions come before their users."""
+    package_owner = {}
+    macro_owner = {}
+    for path in sources:
+        for pkg in files[path]["packages"]:
+            package_owner.setdefault(pkg, path)
+        for macro in files[path]["defines"]:
+            macro_owner.setdefault(macro, path)
+
+    def visible_defines(path, stack=()):
+        names = set(files[path]["defines"])
+        for inc in resolved_includes.get(path, []):
+            if inc not in stack and inc in files:
+                names |= visible_defines(inc, stack + (path,))
+        return names
+
+    deps = {}
+    for path in sources:
+        info = files[path]
+        wanted = {package_owner.get(pkg) for pkg in info["imports"]}
+        local = visible_defines(path)
+        wanted |= {macro_owner.get(m) for m in info["macros"] if m not in local}
+        deps[path] = sorted(d for d in wanted if d and d != path)
+
+    ordered = []
+    state = {}
+
+    def visit(path):
+        # A dependency cycle just keeps directory order for the files involved
+        if state.get(path):
+            return
+        state[path] = "visiting"
+        for dep in deps[path]:
+            visit(dep)
+        state[path] = "done"
+        ordered.append(path)
+
+    for path in sources:
+        visit(path)
+    return ordered
+
+
+def build_filelist(rtl_root, include_dirs=(), defines=(), out_path=None, exclude_dirs=EXCLUDE_DIRS):
+    """Walk rtl_root (and include_dirs) and return the compile order as a dict.
+
+    Keys: sources (ordered, only from rtl_root), incdirs, headers, defines,
+    missing_includes ({file: [include, ...]}), path (the written .f) and stats.
+    """
+    rtl_root = os.path.abspath(rtl_root)
+    include_dirs = [os.path.abspath(d) for d in include_dirs]
+    cache_file = _cache_file(rtl_root, include_dirs, exclude_dirs)
+    try:
+        with open(cache_file, "r") as f:
+            cache = json.load(f)
+        if cache.get("version") != CACHE_VERSION:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cached_dirs = cache.get("dirs", {})
+    cached_files = cache.get("files", {})
+
+    if os.path.isfile(rtl_root):
+        candidates = {rtl_root: RTL_EXTENSIONS.get(os.path.splitext(rtl_root)[1].lower(), "verilog")}
+        dirs = {}
+    else:
+        candidates = {}
+        dirs = None
+
+    with ThreadPoolExecutor(max_workers=WALK_WORKERS) as pool:
+        if dirs is None:
+            dirs = _walk([rtl_root] + include_dirs, cached_dirs, pool, exclude_dirs)
+            for directory, (_, names, _) in dirs.items():
+                for name in names:
+                    candidates[os.path.join(directory, name)] = RTL_EXTENSIONS[os.path.splitext(name)[1].lower()]
+
+        paths = sorted(candidates)
+        scanned = pool.map(lambda p: _scan_file(p, candidates[p], cached_files.get(p)), paths)
+        files = {path: info for path, info in zip(paths, scanned) if info}
+
+    reused = sum(1 for path, info in files.items() if cached_files.get(path) is info)
+
+    # Headers are found by name: the including file's directory, the include dirs, then anywhere
+    by_name = {}
+    for path in files:
+        by_name.setdefault(os.path.basename(path), path)
+
+    resolved_includes = {}
+    missing = {}
+    incdirs = []
+    for path, info in files.items():
+        for inc in info["includes"]:
+            found = None
+            for base in [os.path.dirname(path)] + include_dirs:
+                candidate = os.path.normpath(os.path.join(base, inc))
+                if candidate in files or os.path.isfile(candidate):
+                    found = candidate
+                    break
+            if not found:
+                found = by_name.get(os.path.basename(inc))
+            if not found:
+                missing.setdefault(path, []).append(inc)
+                continue
+            resolved_includes.setdefault(path, []).append(found)
+            # +incdir+ must make the include string itself resolvable
+            incdir = found[: -len(inc)].rstrip(os.sep) if found.endswith(inc) else os.path.dirname(found)
+            if incdir and incdir not in incdirs:
+                incdirs.append(incdir)
+    for d in include_dirs:
+        if d not in incdirs:
+            incdirs.append(d)
+
+    included = {inc for incs in resolved_includes.values() for inc in incs}
+    sources = [
+        path for path in sorted(files)
+        if files[path]["kind"] != "header" and path not in included and _under(path, rtl_root)
+    ]
+    result = {
+        "root": rtl_root,
+        "sources": _order_sources(sources, files, resolved_includes),
+        "incdirs": sorted(incdirs),
+        "headers": sorted(p for p in files if files[p]["kind"] == "header" or p in included or not _under(p, rtl_root)),
+        "defines": list(defines),
+        "missing_includes": missing,
+        "stats": {"dirs": len(dirs), "files": len(files), "rescanned": len(files) - reused},
+    }
+
+    if result["stats"]["rescanned"] or dirs != cached_dirs or len(files) != len(cached_files):
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"version": CACHE_VERSION, "dirs": dirs, "files": files}, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    if out_path:
+        write_filelist(result, out_path)
+        result["path"] = out_path
+    return result
+
+
+def _under(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def write_filelist(result, out_path):
+    """Write a .f file: +incdir+ and +define+ lines, then one source per line in compile order."""
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    lines = [f"// Generated by Logic Lance from {result['root']}"]
+    lines += [f"+incdir+{d}" for d in result["incdirs"]]
+    lines += [f"+define+{d}" for d in result["defines"]]
+    lines += result["sources"]
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, out_path)
@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+from .tracing import span
+
+FINGERPRINT_FILE = ".logiclance_fingerprint.json"
+
+# Project inputs hashed for every stage
+INPUT_PATH_VARS = ("RTL_PATH", "LIB_PATH", "LEF_PATH", "SDC_PATH", "FILELIST")
+
+# Environment variables that change what a stage produces
+FINGERPRINT_ENV_VARS = ("order", "DESIGN", "SYN_EFF", "MAX_LIB", "MIN_LIB", "SDC_FILE")
+
+
+def _hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_tree(root, known_files=None):
+    """(digest, files) of every file under root, re-reading only files whose size or mtime changed."""
+    known_files = known_files or {}
+    if os.path.isfile(root):
+        paths = [root]
+    elif os.path.isdir(root):
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            paths += [os.path.join(dirpath, name) for name in sorted(filenames)]
+    else:
+        return "missing", {}
+
+    files = {}
+    tree = hashlib.sha256()
+    for path in paths:
+        st = os.stat(path)
+        known = known_files.get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            sha = known[2]
+        else:
+            sha = _hash_file(path)
+        files[path] = [st.st_size, st.st_mtime_ns, sha]
+        tree.update(os.path.relpath(path, root).encode())
+        tree.update(sha.encode())
+    return tree.hexdigest(), files
+
+
+def resolve_order_scripts(script_path, order):
+    """Resolve START.tcl-style order entries: inputs/ overrides win over the flow's script dir."""
+    resolved = []
+    overrides = []
+    with span("scripts.resolve", script=script_path, scripts=len(order)) as s:
+        for tcl in order:
+            override = os.path.join("inputs", tcl)
+            if os.path.exists(override):
+                resolved.append(os.path.abspath(override))
+                overrides.append(tcl)
+            else:
+                resolved.append(os.path.join(os.path.dirname(script_path), tcl))
+        s.set(overrides=overrides)
+    return resolved
+
+
+def fingerprint_path(outputs_root, stage_name):
+    return os.path.join(outputs_root, stage_name, FINGERPRINT_FILE)
+
+
+def load_fingerprint(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compute_fingerprint(stage, env, upstream=None, previous=None):
+    known_files = (previous or {}).get("files", {})
+    files = {}
+
+    inputs = {}
+    for var in INPUT_PATH_VARS:
+        if env.get(var):
+            inputs[var], tree_files = hash_tree(env[var], known_files)
+            files.update(tree_files)
+
+    scripts = {}
+    order = [s for s in env.get("order", "").split(",") if s]
+    for path in [stage.script] + resolve_order_scripts(stage.script, order):
+        scripts[path], tree_files = hash_tree(path, known_files)
+        files.update(tree_files)
+
+    fingerprint = {
+        "stage": stage.name,
+        "tool": stage.binary,
+        "version": stage.version,
+        "inputs": inputs,
+        "scripts": scripts,
+        "env": {var: env.get(var, "") for var in FINGERPRINT_ENV_VARS},
+        "upstream": upstream or {},
+    }
+    fingerprint["digest"] = hashlib.sha256(
+        json.dumps(fingerprint, sort_keys=True).encode()
+    ).hexdigest()
+    fingerprint["files"] = files
+    return fingerprint
+
+
+# Inputs that only affect constraints; a checkpoint stays reusable when they change
+CONSTRAINT_INPUT_VARS = ("SDC_PATH",)
+CONSTRAINT_ENV_VARS = ("SDC_FILE",)
+
+
+def design_digest(fingerprint):
+    """Digest of a fingerprint without its constraint inputs (SDC)."""
+    design = {
+        key: value for key, value in fingerprint.items()
+        if key not in ("digest", "files")
+    }
+    design["inputs"] = {
+        k: v for k, v in fingerprint["inputs"].items() if k not in CONSTRAINT_INPUT_VARS
+    }
+    design["env"] = {
+        k: v for k, v in fingerprint["env"].items() if k not in CONSTRAINT_ENV_VARS
+    }
+    return hashlib.sha256(json.dumps(design, sort_keys=True).encode()).hexdigest()
+
+
+def record_fingerprint(path, fingerprint):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(fingerprint, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,178 @@
+import os
+import re
+import mmap
+import json
+import glob
+import hashlib
+from .paths import user_cache_dir
+
+INDEX_VERSION = 2
+
+# Statements start with their keyword so the regex engine can skip ahead to it.
+# LAYER/SITE definitions have no ';' (unlike 'LAYER metal1 ;' inside a PORT).
+MACRO_RE = re.compile(rb"MACRO(?<![\w]MACRO)[ \t]+(\S+)")
+LAYER_RE = re.compile(rb"LAYER(?<![\w]LAYER)[ \t]+([^\s;]+)[ \t]*\r?\n")
+SITE_RE = re.compile(rb"SITE(?<![\w]SITE)[ \t]+([^\s;]+)[ \t]*\r?\n")
+PIN_RE = re.compile(rb"PIN(?<![\w]PIN)[ \t]+(\S+)")
+SIZE_RE = re.compile(rb"SIZE(?<![\w]SIZE)\s+([-\d.]+)\s+BY\s+([-\d.]+)")
+CLASS_RE = re.compile(rb"CLASS(?<![\w]CLASS)\s+([^;]+?)\s*;")
+MACRO_SITE_RE = re.compile(rb"SITE(?<![\w]SITE)\s+(\S+)\s*;")
+TYPE_RE = re.compile(rb"TYPE(?<![\w]TYPE)\s+(\w+)\s*;")
+DIRECTION_RE = re.compile(rb"DIRECTION(?<![\w]DIRECTION)\s+(\w+)")
+USE_RE = re.compile(rb"USE(?<![\w]USE)\s+(\w+)\s*;")
+PITCH_RE = re.compile(rb"PITCH(?<![\w]PITCH)\s+([-\d.]+)")
+
+# Pin uses that have no counterpart among Liberty signal pins
+POWER_USES = ("POWER", "GROUND")
+# Physical-only macro classes that libraries are not expected to describe
+PHYSICAL_CLASSES = ("COVER", "RING", "PAD SPACER", "CORE SPACER", "CORE WELLTAP", "ENDCAP")
+
+
+def _cache_file(path):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(user_cache_dir("lef"), f"{key}.json")
+
+
+def _decode(match, group=1):
+    return match.group(group).decode(errors="replace") if match else None
+
+
+def _block_end(mm, name, start, limit):
+    """Offset of 'END name' before limit (the next block), else limit."""
+    end = mm.find(b"END " + name, start, limit)
+    return end if end != -1 else limit
+
+
+def _scan(mm, size):
+    """Index a mapped LEF file: layers and sites from the header, then every MACRO."""
+    macro_starts = [m for m in MACRO_RE.finditer(mm)]
+    header_end = macro_starts[0].start() if macro_starts else size
+    library_end = mm.rfind(b"END LIBRARY")
+    library_end = library_end if library_end > header_end else size
+
+    layers = {}
+    for m in LAYER_RE.finditer(mm, 0, header_end):
+        end = _block_end(mm, m.group(1), m.end(), header_end)
+        pitch = PITCH_RE.search(mm, m.end(), end)
+        layers[_decode(m)] = {
+            "type": _decode(TYPE_RE.search(mm, m.end(), end)),
+            "direction": _decode(DIRECTION_RE.search(mm, m.end(), end)),
+            "pitch": float(pitch.group(1)) if pitch else None,
+        }
+
+    sites = {}
+    for m in SITE_RE.finditer(mm, 0, header_end):
+        end = _block_end(mm, m.group(1), m.end(), header_end)
+        site_size = SIZE_RE.search(mm, m.end(), end)
+        sites[_decode(m)] = {
+            "class": _decode(CLASS_RE.search(mm, m.end(), end)),
+            "size": [float(site_size.group(1)), float(site_size.group(2))] if site_size else None,
+        }
+
+    macros = {}
+    for i, m in enumerate(macro_starts):
+        limit = macro_starts[i + 1].start() if i + 1 < len(macro_starts) else library_end
+        end = _block_end(mm, m.group(1), m.end(), limit)
+        pins = list(PIN_RE.finditer(mm, m.end(), end))
+        attrs_end = pins[0].start() if pins else end
+        macro_size = SIZE_RE.search(mm, m.end(), attrs_end)
+        macro = {
+            "offset": m.start(),
+            "length": end - m.start(),
+            "class": _decode(CLASS_RE.search(mm, m.end(), attrs_end)),
+            "size": [float(macro_size.group(1)), float(macro_size.group(2))] if macro_size else None,
+            "site": _decode(MACRO_SITE_RE.search(mm, m.end(), attrs_end)),
+            "pins": {},
+        }
+        for j, pin in enumerate(pins):
+            pin_end = pins[j + 1].start() if j + 1 < len(pins) else end
+            use = _decode(USE_RE.search(mm, pin.end(), pin_end)) or "SIGNAL"
+            direction = _decode(DIRECTION_RE.search(mm, pin.end(), pin_end)) or "INPUT"
+            macro["pins"][_decode(pin)] = {"direction": direction.lower(), "use": use.upper()}
+        macros[_decode(m)] = macro
+
+    return {"layers": layers, "sites": sites, "macros": macros}
+
+
+def load_index(path):
+    """Return the index of a .lef file, rebuilding the cached one when the file changed."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    cache_file = _cache_file(path)
+    try:
+        with open(cache_file, "r") as f:
+            index = json.load(f)
+        if (index.get("version") == INDEX_VERSION and index["size"] == st.st_size
+                and index["mtime"] == st.st_mtime_ns):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(path, "rb") as f:
+        if st.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                scanned = _scan(mm, st.st_size)
+        else:
+            scanned = _scan(b"", 0)
+    index = {"version": INDEX_VERSION, "path": path, "size": st.st_size, "mtime": st.st_mtime_ns}
+    index.update(scanned)
+
+    try:
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return index
+
+
+def index_lefs(lef_dir=None):
+    """Indexes of every .lef under lef_dir (default LEF_PATH), sorted by file name."""
+    lef_dir = lef_dir or os.environ.get("LEF_PATH", "")
+    return [load_index(path) for path in sorted(glob.glob(os.path.join(lef_dir, "*.lef")))]
+
+
+def find_macro(indexes, name):
+    """[(index, macro), ...] for every LEF that defines the macro."""
+    return [(index, index["macros"][name]) for index in indexes if name in index["macros"]]
+
+
+def compare_with_libs(lef_indexes, lib_indexes):
+    """Check that LEF macros and Liberty cells (and their pins) agree; returns [(level, message), ...]."""
+    macros = {}
+    for index in lef_indexes:
+        for name, macro in index["macros"].items():
+            macros.setdefault(name, macro)
+    sites = {name for index in lef_indexes for name in index["sites"]}
+    cells = {}
+    for index in lib_indexes:
+        for name, cell in index["cells"].items():
+            cells.setdefault(name, cell)
+
+    problems = []
+    for name in sorted(cells):
+        macro = macros.get(name)
+        if not macro:
+            # dont_use, test and physical-only cells often have no macro; using one fails later anyway
+            if not cells[name].get("dont_use"):
+                problems.append(("warning", f"{name}: in the libraries but no LEF macro"))
+            continue
+        lib_pins = {pin for pin, direction in cells[name]["pins"].items() if direction in ("input", "output", "inout", "bus")}
+        lef_pins = {pin for pin, info in macro["pins"].items() if info["use"] not in POWER_USES}
+        # Bus pins are indexed by name in Liberty but bit by bit in LEF (D[0], D[1], ...)
+        lef_buses = {pin.split("[")[0] for pin in lef_pins}
+        missing = sorted(p for p in lib_pins if p not in lef_pins and p not in lef_buses)
+        extra = sorted(p for p in lef_pins if p not in lib_pins and p.split("[")[0] not in lib_pins)
+        if missing:
+            problems.append(("error", f"{name}: LEF macro lacks pin(s) {', '.join(missing)}"))
+        if extra:
+            problems.append(("warning", f"{name}: LEF pin(s) {', '.join(extra)} not in the libraries"))
+
+    for name in sorted(set(macros) - set(cells)):
+        if (macros[name]["class"] or "") not in PHYSICAL_CLASSES and lib_indexes:
+            problems.append(("warning", f"{name}: LEF macro ({macros[name]['class']}) has no library cell"))
+    for name, macro in sorted(macros.items()):
+        if sites and macro["site"] and macro["site"] not in sites:
+            problems.append(("error", f"{name}: site {macro['site']} is not defined in any LEF"))
+    return problems
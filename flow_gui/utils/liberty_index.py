@@ -0,0 +1,210 @@
+import os
+import re
+import mmap
+import json
+import glob
+import hashlib
+from .paths import user_cache_dir
+from .techkit import CELL_VARS, PORT_VARS, DONT_USE_VAR, cell_list, match_cells
+
+INDEX_VERSION = 1
+
+# Patterns start with their literal keyword so the regex engine can skip ahead to it;
+# the lookbehind right after the keyword rejects longer names (cell_rise, related_pin, ...)
+LIBRARY_RE = re.compile(rb'library(?<![\w.]library)\s*\(\s*"?([^")\s]+)"?\s*\)')
+CELL_RE = re.compile(rb'cell(?<![\w.]cell)\s*\(\s*"?([^")\s]+)"?\s*\)\s*\{')
+PIN_RE = re.compile(rb'pin(?:(?<![\w.]pin)|(?<=[^\w.]pg_pin))\s*\(\s*"?([^")\s]+)"?\s*\)\s*\{')
+BUS_RE = re.compile(rb'bus(?<![\w.]bus)\s*\(\s*"?([^")\s]+)"?\s*\)\s*\{')
+AREA_RE = re.compile(rb"area(?<![\w.]area)\s*:\s*([-+\d.eE]+)")
+DONT_USE_RE = re.compile(rb'dont_use(?<![\w.]dont_use)\s*:\s*"?true')
+DIRECTION_RE = re.compile(rb'direction(?<![\w.]direction)\s*:\s*"?(\w+)')
+PG_TYPE_RE = re.compile(rb'pg_type(?<![\w.]pg_type)\s*:\s*"?(\w+)')
+HEADER_RE = re.compile(
+    rb'(?<![\w.])(nom_process|nom_voltage|nom_temperature|default_operating_conditions|time_unit)'
+    rb'\s*:\s*"?([^";\s]+)'
+)
+BRACE_RE = re.compile(rb'[{}]|"(?:[^"\\]|\\.)*"|/\*.*?\*/', re.S)
+
+# Corner names as they usually appear in library or file names
+CORNER_TOKENS = {
+    "slow": ("slow", "ss", "wc", "worst", "max"),
+    "fast": ("fast", "ff", "bc", "best", "min"),
+    "typical": ("typical", "typ", "tt", "nom"),
+}
+
+
+def _cache_file(path):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(user_cache_dir("liberty"), f"{key}.json")
+
+
+def _scan(mm, size):
+    """Index a mapped Liberty file without decoding it: regexes run on the map in place."""
+    starts = [(m.start(), m.group(1).decode(errors="replace")) for m in CELL_RE.finditer(mm)]
+    header_end = starts[0][0] if starts else size
+
+    library = LIBRARY_RE.search(mm, 0, header_end)
+    header = {
+        m.group(1).decode(): m.group(2).decode(errors="replace")
+        for m in HEADER_RE.finditer(mm, 0, header_end)
+    }
+
+    cells = {}
+    for i, (start, name) in enumerate(starts):
+        # A cell runs until the next one; cell_text trims the tail when the body is read
+        end = starts[i + 1][0] if i + 1 < len(starts) else size
+        pins = sorted(
+            list(PIN_RE.finditer(mm, start, end)) + list(BUS_RE.finditer(mm, start, end)),
+            key=lambda m: m.start(),
+        )
+        attrs_end = pins[0].start() if pins else end
+        area = AREA_RE.search(mm, start, attrs_end)
+        cell = {
+            "offset": start,
+            "length": end - start,
+            "area": float(area.group(1)) if area else None,
+            "dont_use": bool(DONT_USE_RE.search(mm, start, attrs_end)),
+            "pins": {},
+        }
+        for j, pin in enumerate(pins):
+            pin_end = pins[j + 1].start() if j + 1 < len(pins) else end
+            pg = mm[pin.start() - 3:pin.start()] == b"pg_"
+            kind = "pg_pin" if pg else pin.group().split(b"(")[0].strip().decode()
+            direction = (PG_TYPE_RE if pg else DIRECTION_RE).search(mm, pin.end(), pin_end)
+            cell["pins"][pin.group(1).decode(errors="replace")] = (
+                direction.group(1).decode() if direction else kind
+            )
+        cells[name] = cell
+
+    return {
+        "library": library.group(1).decode(errors="replace") if library else None,
+        "header": header,
+        "cells": cells,
+    }
+
+
+def load_index(path):
+    """Return the index of a .lib file, rebuilding the cached one when the file changed."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    cache_file = _cache_file(path)
+    try:
+        with open(cache_file, "r") as f:
+            index = json.load(f)
+        if (index.get("version") == INDEX_VERSION and index["size"] == st.st_size
+                and index["mtime"] == st.st_mtime_ns):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(path, "rb") as f:
+        if st.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                scanned = _scan(mm, st.st_size)
+        else:
+            scanned = _scan(b"", 0)
+    index = {"version": INDEX_VERSION, "path": path, "size": st.st_size, "mtime": st.st_mtime_ns}
+    index.update(scanned)
+    index["corner"] = corner_of(index)
+
+    try:
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return index
+
+
+def index_libraries(lib_dir=None):
+    """Indexes of every .lib under lib_dir (default LIB_PATH), sorted by file name."""
+    lib_dir = lib_dir or os.environ.get("LIB_PATH", "")
+    return [load_index(path) for path in sorted(glob.glob(os.path.join(lib_dir, "*.lib")))]
+
+
+def cell_text(index, name):
+    """The raw 'cell (name) { ... }' group, read through a memory map of the library."""
+    cell = index["cells"][name]
+    with open(index["path"], "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = cell["offset"]
+        end = start + cell["length"]
+        depth = 0
+        for m in BRACE_RE.finditer(mm, start, end):
+            token = m.group()
+            if token == b"{":
+                depth += 1
+            elif token == b"}":
+                depth -= 1
+                if depth == 0:
+                    end = m.end()
+                    break
+        return mm[start:end].decode(errors="replace")
+
+
+def find_cell(indexes, name):
+    """[(index, cell), ...] for every library that defines the cell."""
+    return [(index, index["cells"][name]) for index in indexes if name in index["cells"]]
+
+
+def corner_of(index):
+    """slow, fast or typical from the library/file name, else None."""
+    names = [index.get("library") or "", os.path.splitext(os.path.basename(index["path"]))[0]]
+    tokens = [t for name in names for t in re.split(r"[^a-z0-9]+", name.lower()) if t]
+    for corner, words in CORNER_TOKENS.items():
+        for token in tokens:
+            # ss0p72v125c style PVT tokens start with the process corner
+            if token in words or any(re.match(rf"{w}\d", token) for w in words if len(w) == 2):
+                return corner
+    return None
+
+
+def select_corner_libs(indexes):
+    """Pick {"slow": path, "fast": path} from named corners, else by nominal voltage."""
+    picked = {}
+    for index in indexes:
+        if index["corner"] in ("slow", "fast"):
+            picked.setdefault(index["corner"], index["path"])
+
+    def nominal(index, key):
+        try:
+            return float(index["header"].get(key))
+        except (TypeError, ValueError):
+            return None
+
+    rated = [index for index in indexes if nominal(index, "nom_voltage") is not None]
+    if rated and ("slow" not in picked or "fast" not in picked):
+        # Lowest voltage is slowest; between equal voltages the hotter library is
+        rated.sort(key=lambda index: (nominal(index, "nom_voltage"), -(nominal(index, "nom_temperature") or 0)))
+        picked.setdefault("slow", rated[0]["path"])
+        picked.setdefault("fast", rated[-1]["path"])
+    return picked
+
+
+def validate_techkit(indexes, techkit):
+    """Check the techkit's cell references against the libraries; returns [(level, message), ...]."""
+    cells = sorted({name for index in indexes for name in index["cells"]})
+    dont_use = {name for index in indexes for name, cell in index["cells"].items() if cell["dont_use"]}
+    problems = []
+
+    for var in CELL_VARS:
+        for pattern, matched in match_cells(cell_list(techkit, var), cells).items():
+            if not matched:
+                problems.append(("error", f"{var}: '{pattern}' matches no library cell"))
+            elif dont_use.issuperset(matched):
+                problems.append(("warning", f"{var}: '{pattern}' is dont_use in the libraries"))
+
+    for port_var, cell_var in PORT_VARS.items():
+        port = techkit.get(port_var)
+        cell = techkit.get(cell_var)
+        if not port or not cell:
+            continue
+        found = find_cell(indexes, cell)
+        if found and not any(port in info["pins"] for _, info in found):
+            problems.append(("error", f"{port_var}: {cell} has no pin '{port}'"))
+
+    if DONT_USE_VAR in techkit:
+        for pattern, matched in match_cells(cell_list(techkit, DONT_USE_VAR), cells).items():
+            if not matched:
+                problems.append(("warning", f"{DONT_USE_VAR}: '{pattern}' matches no library cell"))
+    return problems
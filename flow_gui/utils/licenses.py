@@ -0,0 +1,79 @@
+import os
+import time
+import fcntl
+from .process_runner import current_cancel, logs_root
+from .tracing import span
+
+LICENSE_POLL = 5
+
+
+def license_dir(env=None):
+    """Directory holding the slot lock files; share it between shells to share the pool."""
+    env = env if env is not None else os.environ
+    return env.get("LOGICLANCE_LICENSE_DIR") or os.path.join(logs_root(env), "licenses")
+
+
+class LicensePool:
+    """Per-feature token pool backed by flock'd slot files.
+
+    features comes from the "licenses" section of flow_setup.json:
+    {"Genus_Synthesis": {"count": 4, "tools": ["genus"]}, ...}. A tool that
+    needs several features gets all of them or none. Locks are dropped by the
+    kernel when a process dies, so a crashed shell never leaks a license.
+    """
+
+    def __init__(self, features=None, lock_dir=None):
+        self.features = features or {}
+        self.lock_dir = lock_dir or license_dir()
+
+    def features_for(self, binary):
+        return [
+            name for name, spec in self.features.items()
+            if binary in spec.get("tools", [])
+        ]
+
+    def _take_slot(self, feature):
+        feature_dir = os.path.join(self.lock_dir, feature)
+        os.makedirs(feature_dir, exist_ok=True)
+        for slot in range(int(self.features[feature].get("count", 1))):
+            f = open(os.path.join(feature_dir, f"slot.{slot}.lock"), "a")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return f
+            except BlockingIOError:
+                f.close()
+        return None
+
+    def try_acquire(self, binary):
+        """Return a lease (list of held slots) for every feature binary needs, or None."""
+        lease = []
+        for feature in self.features_for(binary):
+            slot = self._take_slot(feature)
+            if slot is None:
+                self.release(lease)
+                return None
+            lease.append(slot)
+        return lease
+
+    def acquire(self, binary, poll=LICENSE_POLL):
+        """Block until try_acquire succeeds (or the shell job is cancelled); returns (lease, seconds queued)."""
+        start = time.time()
+        token = current_cancel.get()
+        lease = self.try_acquire(binary)
+        if lease is not None:
+            return lease, 0.0
+        print(f"⏳ Waiting for license ({', '.join(self.features_for(binary))}) for {binary}...")
+        with span("license.wait", binary=binary) as s:
+            while lease is None:
+                if token and token.wait(poll):
+                    s.set(cancelled=True)
+                    return [], time.time() - start
+                if not token:
+                    time.sleep(poll)
+                lease = self.try_acquire(binary)
+        return lease, time.time() - start
+
+    def release(self, lease):
+        for slot in lease or []:
+            fcntl.flock(slot, fcntl.LOCK_UN)
+            slot.close()
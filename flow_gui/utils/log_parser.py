@@ -0,0 +1,239 @@
+import os
+import re
+import json
+import hashlib
+from .paths import user_cache_dir
+
+# Genus
+TIMESTAMP_RE = re.compile(r"^\[(\d\d):(\d\d):(\d\d(?:\.\d+)?)\]")
+STARTUP_RE = re.compile(r"Finished (executable startup|loading tool scripts) \((\d+) seconds? elapsed\)")
+LICENSE_RE = re.compile(r"Checking out license: (\S+)")
+LICENSE_OK_RE = re.compile(r"Lic check successful|Feature usage summary")
+PROMPT_RE = re.compile(r"^@genus:\w+: \d+> (\S+)")
+STEP_MARKER_RE = re.compile(r"Runtime & Memory after '([^']+)'")
+PBS_RE = re.compile(
+    r"^PBS_\S.*? - Elapsed_Time (\d+(?:\.\d+)?), CPU_Time (\d+(?:\.\d+)?), Memory (\d+(?:\.\d+)?)"
+)
+UM_RE = re.compile(r"^UM:\s*(.*)$")
+NUMBER_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+# Yosys
+YOSYS_VERSION_RE = re.compile(r"^Yosys (\S+)")
+YOSYS_PASS_RE = re.compile(r"^\d+(?:\.\d+)*\. Executing (\S+) pass")
+YOSYS_END_RE = re.compile(
+    r"^End of script\. Logfile hash: \S+, CPU: user ([\d.]+)s system ([\d.]+)s, MEM: ([\d.]+) MB peak"
+)
+YOSYS_TIME_RE = re.compile(r"(\d+)% \d+x (\S+) \((\d+) sec\)")
+YOSYS_AREA_RE = re.compile(r"Chip area for (?:top )?module '\\?([^']+)': ([\d.]+)")
+YOSYS_CELLS_RE = re.compile(r"^\s*Number of cells:\s+(\d+)")
+
+# QoR lines common to report output echoed into the log
+QOR_PATTERNS = {
+    "wns": re.compile(r"\bWNS\b\D*?(-?\d+(?:\.\d+)?)"),
+    "tns": re.compile(r"\bTNS\b\D*?(-?\d+(?:\.\d+)?)"),
+    "area": re.compile(r"\b(?:Total|Cell) [Aa]rea\b\s*[:=]?\s*(\d+(?:\.\d+)?)"),
+    "leakage_power": re.compile(r"\bLeakage Power\b\s*[:=]?\s*(\d+(?:\.\d+)?)"),
+}
+
+
+def _seconds(match):
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class ToolLogParser:
+    """Incremental Genus/Yosys log parser; its state is plain JSON so parsing can resume later."""
+
+    def __init__(self, state=None):
+        self.state = state or {
+            "metrics": {
+                "tool_version": None,
+                "startup_seconds": {},
+                "license": {},
+                "steps": {},
+                "peak_memory_mb": None,
+                "cpu_seconds": None,
+                "qor": {},
+            },
+            "step": None,
+            "last_ts": None,
+            "license_requested_ts": None,
+            "um_header": None,
+        }
+
+    @property
+    def metrics(self):
+        return self.state["metrics"]
+
+    def _step(self, name=None):
+        name = name or self.state["step"] or "setup"
+        return self.metrics["steps"].setdefault(name, {})
+
+    def _add(self, step, key, value):
+        step[key] = round(step.get(key, 0) + value, 3)
+
+    def _memory(self, step, mb):
+        step["memory_mb"] = max(step.get("memory_mb", 0), mb)
+        peak = self.metrics["peak_memory_mb"]
+        self.metrics["peak_memory_mb"] = mb if peak is None else max(peak, mb)
+
+    def feed(self, line):
+        state = self.state
+        metrics = state["metrics"]
+
+        ts_match = TIMESTAMP_RE.match(line)
+        if ts_match:
+            ts = _seconds(ts_match)
+            if state["license_requested_ts"] is not None and LICENSE_OK_RE.search(line):
+                wait = ts - state["license_requested_ts"]
+                metrics["license"]["wait_seconds"] = round(wait % 86400, 3)
+                state["license_requested_ts"] = None
+            state["last_ts"] = ts
+            return
+
+        match = LICENSE_RE.search(line)
+        if match:
+            metrics["license"]["feature"] = match.group(1)
+            state["license_requested_ts"] = state["last_ts"]
+            return
+
+        match = STARTUP_RE.search(line)
+        if match:
+            key = "executable" if match.group(1) == "executable startup" else "tool_scripts"
+            metrics["startup_seconds"][key] = int(match.group(2))
+            return
+
+        match = PROMPT_RE.match(line)
+        if match:
+            state["step"] = match.group(1)
+            return
+
+        match = STEP_MARKER_RE.search(line)
+        if match:
+            self._step(match.group(1))
+            return
+
+        match = PBS_RE.match(line)
+        if match:
+            step = self._step()
+            self._add(step, "wall_seconds", float(match.group(1)))
+            self._add(step, "cpu_seconds", float(match.group(2)))
+            self._memory(step, float(match.group(3)))
+            return
+
+        match = UM_RE.match(line)
+        if match:
+            self._feed_um(match.group(1).split())
+            return
+
+        self._feed_yosys(line)
+
+        for key, pattern in QOR_PATTERNS.items():
+            match = pattern.search(line)
+            if match:
+                metrics["qor"][key] = float(match.group(1))
+
+    def _feed_um(self, tokens):
+        """Genus unified-metrics lines: a header of metric names, then value rows."""
+        if not tokens:
+            return
+        if not any(NUMBER_RE.match(t) for t in tokens):
+            self.state["um_header"] = tokens
+            return
+        header = self.state["um_header"]
+        if not header:
+            return
+
+        label = tokens[-1] if not NUMBER_RE.match(tokens[-1]) else None
+        values = [float(t) for t in tokens if NUMBER_RE.match(t)]
+        step = self._step(label)
+        for name, value in zip(header, values):
+            if "cputime" in name:
+                step["cpu_seconds"] = value
+            elif "realtime" in name:
+                step["wall_seconds"] = value
+            elif "memory" in name:
+                self._memory(step, value)
+            elif name.endswith(("wns", "tns", "area")):
+                step[name] = value
+                self.metrics["qor"][name.rsplit(".", 1)[-1]] = value
+
+    def _feed_yosys(self, line):
+        metrics = self.metrics
+
+        match = YOSYS_VERSION_RE.match(line)
+        if match:
+            metrics["tool_version"] = match.group(1)
+            return
+
+        match = YOSYS_PASS_RE.match(line)
+        if match:
+            self.state["step"] = match.group(1).lower()
+            return
+
+        match = YOSYS_END_RE.match(line)
+        if match:
+            metrics["cpu_seconds"] = round(float(match.group(1)) + float(match.group(2)), 3)
+            metrics["peak_memory_mb"] = float(match.group(3))
+            return
+
+        if line.startswith("Time spent:"):
+            for _, name, secs in YOSYS_TIME_RE.findall(line):
+                metrics["steps"].setdefault(name, {})["wall_seconds"] = float(secs)
+            return
+
+        match = YOSYS_AREA_RE.search(line)
+        if match:
+            metrics["qor"]["area"] = float(match.group(2))
+            return
+
+        match = YOSYS_CELLS_RE.match(line)
+        if match:
+            metrics["qor"]["cells"] = int(match.group(1))
+
+
+def parse_log_file(log_path, state_path=None):
+    """Parse log_path from where the last call stopped (state in the user cache) and return the metrics."""
+    if not state_path:
+        key = hashlib.sha1(os.path.abspath(log_path).encode()).hexdigest()
+        state_path = os.path.join(user_cache_dir("logs"), f"{key}.json")
+    st = os.stat(log_path)
+
+    saved = None
+    try:
+        with open(state_path, "r") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if not saved or saved.get("inode") != st.st_ino or saved.get("offset", 0) > st.st_size:
+        saved = {"inode": st.st_ino, "offset": 0, "parser": None}
+
+    parser = ToolLogParser(saved["parser"])
+    with open(log_path, "rb") as f:
+        f.seek(saved["offset"])
+        offset = saved["offset"]
+        for raw in f:
+            # Leave a partially written last line for the next call
+            if not raw.endswith(b"\n"):
+                break
+            parser.feed(raw.decode(errors="replace").rstrip("\n"))
+            offset += len(raw)
+
+    saved.update(offset=offset, parser=parser.state)
+    try:
+        tmp_file = f"{state_path}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(saved, f)
+        os.replace(tmp_file, state_path)
+    except OSError:
+        pass
+    return parser.metrics
+
+
+def write_metrics(metrics_dir, run_id, metrics, **info):
+    """Store one run's metrics as metrics_dir/<run_id>.json; returns the path."""
+    os.makedirs(metrics_dir, exist_ok=True)
+    path = os.path.join(metrics_dir, f"{run_id}.json")
+    with open(path, "w") as f:
+        json.dump(dict(info, run_id=run_id, metrics=metrics), f, separators=(",", ":"))
+    return path
@@ -0,0 +1,12 @@
+import os
+
+
+def user_cache_dir(*parts):
+    """Return (and create) a per-user Logic Lance cache directory."""
+    root = os.environ.get("LOGICLANCE_CACHE_DIR")
+    if not root:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        root = os.path.join(base, "logiclance")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
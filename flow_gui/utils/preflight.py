@@ -0,0 +1,164 @@
+import os
+import re
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from .fingerprint import resolve_order_scripts
+from .tool_discovery import discover_binaries
+from . import lef_index, liberty_index
+
+PREFLIGHT_WORKERS = 16
+
+# Every stage reads these; directories must exist before the tool starts
+REQUIRED_DIRS = ("RTL_PATH", "LIB_PATH", "SDC_PATH")
+# Created by the scripts if missing, so their parent must be writable
+OUTPUT_DIRS = ("OUTPUTS_PATH", "REPORTS_PATH", "LOG_PATH")
+
+# Input files the scripts name relative to a path variable: $LEF_PATH/x.lef, ${LIB_PATH}/x.lib
+SCRIPT_REF_RE = re.compile(r"\$\{?(LIB_PATH|LEF_PATH)\}?/([\w.+-]+\.(?:lib|lef))\b")
+READ_SDC_RE = re.compile(r"^\s*read_sdc\b", re.M)
+# Driver scripts like START.tcl source the flow's 'order' list
+ORDER_RE = re.compile(r"::env\(order\)")
+# Corner overrides the scripts honour instead of their default slow.lib/fast.lib
+LIB_OVERRIDES = {"slow.lib": "MAX_LIB", "fast.lib": "MIN_LIB"}
+# Flow flags (flow_setup.json) and the variable a script must read for them to work
+FLAG_VARS = {"checkpoints": "RESUME_FROM", "filelist": "FILELIST"}
+
+
+def _read(path):
+    try:
+        with open(path, "r", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def order_scripts(stage, env):
+    """[(name, path)] of the order scripts the stage's driver script sources, as START.tcl finds them."""
+    if not ORDER_RE.search(_read(stage.script)):
+        return []
+    order = [tcl for tcl in env.get("order", "").split(",") if tcl]
+    return list(zip(order, resolve_order_scripts(stage.script, order)))
+
+
+def _check_scripts(stage, env):
+    if not os.path.isfile(stage.script):
+        return [("error", f"{stage.name}: script not found: {stage.script}")]
+    order = order_scripts(stage, env)
+    problems = [
+        ("error", f"{stage.name}: order script {tcl} not in inputs/ or {os.path.dirname(path)}")
+        for tcl, path in order
+        if not os.path.isfile(path)
+    ]
+    text = "\n".join(_read(path) for path in [stage.script] + [path for _, path in order])
+    for flag, var in FLAG_VARS.items():
+        if getattr(stage, flag, False) and f"::env({var})" not in text:
+            problems.append(("warning", f"{stage.name}: '{flag}' is set but none of its scripts read {var}"))
+    return problems
+
+
+def _check_inputs(stage, env):
+    """Libraries, LEFs and SDC referenced by the stage script, its order scripts and the Tcl next to it."""
+    problems = []
+    script_dir = os.path.dirname(stage.script)
+    paths = [stage.script] + [path for _, path in order_scripts(stage, env)]
+    if os.path.isdir(script_dir):
+        paths += sorted(os.path.join(script_dir, name) for name in os.listdir(script_dir) if name.endswith(".tcl"))
+    text = "\n".join(_read(path) for path in dict.fromkeys(paths))
+
+    wanted = set()
+    for var, name in SCRIPT_REF_RE.findall(text):
+        override = LIB_OVERRIDES.get(name) if var == "LIB_PATH" else None
+        if override and env.get(override):
+            name = env[override]
+        # Absolute overrides (MAX_LIB=/path/slow.lib) win over the directory, like 'file join'
+        if env.get(var) or os.path.isabs(name):
+            wanted.add(os.path.join(env.get(var, ""), name))
+    for path in sorted(wanted):
+        if not os.path.isfile(path):
+            problems.append(("error", f"{stage.name}: {path} not found"))
+        elif os.path.getsize(path) == 0:
+            problems.append(("warning", f"{stage.name}: {path} is empty"))
+
+    if READ_SDC_RE.search(text) and env.get("SDC_PATH"):
+        sdc = env.get("SDC_FILE") or (f"{env['DESIGN']}_Constraints.sdc" if env.get("DESIGN") else None)
+        if sdc and not os.path.isfile(os.path.join(env["SDC_PATH"], sdc)):
+            problems.append(("error", f"{stage.name}: constraints {os.path.join(env['SDC_PATH'], sdc)} not found"))
+    return problems
+
+
+def _check_env(env):
+    problems = []
+    for var in REQUIRED_DIRS:
+        if not env.get(var):
+            problems.append(("error", f"{var} is not set"))
+        elif not os.path.exists(env[var]):
+            problems.append(("error", f"{var} does not exist: {env[var]}"))
+    for var in OUTPUT_DIRS:
+        path = env.get(var)
+        if not path:
+            continue
+        parent = path
+        while parent and not os.path.exists(parent):
+            parent = os.path.dirname(parent)
+        if parent and not os.access(parent, os.W_OK):
+            problems.append(("error", f"{var} is not writable: {path}"))
+    if env.get("FILELIST") and not os.path.isfile(env["FILELIST"]):
+        problems.append(("warning", f"FILELIST does not exist: {env['FILELIST']}"))
+    return problems
+
+
+def _check_binaries(stages, local):
+    binaries = sorted({stage.command().split()[0] for stage in stages if not stage.session})
+    # Look where the tools will run: PATH after the tool's launch script
+    path = stages[0].env_for_run().get("PATH") if stages else None
+    problems = []
+    for binary, info in discover_binaries(binaries, path=path).items():
+        if not info["path"]:
+            # Batch jobs resolve the tool on the execution host, which may differ
+            level = "error" if local else "warning"
+            problems.append((level, f"{binary} not found on PATH"))
+    return problems
+
+
+def _check_physical_libs(env):
+    if not env.get("LIB_PATH") or not env.get("LEF_PATH"):
+        return []
+    lib_indexes = liberty_index.index_libraries(env["LIB_PATH"])
+    lef_indexes = lef_index.index_lefs(env["LEF_PATH"])
+    if not any(index["cells"] for index in lib_indexes) or not any(index["macros"] for index in lef_indexes):
+        return []
+    return lef_index.compare_with_libs(lef_indexes, lib_indexes)
+
+
+def run_preflight(stages, local=True):
+    """Run every check for the stages concurrently; returns ([(level, message), ...], seconds)."""
+    start = time.time()
+    stages = list(stages)
+    envs = [stage.env_for_run() for stage in stages]
+    # Stages that share an environment (same project paths) share its checks
+    distinct = {tuple(sorted((k, env.get(k)) for k in REQUIRED_DIRS + OUTPUT_DIRS + ("LEF_PATH", "FILELIST"))): env
+                for env in envs}
+
+    with ThreadPoolExecutor(max_workers=PREFLIGHT_WORKERS) as pool:
+        def submit(check, *args):
+            # Each check runs in a copy of the caller's context (its trace span, its shell job)
+            return pool.submit(contextvars.copy_context().run, check, *args)
+
+        futures = [submit(_check_env, env) for env in distinct.values()]
+        futures += [submit(_check_physical_libs, env) for env in distinct.values()]
+        futures += [submit(_check_binaries, stages, local)]
+        for stage, env in zip(stages, envs):
+            futures.append(submit(_check_scripts, stage, env))
+            futures.append(submit(_check_inputs, stage, env))
+
+        problems = []
+        for future in futures:
+            try:
+                found = future.result()
+            except OSError as e:
+                found = [("warning", f"Check could not run: {e}")]
+            for problem in found:
+                if problem not in problems:
+                    problems.append(problem)
+    return problems, time.time() - start
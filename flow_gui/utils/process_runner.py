@@ -0,0 +1,189 @@
+import os
+import sys
+import signal
+import threading
+import selectors
+import subprocess
+import contextvars
+from .tracing import span
+
+LOG_BACKUPS = 5
+READ_SIZE = 65536
+# Lines longer than this are passed on in pieces instead of growing the buffer
+MAX_LINE = 1 << 20
+# Seconds a cancelled tool gets between SIGTERM and SIGKILL
+TERM_GRACE = 10
+
+
+class CancelToken:
+    """Cancellation for one shell job: stops new launches and terminates its processes."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._procs = set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, timeout):
+        """Sleep up to timeout seconds; True as soon as the job is cancelled."""
+        return self._event.wait(timeout)
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            _terminate(proc)
+
+    def track(self, proc):
+        with self._lock:
+            self._procs.add(proc)
+        if self.cancelled:
+            _terminate(proc)
+
+    def untrack(self, proc):
+        with self._lock:
+            self._procs.discard(proc)
+
+
+current_cancel = contextvars.ContextVar("current_cancel", default=None)
+# False in shell background jobs: their tools must never read the terminal
+terminal_input = contextvars.ContextVar("terminal_input", default=True)
+
+
+def cancel_requested():
+    token = current_cancel.get()
+    return token is not None and token.cancelled
+
+
+def _signal(proc, sig):
+    """Signal the process, or its whole group when it leads one (tools fork helpers)."""
+    try:
+        if os.getpgid(proc.pid) == proc.pid:
+            os.killpg(proc.pid, sig)
+        else:
+            proc.send_signal(sig)
+    except OSError:
+        pass
+
+
+def _terminate(proc):
+    if proc.poll() is not None:
+        return
+    _signal(proc, signal.SIGTERM)
+    timer = threading.Timer(TERM_GRACE, lambda: proc.poll() is None and _signal(proc, signal.SIGKILL))
+    timer.daemon = True
+    timer.start()
+
+
+def logs_root(env=None):
+    env = env if env is not None else os.environ
+    root = env.get("LOG_PATH") or env.get("LOGS_PATH")
+    if root:
+        return root
+    project = env.get("PROJECT_NAME")
+    main_root = env.get("LOGICLANCE_ROOT")
+    if project and main_root:
+        return os.path.join(main_root, "projects", project, "logs")
+    return os.path.abspath("logs")
+
+
+def stage_log_path(stage_name, env=None):
+    return os.path.join(logs_root(env), stage_name, f"{stage_name}.log")
+
+
+def rotate_log(log_path, backups=LOG_BACKUPS):
+    """Shift log -> log.1 -> ... -> log.<backups>, dropping the oldest."""
+    if not os.path.exists(log_path):
+        return
+    for i in range(backups - 1, 0, -1):
+        older = f"{log_path}.{i}"
+        if os.path.exists(older):
+            os.replace(older, f"{log_path}.{i + 1}")
+    os.replace(log_path, f"{log_path}.1")
+
+
+def run_streaming(cmd, log_path, env=None, cwd=None, on_line=None, echo=True, prefix="", stdin=None):
+    """Run a shell command, teeing stdout/stderr into log_path as it arrives.
+
+    on_line(stream, line) is called for every complete line. Returns the exit code.
+    """
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    rotate_log(log_path)
+
+    with span("process.spawn", cmd=cmd) as s:
+        proc = subprocess.Popen(
+            cmd,
+            shell=True,
+            executable="/bin/bash",
+            env=env,
+            cwd=cwd,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Cancellable runs get their own process group so cancel() reaches the tool's children
+            start_new_session=current_cancel.get() is not None,
+        )
+        s.set(pid=proc.pid)
+    token = current_cancel.get()
+    if token:
+        token.track(proc)
+
+    selector = selectors.DefaultSelector()
+    selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+    selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+    pending = {"stdout": b"", "stderr": b""}
+    lines_seen = [0]
+
+    def emit(stream, raw):
+        lines_seen[0] += 1
+        line = raw.decode(errors="replace")
+        if echo:
+            out = sys.stderr if stream == "stderr" else sys.stdout
+            out.write(prefix + line)
+            out.flush()
+        if on_line:
+            on_line(stream, line.rstrip("\n"))
+
+    with span("process.wait", pid=proc.pid, log=log_path) as s:
+        try:
+            with open(log_path, "ab") as log:
+                while selector.get_map():
+                    for key, _ in selector.select():
+                        stream = key.data
+                        chunk = os.read(key.fd, READ_SIZE)
+                        if not chunk:
+                            selector.unregister(key.fileobj)
+                            if pending[stream]:
+                                emit(stream, pending[stream] + b"\n")
+                                pending[stream] = b""
+                            continue
+
+                        log.write(chunk)
+                        log.flush()
+
+                        data = pending[stream] + chunk
+                        *lines, rest = data.split(b"\n")
+                        for raw in lines:
+                            emit(stream, raw + b"\n")
+                        if len(rest) > MAX_LINE:
+                            emit(stream, rest + b"\n")
+                            rest = b""
+                        pending[stream] = rest
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            selector.close()
+            proc.stdout.close()
+            proc.stderr.close()
+            if token:
+                token.untrack(proc)
+
+        returncode = proc.wait()
+        s.set(exit_code=returncode, lines=lines_seen[0])
+        return returncode
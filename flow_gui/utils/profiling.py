@@ -0,0 +1,159 @@
+import os
+import re
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import contextvars
+from .process_runner import logs_root
+
+# Seconds between two stack samples
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 15
+
+# Where orchestration time goes, recognised by a frame of the sampled stack.
+# The innermost matching frame decides, so Popen inside run_streaming counts as startup.
+CATEGORIES = (
+    ("config parsing", ("(config_loader.py:",)),
+    ("env sourcing", ("(env_manifest.py:",)),
+    ("subprocess startup", ("_execute_child (subprocess.py:",)),
+    ("log parsing", ("(log_parser.py:",)),
+    ("license waits", ("(licenses.py:",)),
+    ("tool output", ("(process_runner.py:", "(tool_session.py:")),
+    ("batch polling", ("(executors.py:",)),
+)
+
+_active = contextvars.ContextVar("profiling_active", default=False)
+# Profile every shell command: LOGICLANCE_PROFILE=1 or `--profile`, read once
+_enabled = os.environ.get("LOGICLANCE_PROFILE") == "1"
+
+
+def profiling_active():
+    """True while profile_call runs (threads started with its context inherit this)."""
+    return _active.get()
+
+
+def profiling_enabled():
+    """True when every shell command is to be profiled."""
+    return _enabled
+
+
+def enable_profiling(on=True):
+    """Profile every shell command from now on; LOGICLANCE_PROFILE follows."""
+    global _enabled
+    _enabled = on
+    if on:
+        os.environ["LOGICLANCE_PROFILE"] = "1"
+    else:
+        os.environ.pop("LOGICLANCE_PROFILE", None)
+
+
+class StackSampler:
+    """Samples the stacks of the profiled thread and the threads it starts, in folded form for flame graphs."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="logiclance-sampler", daemon=True)
+
+    def start(self):
+        # Threads already running belong to the shell or to other jobs
+        self.ignored = {thread.ident for thread in threading.enumerate()} - {threading.get_ident()}
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self.ignored:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, "thread"))
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+    def categories(self):
+        """{category: samples} over all sampled threads, "other" for the rest."""
+        totals = {}
+        for stack, count in self.counts.items():
+            category = "other"
+            for frame in reversed(stack.split(";")):
+                match = next((name for name, marks in CATEGORIES if any(m in frame for m in marks)), None)
+                if match:
+                    category = match
+                    break
+            totals[category] = totals.get(category, 0) + count
+        return totals
+
+
+def _output_stem(name):
+    out_dir = os.path.join(logs_root(), "profiles")
+    os.makedirs(out_dir, exist_ok=True)
+    safe_name = re.sub(r"[^\w.-]+", "_", name)[:60]
+    base = os.path.join(out_dir, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    stem, n = base, 1
+    while os.path.exists(stem + ".pstats"):
+        n += 1
+        stem = f"{base}.{n}"
+    return stem
+
+
+def report(name, elapsed, profiler, sampler, stem):
+    print(f"\n⏱️ Profile of '{name}': {elapsed:.2f} s, {sampler.samples} samples")
+    categories = sampler.categories()
+    if categories:
+        print("Sampled time by activity (summed over threads):")
+        print("-" * 60)
+        for category, _ in CATEGORIES + (("other", ()),):
+            if categories.get(category):
+                samples = categories[category]
+                print(f"{category.ljust(20)}: {samples * sampler.interval:7.2f} s ({samples} samples)")
+        print("-" * 60)
+
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:TOP_FUNCTIONS]
+    print("Cumulative time in this thread:")
+    for (filename, line, func), (_, calls, _, cumulative, _) in rows:
+        print(f"  {cumulative:8.3f} s {str(calls).rjust(8)}x  {func} ({os.path.basename(filename)}:{line})")
+    print(f"📄 pstats : {stem}.pstats  (python -m pstats, snakeviz)")
+    print(f"🔥 stacks : {stem}.folded  (flamegraph.pl, speedscope)")
+
+
+def profile_call(name, func, *args, **kwargs):
+    """Run func under cProfile and the stack sampler, saving both under LOG_PATH/profiles."""
+    if profiling_active():
+        return func(*args, **kwargs)
+    stem = _output_stem(name)
+    profiler = cProfile.Profile()
+    sampler = StackSampler()
+    token = _active.set(True)
+    start = time.time()
+    sampler.start()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        _active.reset(token)
+        profiler.dump_stats(stem + ".pstats")
+        sampler.write_folded(stem + ".folded")
+        report(name, time.time() - start, profiler, sampler, stem)
@@ -0,0 +1,170 @@
+import os
+import json
+import sqlite3
+from .process_runner import logs_root
+
+HISTORY_DB = "run_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    flow TEXT,
+    tool TEXT,
+    script_hash TEXT,
+    user TEXT,
+    host TEXT,
+    start REAL,
+    end REAL,
+    duration REAL,
+    status TEXT,
+    exit_code INTEGER,
+    log_path TEXT,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_flow_start ON runs (flow, start);
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id TEXT,
+    step TEXT,
+    wall_seconds REAL,
+    cpu_seconds REAL,
+    memory_mb REAL
+);
+CREATE INDEX IF NOT EXISTS run_steps_run ON run_steps (run_id);
+"""
+
+
+def history_path(env=None):
+    return os.path.join(logs_root(env), HISTORY_DB)
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_run(path, run_id, flow, tool, script_hash, user, host, start, end,
+               exit_code, log_path=None, metrics=None):
+    metrics = metrics or {}
+    conn = _connect(path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, flow, tool, script_hash, user, host, start, end, end - start,
+                    "passed" if exit_code == 0 else "failed", exit_code, log_path,
+                    json.dumps(metrics, separators=(",", ":")),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO run_steps VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, step, v.get("wall_seconds"), v.get("cpu_seconds"), v.get("memory_mb"))
+                    for step, v in metrics.get("steps", {}).items()
+                ],
+            )
+    finally:
+        conn.close()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def recent_runs(path, flow=None, limit=20):
+    conn = _connect(path)
+    try:
+        query = "SELECT run_id, flow, tool, user, host, start, duration, status FROM runs"
+        args = []
+        if flow:
+            query += " WHERE flow = ?"
+            args.append(flow)
+        query += " ORDER BY start DESC LIMIT ?"
+        return conn.execute(query, args + [limit]).fetchall()
+    finally:
+        conn.close()
+
+
+def slowest_steps(path, flow=None, limit=10):
+    """Tool steps (syn_gen, syn_map, ...) ranked by their p95 wall time."""
+    conn = _connect(path)
+    try:
+        query = (
+            "SELECT runs.flow, run_steps.step, run_steps.wall_seconds FROM run_steps"
+            " JOIN runs ON runs.run_id = run_steps.run_id"
+            " WHERE run_steps.wall_seconds IS NOT NULL AND runs.status = 'passed'"
+        )
+        args = []
+        if flow:
+            query += " AND runs.flow = ?"
+            args.append(flow)
+        samples = {}
+        for flow_name, step, wall in conn.execute(query, args):
+            samples.setdefault((flow_name, step), []).append(wall)
+    finally:
+        conn.close()
+
+    rows = [
+        (flow_name, step, len(v), percentile(v, 50), percentile(v, 95))
+        for (flow_name, step), v in samples.items()
+    ]
+    return sorted(rows, key=lambda r: r[4], reverse=True)[:limit]
+
+
+def runtime_stats(path, flow=None):
+    """Per flow/tool: number of passed runs, p50, p95 and max duration in seconds."""
+    conn = _connect(path)
+    try:
+        query = "SELECT flow, tool, duration FROM runs WHERE status = 'passed'"
+        args = []
+        if flow:
+            query += " AND flow = ?"
+            args.append(flow)
+        samples = {}
+        for flow_name, tool, duration in conn.execute(query, args):
+            samples.setdefault((flow_name, tool), []).append(duration)
+    finally:
+        conn.close()
+
+    return [
+        (flow_name, tool, len(v), percentile(v, 50), percentile(v, 95), max(v))
+        for (flow_name, tool), v in sorted(samples.items())
+    ]
+
+
+def regressions(path, threshold=1.2):
+    """Flows whose median runtime grew by more than threshold after the latest script change."""
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT flow, script_hash, duration FROM runs WHERE status = 'passed' ORDER BY start"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    # flow -> runs split wherever the script hash changes: [(hash, [durations]), ...].
+    # A reverted script (A -> B -> A) starts a new segment instead of rejoining A.
+    by_flow = {}
+    for flow_name, script_hash, duration in rows:
+        segments = by_flow.setdefault(flow_name, [])
+        if not segments or segments[-1][0] != script_hash:
+            segments.append((script_hash, []))
+        segments[-1][1].append(duration)
+
+    found = []
+    for flow_name, segments in by_flow.items():
+        if len(segments) < 2:
+            continue
+        (old_hash, old_runs), (new_hash, new_runs) = segments[-2:]
+        before = percentile(old_runs, 50)
+        after = percentile(new_runs, 50)
+        if before and after / before > threshold:
+            found.append((flow_name, old_hash, new_hash, before, after, after / before))
+    return found
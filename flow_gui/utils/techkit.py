@@ -0,0 +1,63 @@
+import os
+import re
+import fnmatch
+
+SET_RE = re.compile(r"^\s*set\s+(TECHKIT_\w+)\s+(.*)$")
+
+# Variables that name library cells (patterns allowed) and the ports that must exist on them
+CELL_VARS = (
+    "TECHKIT_DRIVING_CELL",
+    "TECHKIT_FILLER_CELLS",
+    "TECHKIT_TIE_CELLS",
+    "TECHKIT_WELL_TAP_CELL",
+    "TECHKIT_END_CAP_CELL",
+    "TECHKIT_ANTENNA_CELL",
+    "TECHKIT_BUF_CELL_LIST",
+    "TECHKIT_TIE_HI_CELL",
+    "TECHKIT_TIE_LO_CELL",
+    "TECHKIT_MIN_BUF_CELL",
+)
+PORT_VARS = {
+    "TECHKIT_TIE_HI_PORT": "TECHKIT_TIE_HI_CELL",
+    "TECHKIT_TIE_LO_PORT": "TECHKIT_TIE_LO_CELL",
+    "TECHKIT_MIN_BUF_PORT_I": "TECHKIT_MIN_BUF_CELL",
+    "TECHKIT_MIN_BUF_PORT_O": "TECHKIT_MIN_BUF_CELL",
+}
+DONT_USE_VAR = "TECHKIT_DONT_USE_CELL_LIST"
+
+
+def techkit_path(root=None):
+    root = root or os.environ.get("LOGICLANCE_ROOT", "")
+    return os.path.join(root, "configs", "techkit", "techkit.tcl")
+
+
+def load_techkit(path=None):
+    """Read the 'set TECHKIT_* value' lines of techkit.tcl into {name: value}."""
+    path = path or techkit_path()
+    with open(path, "r") as f:
+        text = f.read().replace("\\\n", " ")
+
+    values = {}
+    for line in text.splitlines():
+        match = SET_RE.match(line)
+        if not match:
+            continue
+        value = match.group(2).split(";#")[0].strip()
+        if value.startswith('"'):
+            value = value[1:].split('"', 1)[0]
+        elif value.startswith("{"):
+            value = value[1:].rsplit("}", 1)[0]
+        else:
+            value = value.split("#")[0].strip()
+        values[match.group(1)] = value
+    return values
+
+
+def cell_list(techkit, name):
+    """The cell names (or glob patterns) held by a TECHKIT list variable."""
+    return techkit.get(name, "").split()
+
+
+def match_cells(patterns, cells):
+    """{pattern: [matching cell, ...]} for glob patterns against known cell names."""
+    return {pattern: fnmatch.filter(cells, pattern) for pattern in patterns}
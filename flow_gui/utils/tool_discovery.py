@@ -0,0 +1,117 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from .paths import user_cache_dir
+
+# Binaries that make up each configured tool
+TOOL_BINARY_MAP = {
+    "cadence": ["genus", "innovus"],
+    "synopsys": ["dc_shell", "icc2_shell"],
+    "openlane": ["flow.tcl"],
+    "yosys": ["yosys"],
+    "openroad": ["openroad"],
+    "verilator": ["verilator"],
+}
+
+# Flag that makes each binary print its version and exit
+VERSION_FLAGS = {
+    "genus": "-version",
+    "innovus": "-version",
+    "tempus": "-version",
+    "lec": "-version",
+    "dc_shell": "-version",
+    "icc2_shell": "-version",
+    "pt_shell": "-version",
+    "yosys": "-V",
+    "openroad": "-version",
+    "sta": "-version",
+    "verilator": "--version",
+}
+
+VERSION_PATTERN = re.compile(r"\b[vV]?\d+(?:\.\d+)+[\w.-]*|\b[A-Z]-\d{4}\.\d+[\w.-]*")
+PROBE_WORKERS = 16
+VERSION_TIMEOUT = 20
+
+
+def _cache_file():
+    return os.path.join(user_cache_dir(), "tools.json")
+
+
+def _path_key(path_dirs, pool):
+    """Key the cache on $PATH and the mtime of every directory in it."""
+    def mtime(d):
+        try:
+            return os.stat(d).st_mtime_ns
+        except OSError:
+            return None
+
+    mtimes = list(pool.map(mtime, path_dirs))
+    return hashlib.sha256(json.dumps(list(zip(path_dirs, mtimes))).encode()).hexdigest()
+
+
+def detect_version(binary_path, name):
+    flag = VERSION_FLAGS.get(name, "--version")
+    try:
+        result = subprocess.run(
+            [binary_path, flag],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            timeout=VERSION_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = VERSION_PATTERN.search(result.stdout.decode(errors="replace"))
+    return match.group(0) if match else None
+
+
+def version_matches(expected, detected):
+    """Loose match between a flow_setup.json version ('231', 'v0.15') and a tool banner."""
+    if not expected or not detected:
+        return False
+    norm = lambda v: re.sub(r"[^0-9a-z]", "", v.lower()).lstrip("v")
+    return norm(detected).startswith(norm(expected)) or norm(expected) in norm(detected)
+
+
+def discover_binaries(binaries, detect_versions=False, path=None):
+    """{binary: {"path", "version"}} for binaries on path (default $PATH), probed in parallel and cached."""
+    path = path if path is not None else os.environ.get("PATH", "")
+    path_dirs = path.split(os.pathsep)
+    cache_file = _cache_file()
+
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        key = _path_key(path_dirs, pool)
+
+        try:
+            with open(cache_file, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        entries = cache.get("binaries", {}) if cache.get("path_key") == key else {}
+
+        missing = [b for b in binaries if b not in entries]
+        for name, found in zip(missing, pool.map(lambda b: shutil.which(b, path=path), missing)):
+            entries[name] = {"path": found, "version": None, "version_checked": False}
+
+        unchecked = []
+        if detect_versions:
+            unchecked = [b for b in binaries if entries[b]["path"] and not entries[b]["version_checked"]]
+            versions = pool.map(lambda b: detect_version(entries[b]["path"], b), unchecked)
+            for name, version in zip(unchecked, versions):
+                entries[name]["version"] = version
+                entries[name]["version_checked"] = True
+
+    if missing or unchecked:
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"path_key": key, "binaries": entries}, f, indent=2)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    return {b: entries[b] for b in binaries}
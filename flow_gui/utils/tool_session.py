@@ -0,0 +1,290 @@
+import os
+import re
+import sys
+import time
+import atexit
+import threading
+import selectors
+import subprocess
+from .process_runner import current_cancel, logs_root, rotate_log
+from .tracing import span
+
+# Long-lived interactive command line for each tool that supports sessions.
+# The tool must read Tcl from stdin when it is not a terminal.
+SESSION_COMMANDS = {
+    "genus": "genus -no_gui -log {tool_log}",
+    "yosys": "yosys -C",
+}
+
+MAX_JOBS = 20
+START_TIMEOUT = 900
+HEALTH_TIMEOUT = 30
+
+# End-of-job marker: <<LL:DONE:<call>:<return code>>>. The code is only filled in
+# by Tcl, so a tool echoing the command it read never prints a matching line, and
+# the per-call number tells a late answer to an earlier call from the current one.
+SENTINEL = "<<LL:DONE:"
+SENTINEL_RE = re.compile(r"<<LL:DONE:(\d+):(-?\d+)>>")
+
+# Sent once after startup: scripts that call 'exit' (START.tcl does) end the
+# job instead of the tool. The real exit stays available as __ll_exit.
+PREAMBLE = """
+rename exit __ll_exit
+proc exit {{code 0}} { return -code error -errorcode [list LL_EXIT $code] "exit $code" }
+"""
+
+JOB_TEMPLATE = """
+set __ll_rc [catch {{source {script}}} __ll_msg __ll_opts]
+if {{$__ll_rc == 1 && [lindex [dict get $__ll_opts -errorcode] 0] eq "LL_EXIT"}} {{
+    set __ll_rc [lindex [dict get $__ll_opts -errorcode] 1]
+}} elseif {{$__ll_rc == 1}} {{
+    puts "Error: $__ll_msg"
+}} elseif {{$__ll_rc == 2}} {{
+    set __ll_rc 0
+}}
+{done}"""
+
+
+def tcl_quote(value):
+    return '"' + re.sub(r'([\\\[\]$"{}])', r"\\\1", str(value)) + '"'
+
+
+class SessionError(RuntimeError):
+    pass
+
+
+class ToolSession:
+    """A tool process kept alive between jobs and fed Tcl over its stdin.
+
+    Each job ends with a sentinel line carrying its exit code. The process is
+    restarted after max_jobs jobs or when it has died.
+    """
+
+    def __init__(self, binary, max_jobs=MAX_JOBS, command=None, licenses=None):
+        self.binary = binary
+        self.max_jobs = max_jobs
+        self.command = command or SESSION_COMMANDS[binary]
+        # The tool keeps its license checked out, so the session holds the slot for its lifetime
+        self.licenses = licenses
+        self.lease = None
+        self.proc = None
+        self.jobs = 0
+        self.started = None
+        self.base_env = {}
+        self.job_env = {}
+        self.lock = threading.Lock()
+        self._pending = b""
+        self._calls = 0
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self, env=None):
+        env = dict(env or os.environ)
+        log_dir = os.path.join(logs_root(env), "sessions")
+        os.makedirs(log_dir, exist_ok=True)
+        started_at = time.time()
+        if self.licenses:
+            self.lease, _ = self.licenses.acquire(self.binary)
+        with span("session.start", binary=self.binary) as s:
+            self.proc = subprocess.Popen(
+                self.command.format(tool_log=os.path.join(log_dir, self.binary)),
+                shell=True,
+                executable="/bin/bash",
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=current_cancel.get() is not None,
+            )
+            s.set(pid=self.proc.pid)
+            self.base_env = env
+            self.job_env = {}
+            self.jobs = 0
+            self._pending = b""
+            self._send(PREAMBLE)
+            # Startup and license checkout happen here, once per session
+            if not self.ping(START_TIMEOUT):
+                self.stop()
+                raise SessionError(f"{self.binary} session did not come up")
+        self.started = time.time()
+        print(f"✅ {self.binary} session ready (pid {self.proc.pid}, {self.started - started_at:.1f} s startup)")
+
+    def stop(self):
+        if self.proc is None:
+            return
+        if self.alive:
+            try:
+                self._send("__ll_exit 0\n")
+                self.proc.wait(timeout=HEALTH_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+        self.proc = None
+        if self.licenses:
+            self.licenses.release(self.lease)
+            self.lease = None
+
+    def _sentinel(self, code):
+        """(call number, Tcl printing the sentinel with the value of the Tcl expression code)."""
+        self._calls += 1
+        return self._calls, f'puts "{SENTINEL}{self._calls}:[expr {{{code}}}]>>"\nflush stdout\n'
+
+    def ping(self, timeout=HEALTH_TIMEOUT):
+        """Health check: the tool must answer a sentinel within timeout seconds."""
+        if not self.alive:
+            return False
+        try:
+            call, command = self._sentinel("0")
+            self._send(command)
+            return self._read_until_done(None, None, "", timeout, call) == 0
+        except (OSError, SessionError):
+            return False
+
+    def run_script(self, script, log_path, env=None, on_line=None, prefix=""):
+        """Source script in the session, teeing its output into log_path. Returns its exit code."""
+        env = env or {}
+        # A script asking for the top with 'gets stdin' would read the next job off the session pipe
+        if not env.get("DESIGN"):
+            raise SessionError("Session jobs need the top module in DESIGN (-top)")
+        with self.lock:
+            if self.jobs >= self.max_jobs or not self.ping():
+                reason = "recycling" if self.jobs >= self.max_jobs else "restarting unhealthy"
+                if self.proc is not None:
+                    print(f"♻️  {reason} {self.binary} session after {self.jobs} job(s)")
+                self.stop()
+                self.start(env)
+
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            rotate_log(log_path)
+            setup = [f"cd {tcl_quote(os.getcwd())}"]
+            # Undo what the previous job changed, then apply this job's environment
+            for key in self.job_env:
+                if key not in env:
+                    if key in self.base_env:
+                        setup.append(f"set ::env({key}) {tcl_quote(self.base_env[key])}")
+                    else:
+                        setup.append(f"unset -nocomplain ::env({key})")
+            self.job_env = {k: v for k, v in env.items() if self.base_env.get(k) != v}
+            for key, value in self.job_env.items():
+                setup.append(f"set ::env({key}) {tcl_quote(value)}")
+            self._send("\n".join(setup) + "\n")
+            call, done = self._sentinel("$__ll_rc")
+            self._send(JOB_TEMPLATE.format(script=tcl_quote(os.path.abspath(script)), done=done))
+            self.jobs += 1
+            # Killing the job from the shell takes the session down; the next job restarts it
+            token = current_cancel.get()
+            if token:
+                token.track(self.proc)
+            try:
+                with span("session.run", binary=self.binary, pid=self.proc.pid, job=self.jobs) as s:
+                    with open(log_path, "ab") as log:
+                        returncode = self._read_until_done(log, on_line, prefix, None, call)
+                    s.set(exit_code=returncode)
+                    return returncode
+            finally:
+                if token:
+                    token.untrack(self.proc)
+
+    def _send(self, text):
+        self.proc.stdin.write(text.encode())
+        self.proc.stdin.flush()
+
+    def _read_until_done(self, log, on_line, prefix, timeout, call):
+        deadline = time.time() + timeout if timeout else None
+        selector = selectors.DefaultSelector()
+        selector.register(self.proc.stdout, selectors.EVENT_READ)
+        try:
+            while True:
+                # Complete lines left over from the last read come first
+                while b"\n" in self._pending:
+                    raw, self._pending = self._pending.split(b"\n", 1)
+                    line = raw.decode(errors="replace")
+                    match = SENTINEL_RE.search(line)
+                    if match:
+                        if int(match.group(1)) == call:
+                            return int(match.group(2))
+                        # Answer to an earlier call that timed out
+                        continue
+                    if log:
+                        log.write(raw + b"\n")
+                        log.flush()
+                        sys.stdout.write(prefix + line + "\n")
+                        sys.stdout.flush()
+                    if on_line:
+                        on_line("stdout", line)
+
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise SessionError(f"{self.binary} session did not answer within {timeout} s")
+                if not selector.select(remaining):
+                    continue
+                chunk = os.read(self.proc.stdout.fileno(), 65536)
+                if not chunk:
+                    # The tool died mid-job; report its exit code
+                    code = self.proc.wait()
+                    return code if code else 1
+                self._pending += chunk
+        finally:
+            selector.close()
+
+    def status(self):
+        return {
+            "binary": self.binary,
+            "pid": self.proc.pid if self.alive else None,
+            "alive": self.alive,
+            "jobs": self.jobs,
+            "max_jobs": self.max_jobs,
+            "uptime_seconds": round(time.time() - self.started, 1) if self.alive and self.started else None,
+        }
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _key(binary, env=None):
+    env = env if env is not None else os.environ
+    return (env.get("LOGICLANCE_USER", ""), env.get("PROJECT_NAME", ""), binary)
+
+
+def get_session(binary, env=None):
+    """Return this user/project's running session for binary, or None."""
+    session = _sessions.get(_key(binary, env))
+    return session if session and session.alive else None
+
+
+def start_session(binary, max_jobs=MAX_JOBS, command=None, licenses=None, env=None):
+    """Start (or return the running) session for binary; command overrides SESSION_COMMANDS."""
+    if binary not in SESSION_COMMANDS and not command:
+        raise SessionError(f"No session mode for '{binary}' (supported: {', '.join(SESSION_COMMANDS)})")
+    with _sessions_lock:
+        key = _key(binary, env)
+        session = _sessions.get(key)
+        if session and session.alive:
+            return session
+        session = ToolSession(binary, max_jobs, command, licenses)
+        session.start(env)
+        _sessions[key] = session
+        return session
+
+
+def stop_session(binary, env=None):
+    with _sessions_lock:
+        session = _sessions.pop(_key(binary, env), None)
+    if session:
+        session.stop()
+    return session is not None
+
+
+def list_sessions():
+    return [session.status() for session in _sessions.values()]
+
+
+@atexit.register
+def stop_all_sessions():
+    for key in list(_sessions):
+        _sessions.pop(key).stop()
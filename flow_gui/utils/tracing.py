@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import itertools
+import threading
+import contextvars
+
+# Parent of the next span. Flow workers run in a copy of the scheduler's
+# context, so a stage's spans nest under the run that launched it.
+_current = contextvars.ContextVar("trace_span", default=None)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+# Chrome metadata already written: (pid,) for the process name, (pid, ident, name) per thread
+_named = set()
+_trace_name = None
+# Read once: span() runs on every shell command and an environ lookup is not free
+_enabled = os.environ.get("LOGICLANCE_TRACE") == "1"
+
+
+def tracing_enabled():
+    """Tracing is on with LOGICLANCE_TRACE=1 (`--trace`, or `trace on` in the shell)."""
+    return _enabled
+
+
+def enable_tracing(on=True):
+    """Turn tracing on or off; LOGICLANCE_TRACE follows so child processes agree."""
+    global _enabled
+    _enabled = on
+    if on:
+        os.environ["LOGICLANCE_TRACE"] = "1"
+    else:
+        os.environ.pop("LOGICLANCE_TRACE", None)
+
+
+def trace_paths():
+    """(jsonl, chrome json) under LOG_PATH/traces, named by LOGICLANCE_TRACE_NAME or the day."""
+    global _trace_name
+    from .process_runner import logs_root
+    if _trace_name is None:
+        _trace_name = os.environ.get("LOGICLANCE_TRACE_NAME") or time.strftime("trace-%Y%m%d")
+    trace_dir = os.path.join(logs_root(), "traces")
+    return (os.path.join(trace_dir, f"{_trace_name}.jsonl"),
+            os.path.join(trace_dir, f"{_trace_name}.json"))
+
+
+class Span:
+    """One timed step; as a context manager it parents the spans opened inside it."""
+
+    def __init__(self, name, attrs, parent=None):
+        self.id = f"{os.getpid()}.{next(_ids)}"
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent.id if parent else None
+        self.start = time.time()
+        self.end = None
+        thread = threading.current_thread()
+        self.thread = (thread.ident, thread.name)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        if exc is not None:
+            self.attrs["error"] = repr(exc)
+        self.end = time.time()
+        _write(self)
+        return False
+
+
+class _NoSpan:
+    """What span() returns while tracing is off: accepts everything, records nothing."""
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+def _chrome_events(record):
+    """Trace-event entries for a finished span: a complete ("X") event, preceded by name metadata when new."""
+    pid = os.getpid()
+    ident, thread_name = record.thread
+    events = []
+    if (pid,) not in _named:
+        _named.add((pid,))
+        label = " ".join(filter(None, ("logiclance", os.environ.get("PROJECT_NAME"), os.environ.get("LOGICLANCE_USER"))))
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{label} ({pid})"}})
+    # Pool threads reuse idents, so a new name for the same ident is written again
+    if (pid, ident, thread_name) not in _named:
+        _named.add((pid, ident, thread_name))
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": ident, "args": {"name": thread_name}})
+    events.append({
+        "name": record.name,
+        "cat": record.name.split(".")[0],
+        "ph": "X",
+        "ts": int(record.start * 1e6),
+        "dur": int((record.end - record.start) * 1e6),
+        "pid": pid,
+        "tid": ident,
+        "args": dict(record.attrs, span=record.id, parent=record.parent),
+    })
+    return events
+
+
+def _write(record):
+    jsonl_path, chrome_path = trace_paths()
+    line = {
+        "id": record.id,
+        "parent": record.parent,
+        "name": record.name,
+        "start": record.start,
+        "end": record.end,
+        "duration": round(record.end - record.start, 6),
+        "pid": os.getpid(),
+        "thread": record.thread[1],
+        "attrs": record.attrs,
+    }
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(jsonl_path), exist_ok=True)
+            # The Chrome JSON array is left open so every process can keep appending to it;
+            # chrome://tracing and Perfetto accept a missing closing bracket.
+            try:
+                fd = os.open(chrome_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                os.write(fd, b"[\n")
+                os.close(fd)
+            except FileExistsError:
+                pass
+            events = _chrome_events(record)
+            # One append per span: lines from concurrent processes do not interleave
+            with open(jsonl_path, "a") as f:
+                f.write(json.dumps(line, default=str) + "\n")
+            with open(chrome_path, "a") as f:
+                f.write("".join(json.dumps(event, default=str) + ",\n" for event in events))
+    except OSError:
+        pass
+
+
+def span(name, **attrs):
+    """Context manager timing the enclosed block as a span (a no-op unless tracing is enabled)."""
+    if not tracing_enabled():
+        return NO_SPAN
+    return Span(name, attrs, _current.get())
+
+
+def record_span(name, start, end, **attrs):
+    """Record a span measured elsewhere (e.g. a license queue) under the current span."""
+    if not tracing_enabled():
+        return
+    record = Span(name, attrs, _current.get())
+    record.start, record.end = start, end
+    _write(record)
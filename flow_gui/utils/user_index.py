@@ -0,0 +1,177 @@
+import os
+import csv
+import hashlib
+import sqlite3
+from .paths import user_cache_dir
+
+# Per-flow permission columns of employees.csv, one bit each
+FLOW_PERMISSIONS = ("linting", "synthesis", "lec", "pnr")
+PERMISSION_BITS = {flow: 1 << i for i, flow in enumerate(FLOW_PERMISSIONS)}
+
+SCHEMA_VERSION = "3"
+
+
+def permission_mask(row):
+    mask = 0
+    for flow, bit in PERMISSION_BITS.items():
+        if (row.get(flow) or "").strip().lower() == "yes":
+            mask |= bit
+    return mask
+
+
+def has_permission(user, flow):
+    """True if the user record allows the given flow (linting, synthesis, lec, pnr)."""
+    bit = PERMISSION_BITS.get(flow)
+    if bit is None:
+        return False
+    mask = user.get("permissions")
+    if mask is None:
+        mask = permission_mask(user)
+    return bool(mask & bit)
+
+
+def _user_record(row):
+    """What the index keeps of a CSV row: lookup fields only, never the password hash."""
+    return {
+        "name": (row.get("name") or "").strip().lower(),
+        "email": (row.get("email") or "").strip().lower(),
+        "permissions": permission_mask(row),
+        "team": (row.get("team") or "").strip(),
+    }
+
+
+def _csv_key(csv_path):
+    st = os.stat(csv_path)
+    return f"{SCHEMA_VERSION}:{st.st_ino}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _index_path(csv_path):
+    digest = hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()
+    return os.path.join(user_cache_dir("users"), f"{digest}.sqlite")
+
+
+def _read_rows(csv_path):
+    """(byte offset, row) for every line of the CSV, so a row can be read back on its own."""
+    with open(csv_path, "rb") as f:
+        header = next(csv.reader([f.readline().decode(errors="replace")]), [])
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            values = next(csv.reader([line.decode(errors="replace")]), None)
+            if values:
+                yield offset, dict(zip(header, values))
+
+
+def _row_at(csv_path, offset):
+    with open(csv_path, "rb") as f:
+        header = next(csv.reader([f.readline().decode(errors="replace")]), [])
+        f.seek(offset)
+        values = next(csv.reader([f.readline().decode(errors="replace")]), None)
+    return dict(zip(header, values)) if values else None
+
+
+def _build_index(csv_path, db_path, key):
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "CREATE TABLE users (name TEXT, email TEXT, permissions INTEGER, team TEXT, offset INTEGER)"
+        )
+        conn.executemany(
+            "INSERT INTO users VALUES (:name, :email, :permissions, :team, :offset)",
+            (dict(_user_record(row), offset=offset) for offset, row in _read_rows(csv_path)),
+        )
+        conn.execute("CREATE INDEX users_name ON users (name)")
+        conn.execute("CREATE INDEX users_email ON users (email)")
+        conn.execute("INSERT INTO meta VALUES ('csv_key', ?)", (key,))
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Readers never see a half-built index
+    os.replace(tmp_path, db_path)
+
+
+def _open_index(csv_path):
+    key = _csv_key(csv_path)
+    db_path = _index_path(csv_path)
+
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'csv_key'").fetchone()
+            if row and row[0] == key:
+                return conn
+        except sqlite3.DatabaseError:
+            pass
+        conn.close()
+
+    _build_index(csv_path, db_path, key)
+    return sqlite3.connect(db_path)
+
+
+def _scan_csv(csv_path, column, value):
+    with open(csv_path, newline="") as csvfile:
+        for row in csv.DictReader(csvfile):
+            if (row.get(column) or "").strip().lower() == value:
+                return row
+    return None
+
+
+def find_user(csv_path, name=None, email=None):
+    """{name, email, permissions, team} of the employees.csv user with that name or email, or None.
+
+    Looked up through an SQLite index in the user cache, rebuilt when the CSV changes.
+    """
+    column, value = ("email", email) if email else ("name", name)
+    value = (value or "").strip().lower()
+
+    try:
+        conn = _open_index(csv_path)
+    except (OSError, sqlite3.Error):
+        # Read-only home or broken cache: fall back to scanning the CSV
+        row = _scan_csv(csv_path, column, value)
+        return _user_record(row) if row is not None else None
+
+    try:
+        found = conn.execute(
+            f"SELECT name, email, permissions, team FROM users WHERE {column} = ? ORDER BY rowid LIMIT 1",
+            (value,),
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if not found:
+        return None
+    return dict(zip(("name", "email", "permissions", "team"), found))
+
+
+def password_hash(csv_path, name):
+    """The user's password hash, read from their row of the CSV itself ("" if none).
+
+    The index only holds the row's byte offset, never the hash.
+    """
+    name = (name or "").strip().lower()
+    row = None
+    try:
+        conn = _open_index(csv_path)
+        try:
+            found = conn.execute(
+                "SELECT offset FROM users WHERE name = ? ORDER BY rowid LIMIT 1", (name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if found:
+            row = _row_at(csv_path, found[0])
+    except (OSError, sqlite3.Error):
+        pass
+    # The CSV changed under the index (or there is no index): scan it
+    if row is None or (row.get("name") or "").strip().lower() != name:
+        row = _scan_csv(csv_path, "name", name)
+    return (row.get("password") or "").strip().lower() if row else ""
@@ -102,7 +102,7 @@ def generate_env_sh(project_name):
         "LEF_PATH": os.path.join(project_root, "data", "lef"),
         "SDC_PATH": os.path.join(project_root, "data", "sdc"),
         "LOG_PATH": os.path.join(project_root, "logs"),
-        "OUTPUTS_PATH": os.path(project_root, "outputs"),
+        "OUTPUTS_PATH": os.path.join(project_root, "outputs"),
         "REPORTS_PATH": os.path.join(project_root, "reports"),
         "CONFIG_PATH": os.path.join(config_root, "config.json")
     }
@@ -114,6 +114,12 @@ def generate_env_sh(project_name):
         for key, path in paths.items():
             f.write(f"export {key}={path}\n")
 
+    # Same variables as an env manifest, which the CLI applies without sourcing
+    # the .sh (format of flow_gui/utils/env_manifest.py)
+    manifest_path = os.path.join(project_root, f".env_{project_name}.json")
+    with open(manifest_path, "w") as f:
+        json.dump({"version": 1, "set": paths, "unset": []}, f, indent=2)
+
     # Export to os.environ
     for key, path in paths.items():
         os.environ[key] = path
@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+# The CLI runs with flow_gui on sys.path (main.py is started as a script)
+FLOW_GUI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flow_gui")
+sys.path.insert(0, os.path.abspath(FLOW_GUI))
+
+STUBS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+
+
+@pytest.fixture
+def log_env(tmp_path, monkeypatch):
+    """LOG_PATH, OUTPUTS_PATH and the cache under tmp_path; returns the environment."""
+    monkeypatch.setenv("LOG_PATH", str(tmp_path / "logs"))
+    monkeypatch.setenv("OUTPUTS_PATH", str(tmp_path / "outputs"))
+    monkeypatch.setenv("LOGICLANCE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("LOGICLANCE_TRACE", raising=False)
+    from utils import tracing
+    monkeypatch.setattr(tracing, "_enabled", False)
+    return dict(os.environ)
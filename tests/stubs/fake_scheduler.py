@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Stand-in for the LSF and SLURM CLIs, dispatched on the name it is called by.
+
+bsub/sbatch run the job script in the background: it stays pending for
+$FAKE_PEND seconds, then runs with its output in the -o file. Job state
+lives in $FAKE_SCHEDULER_DIR; every status query is appended to its
+"queries" file. With $FAKE_FORGET set, jobs are accepted but never
+recorded, as if purged from the scheduler's history.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import subprocess
+
+STATE_DIR = os.environ.get("FAKE_SCHEDULER_DIR", ".")
+LSF_STATES = {"pending": "PEND -", "running": "RUN -", "cancelled": "EXIT 143"}
+SLURM_STATES = {"pending": "PENDING|0:0", "running": "RUNNING|0:0", "cancelled": "CANCELLED by 0|0:15"}
+
+
+def state_file(job_id):
+    return os.path.join(STATE_DIR, f"{job_id}.json")
+
+
+def load(job_id):
+    try:
+        with open(state_file(job_id)) as f:
+            return json.load(f)
+    except OSError:
+        return None
+
+
+def save(job_id, job):
+    with open(state_file(job_id) + ".tmp", "w") as f:
+        json.dump(job, f)
+    os.replace(state_file(job_id) + ".tmp", state_file(job_id))
+
+
+def fail(message):
+    sys.stderr.write(message + "\n")
+    sys.exit(255)
+
+
+def submit(args):
+    log_path = args[args.index("-o") + 1]
+    script = args[-1]
+    counter = os.path.join(STATE_DIR, "next_id")
+    job_id = int(open(counter).read()) if os.path.exists(counter) else 1000
+    with open(counter, "w") as f:
+        f.write(str(job_id + 1))
+    if not os.environ.get("FAKE_FORGET"):
+        save(job_id, {"state": "pending", "code": None, "pid": None})
+        subprocess.Popen([sys.executable, os.path.realpath(__file__), "_run", str(job_id), script, log_path],
+                         start_new_session=True, stdin=subprocess.DEVNULL,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return job_id
+
+
+def run_job(job_id, script, log_path):
+    time.sleep(float(os.environ.get("FAKE_PEND", "0")))
+    job = load(job_id)
+    if job["state"] != "pending":
+        return
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(["bash", script], stdout=log, stderr=subprocess.STDOUT)
+        save(job_id, dict(job, state="running", pid=proc.pid))
+        code = proc.wait()
+    if load(job_id)["state"] == "running":
+        save(job_id, dict(job, state="done", code=code))
+
+
+def query(job_id):
+    job = load(job_id)
+    with open(os.path.join(STATE_DIR, "queries"), "a") as f:
+        f.write(f"{job_id} {job['state'] if job else 'unknown'}\n")
+    return job
+
+
+def cancel(job_id):
+    job = load(job_id)
+    if not job:
+        fail(f"Job <{job_id}>: No matching job found")
+    if job["pid"]:
+        try:
+            os.kill(job["pid"], signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    save(job_id, dict(job, state="cancelled", code=143))
+
+
+def main(command, args):
+    if command == "_run":
+        run_job(*args)
+    elif command == "bsub":
+        print(f"Job <{submit(args)}> is submitted to default queue <normal>.")
+    elif command == "sbatch":
+        assert args[0] == "--parsable", args
+        print(f"{submit(args)};fakecluster")
+    elif command == "bjobs":
+        assert args[:3] == ["-noheader", "-o", "stat exit_code"], args
+        job = query(args[3])
+        if not job:
+            fail(f"Job <{args[3]}> is not found")
+        if job["state"] == "done":
+            print("DONE -" if job["code"] == 0 else f"EXIT {job['code']}")
+        else:
+            print(LSF_STATES[job["state"]])
+    elif command == "sacct":
+        assert args == ["-n", "-P", "-X", "-j", args[4], "-o", "State,ExitCode"], args
+        job = query(args[4])
+        if job and job["state"] == "done":
+            print(f"{'COMPLETED' if job['code'] == 0 else 'FAILED'}|{job['code']}:0")
+        elif job:
+            print(SLURM_STATES[job["state"]])
+    elif command in ("bkill", "scancel"):
+        cancel(args[0])
+    else:
+        fail(f"unknown command {command}")
+
+
+if __name__ == "__main__":
+    name = os.path.basename(sys.argv[0])
+    if name.endswith(".py"):
+        main(sys.argv[1], sys.argv[2:])
+    else:
+        main(name, sys.argv[1:])
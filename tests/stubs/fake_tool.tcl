@@ -0,0 +1,19 @@
+# Stand-in for an EDA tool in session mode: evaluates Tcl read from stdin.
+# With -echo it first prints every command it reads, as genus does when
+# logging the commands of a non-interactive session.
+set echo [expr {[lindex $argv 0] eq "-echo"}]
+set command ""
+while {[gets stdin line] >= 0} {
+    append command $line "\n"
+    if {![info complete $command]} {
+        continue
+    }
+    if {$echo} {
+        puts -nonewline "@genus> $command"
+    }
+    if {[catch {uplevel #0 $command} message]} {
+        puts "Error: $message"
+    }
+    flush stdout
+    set command ""
+}
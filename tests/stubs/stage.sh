@@ -0,0 +1,7 @@
+# Stand-in for a tool run: logs start/end to $STAGE_EVENTS, takes
+# $STAGE_SLEEP seconds and exits with $STAGE_EXIT.
+echo "start $STAGE_NAME $(date +%s.%N)" >> "$STAGE_EVENTS"
+echo "Running $STAGE_NAME"
+sleep "${STAGE_SLEEP:-0}"
+echo "end $STAGE_NAME $(date +%s.%N)" >> "$STAGE_EVENTS"
+exit "${STAGE_EXIT:-0}"
@@ -0,0 +1,44 @@
+import hashlib
+import pytest
+from utils import auth
+
+PASSWORD_HASH = hashlib.sha256(b"secret").hexdigest()
+USER = {"name": "sanjay", "email": "sanjay@example.com", "permissions": 0, "team": "pd"}
+
+
+@pytest.fixture(autouse=True)
+def employees(tmp_path, log_env):
+    (tmp_path / "employees.csv").write_text(
+        f"name,email,password,linting,synthesis,lec,pnr,team\nsanjay,sanjay@example.com,{PASSWORD_HASH},no,yes,no,no,pd\n"
+    )
+
+
+def test_password_hash_is_not_a_token(tmp_path):
+    auth.issue_token("sanjay", str(tmp_path))
+    assert not auth.verify_credentials(USER, token=PASSWORD_HASH, config_root=str(tmp_path))
+
+
+def test_issued_token_is_accepted_until_revoked(tmp_path):
+    token = auth.issue_token("sanjay", str(tmp_path))
+    assert token not in (tmp_path / auth.TOKEN_FILE).read_text()
+    assert auth.verify_credentials(USER, token=token, config_root=str(tmp_path))
+    assert auth.revoke_token("sanjay", str(tmp_path))
+    assert not auth.verify_credentials(USER, token=token, config_root=str(tmp_path))
+
+
+def test_new_token_replaces_the_old_one(tmp_path):
+    old = auth.issue_token("sanjay", str(tmp_path))
+    new = auth.issue_token("sanjay", str(tmp_path))
+    assert not auth.verify_credentials(USER, token=old, config_root=str(tmp_path))
+    assert auth.verify_credentials(USER, token=new, config_root=str(tmp_path))
+
+
+def test_token_is_bound_to_its_user(tmp_path):
+    token = auth.issue_token("sanjay", str(tmp_path))
+    assert not auth.verify_credentials({"name": "priya"}, token=token, config_root=str(tmp_path))
+
+
+def test_password_login(tmp_path):
+    assert auth.verify_credentials(USER, password="secret", config_root=str(tmp_path))
+    assert not auth.verify_credentials(USER, password="wrong", config_root=str(tmp_path))
+    assert not auth.verify_credentials(USER, config_root=str(tmp_path))
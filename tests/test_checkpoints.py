@@ -0,0 +1,44 @@
+import os
+import types
+from utils.checkpoints import checkpoint_mtimes, find_checkpoint, record_checkpoints
+from utils.preflight import _check_scripts
+
+CADENCE_SYNTHESIS = os.path.join(os.path.dirname(__file__), "..", "flow_gui", "scripts", "cadence", "synthesis")
+
+
+def write_db(directory, design, step, mtime):
+    path = directory / f"{design}_{step}.db"
+    path.write_text(step)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_manifest_tags_new_checkpoints_with_their_inputs(tmp_path):
+    before = checkpoint_mtimes(str(tmp_path), "top")
+    generic = write_db(tmp_path, "top", "generic", 1000)
+    mapped = write_db(tmp_path, "top", "map", 1000)
+    record_checkpoints(str(tmp_path), "top", "digest-a", before)
+
+    assert find_checkpoint(str(tmp_path), "top", "digest-a") == ("map", mapped)
+    assert find_checkpoint(str(tmp_path), "top", "digest-a", step="generic") == ("generic", generic)
+    # Other design inputs, or another top, never resume from these
+    assert find_checkpoint(str(tmp_path), "top", "digest-b") == (None, None)
+    assert find_checkpoint(str(tmp_path), "alu", "digest-a") == (None, None)
+
+    # A rerun that only rewrote the generic db keeps the old map entry's digest
+    before = checkpoint_mtimes(str(tmp_path), "top")
+    write_db(tmp_path, "top", "generic", 2000)
+    record_checkpoints(str(tmp_path), "top", "digest-b", before)
+    assert find_checkpoint(str(tmp_path), "top", "digest-b") == ("generic", generic)
+
+    os.remove(generic)
+    assert find_checkpoint(str(tmp_path), "top", "digest-b") == (None, None)
+
+
+def test_checkpoints_need_a_script_that_resumes(tmp_path):
+    stage = types.SimpleNamespace(name="synthesis", script=os.path.join(CADENCE_SYNTHESIS, "START.tcl"), checkpoints=True)
+    # START.tcl with the default order reaches synthesis.tcl and its read_db/write_db hooks
+    assert _check_scripts(stage, {"order": "setup-session.tcl,synthesis.tcl"}) == []
+
+    problems = _check_scripts(stage, {"order": "setup-session.tcl"})
+    assert problems == [("warning", "synthesis: 'checkpoints' is set but none of its scripts read RESUME_FROM")]
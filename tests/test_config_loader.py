@@ -0,0 +1,44 @@
+import os
+import json
+import pytest
+from utils import config_loader
+from utils.config_loader import ConfigError, clear_config_cache, get_project_config
+
+
+@pytest.fixture
+def config_root(tmp_path, monkeypatch):
+    clear_config_cache()
+    monkeypatch.setattr(config_loader, "STAT_INTERVAL", 0)
+    yield tmp_path
+    clear_config_cache()
+
+
+def write_config(root, data, mtime):
+    path = root / "config.json"
+    path.write_text(json.dumps(data))
+    os.utime(path, (mtime, mtime))
+
+
+def test_config_is_reparsed_only_when_the_file_changes(config_root):
+    write_config(config_root, {"eda_tool": "Cadence", "tool_config": [{"tool": "genus, innovus"}]}, 1000)
+    config = get_project_config(str(config_root))
+    assert config.eda_tool == "cadence" and config.has_tool("innovus")
+    assert get_project_config(str(config_root)) is config
+
+    write_config(config_root, {"eda_tool": "openlane", "tool_config": [{"tool": "yosys"}]}, 2000)
+    config = get_project_config(str(config_root))
+    assert config.eda_tool == "openlane" and config.configured_tools() == ["yosys"]
+
+
+def test_stat_interval_reuses_the_parse_without_looking(config_root, monkeypatch):
+    write_config(config_root, {"eda_tool": "cadence"}, 1000)
+    monkeypatch.setattr(config_loader, "STAT_INTERVAL", 60)
+    config = get_project_config(str(config_root))
+    write_config(config_root, {"eda_tool": "openlane"}, 2000)
+    assert get_project_config(str(config_root)) is config
+
+
+def test_invalid_config_is_reported(config_root):
+    write_config(config_root, {"tool_config": [{"launch_sh_path": "x.sh"}]}, 1000)
+    with pytest.raises(ConfigError, match="needs a 'tool' name"):
+        get_project_config(str(config_root))
@@ -0,0 +1,52 @@
+import os
+from utils import env_manifest
+from utils.env_manifest import MAX_MANIFESTS, apply_env_scripts, load_manifest
+
+
+def launch_script(tmp_path, body):
+    path = tmp_path / "launch.sh"
+    path.write_text(body)
+    return str(path)
+
+
+def manifests(log_env):
+    return sorted(os.listdir(os.path.join(log_env["LOGICLANCE_CACHE_DIR"], "env")))
+
+
+def test_manifest_is_sourced_once_and_keyed_on_what_the_script_reads(tmp_path, log_env, monkeypatch):
+    script = launch_script(tmp_path, 'export GENUS_HOME="$TOOLS_ROOT/genus"\nexport PATH="$GENUS_HOME/bin:$PATH"\nunset STALE\n')
+    env = {"PATH": "/usr/bin:/bin", "TOOLS_ROOT": "/eda", "STALE": "1", "DISPLAY": ":0"}
+
+    sourced = []
+    source = env_manifest._source
+    monkeypatch.setattr(env_manifest, "_source", lambda *args: sourced.append(args[0]) or source(*args))
+
+    manifest = load_manifest(script, env)
+    assert manifest["set"]["GENUS_HOME"] == "/eda/genus"
+    assert manifest["set"]["PATH"] == "/eda/genus/bin:/usr/bin:/bin"
+    assert manifest["unset"] == ["STALE"]
+
+    # A per-login variable the script never reads does not invalidate the manifest
+    assert load_manifest(script, dict(env, DISPLAY=":1", FILELIST="/x/rtl.f")) == manifest
+    assert len(sourced) == 1
+
+    # One it reads does
+    assert load_manifest(script, dict(env, TOOLS_ROOT="/opt/eda"))["set"]["GENUS_HOME"] == "/opt/eda/genus"
+    assert len(sourced) == 2
+
+    applied = dict(env)
+    assert apply_env_scripts([script, str(tmp_path / "missing.sh")], applied) == [str(tmp_path / "missing.sh")]
+    assert applied["GENUS_HOME"] == "/eda/genus" and "STALE" not in applied
+
+
+def test_old_manifests_of_a_script_are_evicted(tmp_path, log_env):
+    script = launch_script(tmp_path, "export TOOL_DIR=$TOOLS_ROOT\n")
+    for i in range(MAX_MANIFESTS + 3):
+        load_manifest(script, {"PATH": "/bin", "TOOLS_ROOT": f"/eda/{i}"})
+    assert len(manifests(log_env)) == MAX_MANIFESTS
+
+    # Manifests of other scripts are left alone
+    other = tmp_path / "other.sh"
+    other.write_text("export OTHER=1\n")
+    load_manifest(str(other), {"PATH": "/bin"})
+    assert len(manifests(log_env)) == MAX_MANIFESTS + 1
@@ -0,0 +1,87 @@
+import os
+import shutil
+import pytest
+from utils.executors import BatchExecutor, LsfExecutor, SlurmExecutor
+from .conftest import STUBS
+
+FAKE_SCHEDULER = os.path.join(STUBS, "fake_scheduler.py")
+COMMANDS = {
+    LsfExecutor: ("bsub", "bjobs", "bkill"),
+    SlurmExecutor: ("sbatch", "sacct", "scancel"),
+}
+# What each backend's status query shows while the job waits, runs and ends
+STATES = ["pending", "running", "done"]
+
+
+@pytest.fixture(params=[LsfExecutor, SlurmExecutor], ids=["lsf", "slurm"])
+def scheduler(request, log_env, tmp_path, monkeypatch):
+    """(executor, state dir) with the scheduler CLI replaced by the stand-in script."""
+    state_dir = tmp_path / "scheduler"
+    bin_dir = tmp_path / "bin"
+    state_dir.mkdir()
+    bin_dir.mkdir()
+    settings = {"poll_interval": 0.05, "missing_polls": 3}
+    for command in COMMANDS[request.param]:
+        os.symlink(FAKE_SCHEDULER, bin_dir / command)
+        settings[command] = str(bin_dir / command)
+    monkeypatch.setenv("FAKE_SCHEDULER_DIR", str(state_dir))
+    monkeypatch.setenv("FAKE_PEND", "0.3")
+    return request.param(settings), state_dir
+
+
+def run(executor, tmp_path, cmd):
+    lines = []
+    code = executor.run("synthesis", cmd, str(tmp_path / "logs" / "synthesis.log"), dict(os.environ),
+                        on_line=lambda _, line: lines.append(line))
+    return code, lines
+
+
+def observed_states(state_dir):
+    states = []
+    for line in (state_dir / "queries").read_text().splitlines():
+        state = line.split()[1]
+        if not states or states[-1] != state:
+            states.append(state)
+    return states
+
+
+def test_job_is_followed_from_pending_to_done(scheduler, tmp_path):
+    executor, state_dir = scheduler
+    code, lines = run(executor, tmp_path, "echo first; sleep 0.3; echo second")
+    assert code == 0
+    assert lines == ["first", "second"]
+    assert observed_states(state_dir) == STATES
+
+
+def test_non_zero_exit_is_reported(scheduler, tmp_path):
+    executor, state_dir = scheduler
+    code, lines = run(executor, tmp_path, "echo 'Error: no license'; exit 3")
+    assert code == 3
+    assert lines == ["Error: no license"]
+    assert observed_states(state_dir)[-1] == "done"
+
+
+def test_vanished_job_is_given_up(scheduler, tmp_path, monkeypatch):
+    executor, state_dir = scheduler
+    monkeypatch.setenv("FAKE_FORGET", "1")
+    code, _ = run(executor, tmp_path, "echo never")
+    assert code == 1
+    assert observed_states(state_dir) == ["unknown"]
+    assert len((state_dir / "queries").read_text().splitlines()) == executor.missing_polls
+
+
+def test_rejected_submission(scheduler, tmp_path, capsys):
+    executor, state_dir = scheduler
+    executor.settings[COMMANDS[type(executor)][0]] = shutil.which("false")
+    assert run(executor, tmp_path, "echo never") == (1, [])
+    assert "submission of synthesis failed" in capsys.readouterr().out
+    assert not (state_dir / "queries").exists()
+
+
+def test_batch_backends_must_implement_the_scheduler_calls():
+    class Partial(BatchExecutor):
+        def submit_args(self, job_name, script_path, log_path):
+            return ["true"]
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,54 @@
+import os
+import types
+from cli.commands import prepare_filelist
+from utils.filelist import build_filelist
+from utils.preflight import _check_scripts
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_testbenches_and_include_dirs_are_not_sources(tmp_path, log_env):
+    rtl = tmp_path / "rtl"
+    pkg = write(rtl / "pkg.sv", "package pkg; endpackage\n")
+    top = write(rtl / "top.sv", '`include "defs.svh"\nmodule top; import pkg::*; endmodule\n')
+    write(rtl / "tb" / "top_tb.sv", "module top_tb; top dut(); endmodule\n")
+    write(rtl / "sim" / "models.v", "module model; endmodule\n")
+    shared = tmp_path / "shared"
+    header = write(shared / "defs.svh", "`define WIDTH 8\n")
+    ip = write(shared / "vendor_ip.v", "module vendor_ip; endmodule\n")
+
+    result = build_filelist(str(rtl), [str(shared)])
+    assert result["sources"] == [pkg, top]
+    assert header in result["headers"] and ip in result["headers"]
+    assert str(shared) in result["incdirs"]
+
+    result = build_filelist(str(rtl), [str(shared)], exclude_dirs=["sim"])
+    assert str(rtl / "tb" / "top_tb.sv") in result["sources"]
+    assert str(rtl / "sim" / "models.v") not in result["sources"]
+
+
+def test_filelist_is_exported_only_for_flows_that_read_it(tmp_path, log_env, monkeypatch):
+    top = write(tmp_path / "rtl" / "top.v", "module top; endmodule\n")
+    monkeypatch.setenv("RTL_PATH", str(tmp_path / "rtl"))
+    monkeypatch.delenv("FILELIST", raising=False)
+
+    assert prepare_filelist({"lec": types.SimpleNamespace(filelist=False)}) is None
+    assert "FILELIST" not in os.environ
+
+    result = prepare_filelist({"synthesis": types.SimpleNamespace(filelist=True)})
+    assert result["sources"] == [top]
+    with open(os.environ["FILELIST"]) as f:
+        assert top in f.read().split("\n")
+
+
+def test_preflight_warns_when_no_script_reads_the_filelist(tmp_path):
+    script = write(tmp_path / "synth.tcl", "read_hdl $RTL_PATH/top.v\n")
+    stage = types.SimpleNamespace(name="synthesis", script=script, filelist=True)
+    assert _check_scripts(stage, {}) == [("warning", "synthesis: 'filelist' is set but none of its scripts read FILELIST")]
+
+    write(tmp_path / "synth.tcl", "if {[info exists ::env(FILELIST)]} { source $::env(FILELIST) }\n")
+    assert _check_scripts(stage, {}) == []
@@ -0,0 +1,53 @@
+import os
+from cli.flow_runner import Stage, run_stage
+from utils import fingerprint
+from .conftest import STUBS
+
+
+def make_stage(tmp_path, events, force=False):
+    stage = Stage("synthesis", "synthesis", "stub", "sh", "", os.path.join(STUBS, "stage.sh"), [],
+                  env={"STAGE_NAME": "synthesis", "STAGE_EVENTS": str(events), "RTL_PATH": str(tmp_path / "rtl")})
+    stage.force = force
+    return stage
+
+
+def runs(events):
+    return events.read_text().count("start ")
+
+
+def test_unchanged_inputs_skip_the_stage_and_edits_rerun_it(tmp_path, log_env):
+    events = tmp_path / "events"
+    events.touch()
+    (tmp_path / "rtl").mkdir()
+    top = tmp_path / "rtl" / "top.v"
+    top.write_text("module top; endmodule\n")
+
+    assert run_stage(make_stage(tmp_path, events)) == 0
+    stage = make_stage(tmp_path, events)
+    assert run_stage(stage) == 0
+    assert stage.up_to_date and runs(events) == 1
+
+    top.write_text("module top(input a); endmodule\n")
+    stage = make_stage(tmp_path, events)
+    assert run_stage(stage) == 0
+    assert not stage.up_to_date and runs(events) == 2
+
+    # --force reruns even though nothing changed
+    assert run_stage(make_stage(tmp_path, events, force=True)) == 0
+    assert runs(events) == 3
+
+
+def test_hash_tree_only_rereads_changed_files(tmp_path, monkeypatch):
+    for name in ("a.v", "b.v"):
+        (tmp_path / name).write_text(name)
+    digest, files = fingerprint.hash_tree(str(tmp_path))
+
+    read = []
+    hash_file = fingerprint._hash_file
+    monkeypatch.setattr(fingerprint, "_hash_file", lambda path: read.append(path) or hash_file(path))
+    assert fingerprint.hash_tree(str(tmp_path), files)[0] == digest
+    assert read == []
+
+    (tmp_path / "b.v").write_text("changed")
+    assert fingerprint.hash_tree(str(tmp_path), files)[0] != digest
+    assert read == [str(tmp_path / "b.v")]
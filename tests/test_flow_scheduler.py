@@ -0,0 +1,97 @@
+import os
+import pytest
+from cli import flow_runner
+from cli.flow_runner import FlowScheduler, Stage
+from utils.licenses import LicensePool
+from .conftest import STUBS
+
+STAGE_SCRIPT = os.path.join(STUBS, "stage.sh")
+
+
+@pytest.fixture
+def events(log_env, tmp_path, monkeypatch):
+    path = tmp_path / "events"
+    path.touch()
+    monkeypatch.setenv("STAGE_EVENTS", str(path))
+    monkeypatch.setattr(flow_runner, "LICENSE_POLL", 0.05)
+    return path
+
+
+def graph(*specs):
+    """Stages from (name, deps, env overrides) tuples, each running the stub script."""
+    stages = {}
+    for name, deps, env in specs:
+        stages[name] = Stage(name, name, "stub", "sh", "", STAGE_SCRIPT, deps,
+                             env=dict(env, STAGE_NAME=name))
+    return stages
+
+
+def spans(events):
+    """{stage: (start, end)} from the event file."""
+    times = {}
+    for line in events.read_text().splitlines():
+        kind, name, stamp = line.split()
+        times.setdefault(name, {})[kind] = float(stamp)
+    return {name: (t["start"], t["end"]) for name, t in times.items()}
+
+
+def overlap(a, b):
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def test_stages_run_after_their_dependencies(events):
+    stages = graph(
+        ("synthesis", [], {}),
+        ("lec", ["synthesis"], {}),
+        ("sta", ["synthesis"], {}),
+        ("signoff", ["lec", "sta"], {}),
+    )
+    statuses = FlowScheduler(stages, max_workers=4).run()
+    assert set(statuses.values()) == {"passed"}
+    times = spans(events)
+    assert times["synthesis"][1] <= times["lec"][0]
+    assert times["synthesis"][1] <= times["sta"][0]
+    assert max(times["lec"][1], times["sta"][1]) <= times["signoff"][0]
+
+
+@pytest.mark.parametrize("max_workers,parallel", [(3, True), (1, False)])
+def test_independent_stages_run_in_parallel_up_to_max_workers(events, max_workers, parallel):
+    stages = graph(*[(name, [], {"STAGE_SLEEP": "0.5"}) for name in ("a", "b", "c")])
+    FlowScheduler(stages, max_workers=max_workers).run()
+    times = list(spans(events).values())
+    overlapping = [overlap(x, y) for i, x in enumerate(times) for y in times[i + 1:]]
+    assert all(overlapping) if parallel else not any(overlapping)
+
+
+def test_failure_skips_downstream_but_not_unrelated_branches(events):
+    stages = graph(
+        ("synthesis", [], {"STAGE_EXIT": "3"}),
+        ("lec", ["synthesis"], {}),
+        ("signoff", ["lec"], {}),
+        ("lint", [], {}),
+    )
+    statuses = FlowScheduler(stages, max_workers=2).run()
+    assert statuses == {"synthesis": "failed", "lec": "skipped", "signoff": "skipped", "lint": "passed"}
+    assert stages["synthesis"].returncode == 3
+    assert set(spans(events)) == {"synthesis", "lint"}
+
+
+def test_unchanged_stage_is_up_to_date_on_rerun(events):
+    FlowScheduler(graph(("synthesis", [], {})), max_workers=1).run()
+    stages = graph(("synthesis", [], {}))
+    assert FlowScheduler(stages, max_workers=1).run() == {"synthesis": "passed"}
+    assert stages["synthesis"].up_to_date
+    assert len(spans(events)) == 1
+
+
+def test_stages_wait_for_a_free_license(events, tmp_path):
+    licenses = LicensePool({"Stub_License": {"count": 1, "tools": ["sh"]}}, lock_dir=str(tmp_path / "licenses"))
+    stages = graph(*[(name, [], {"STAGE_SLEEP": "0.3"}) for name in ("a", "b")])
+    statuses = FlowScheduler(stages, max_workers=2, licenses=licenses).run()
+    assert statuses == {"a": "passed", "b": "passed"}
+    times = spans(events)
+    assert not overlap(times["a"], times["b"])
+    queued = max(stages.values(), key=lambda stage: times[stage.name][0])
+    assert queued.queue_seconds >= 0.2
+    # Both slots were given back
+    assert licenses.try_acquire("sh") is not None
@@ -0,0 +1,86 @@
+import io
+import sys
+import asyncio
+from cli.jobs import JobManager, install_output
+from cli.shell import is_job_command, job_command
+from utils.process_runner import current_cancel
+
+
+def run_jobs(log_env, scenario):
+    """Run scenario(manager) on an event loop with job output routed as in the shell."""
+    console = io.StringIO()
+    notices = []
+
+    def dispatch(command, foreground):
+        if command == "fail":
+            raise RuntimeError("boom")
+        if command == "block":
+            current_cancel.get().wait(10)
+            return False
+        for i in range(1, 31):
+            print(f"{command} line {i}")
+        return True
+
+    async def main():
+        manager = JobManager(dispatch, console, notices.append)
+        try:
+            return await scenario(manager)
+        finally:
+            manager.shutdown()
+
+    previous = install_output(console)
+    try:
+        return asyncio.run(main()), console.getvalue(), notices
+    finally:
+        sys.stdout, sys.stderr = previous
+
+
+def test_background_job_output_goes_to_its_log(log_env):
+    async def scenario(manager):
+        job = manager.start("build")
+        await manager.wait([job])
+        assert job.status == "done"
+        assert job.last_line == "build line 30"
+        assert len(manager.tail(job, 5)) == 5
+        failed = manager.start("fail")
+        await manager.wait([failed])
+        assert failed.status == "failed"
+        return True
+
+    done, console, notices = run_jobs(log_env, scenario)
+    assert done
+    assert "build line" not in console
+    assert notices[0].startswith("[1] started  build")
+
+
+def test_tail_validates_its_line_count(log_env):
+    results = []
+
+    async def scenario(manager):
+        job = manager.start("build")
+        await manager.wait([job])
+        for args in (["%1", "-n", "3"], ["%1", "-n"], ["%1", "-n", "abc"], ["%9"]):
+            results.append(await job_command(manager, "tail", args))
+
+    _, console, _ = run_jobs(log_env, scenario)
+    assert results == [True, False, False, False]
+    assert console.count("build line") == 3
+    assert console.count("❌ Usage: tail %N [-n N] [-f]") == 2
+    assert "❌ No such job: %9" in console
+
+
+def test_kill_cancels_the_job(log_env):
+    async def scenario(manager):
+        job = manager.start("block")
+        assert await job_command(manager, "kill", ["%1"])
+        await manager.wait([job])
+        return job.status
+
+    assert run_jobs(log_env, scenario)[0] == "killed"
+
+
+def test_job_command_detection():
+    assert is_job_command("jobs", [])
+    assert is_job_command("tail", ["%2", "-f"])
+    assert not is_job_command("tail", ["run.log"])
+    assert not is_job_command("kill", ["1234"])
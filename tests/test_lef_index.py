@@ -0,0 +1,80 @@
+from utils import lef_index
+
+LEF = """VERSION 5.8 ;
+LAYER Metal1
+  TYPE ROUTING ;
+  DIRECTION HORIZONTAL ;
+  PITCH 0.2 ;
+END Metal1
+SITE CoreSite
+  CLASS CORE ;
+  SIZE 0.2 BY 1.71 ;
+END CoreSite
+MACRO INVX1
+  CLASS CORE ;
+  SIZE 0.6 BY 1.71 ;
+  SITE CoreSite ;
+  PIN A
+    DIRECTION INPUT ;
+    PORT
+      LAYER Metal1 ;
+    END
+  END A
+  PIN Y
+    DIRECTION OUTPUT ;
+  END Y
+  PIN VDD
+    DIRECTION INOUT ;
+    USE POWER ;
+  END VDD
+MACRO BROKEN
+  CLASS CORE ;
+  PIN A
+    DIRECTION INPUT ;
+  END A
+MACRO NAND2X1
+  CLASS CORE ;
+  SITE OtherSite ;
+  PIN A
+    DIRECTION INPUT ;
+  END A
+END NAND2X1
+END LIBRARY
+"""
+
+
+def lib(**cells):
+    return [{"cells": {name: dict({"dont_use": False}, **cell) for name, cell in cells.items()}}]
+
+
+def test_index_bounds_unterminated_macros(log_env, tmp_path):
+    path = tmp_path / "cells.lef"
+    path.write_text(LEF)
+    index = lef_index.load_index(str(path))
+    assert index["layers"]["Metal1"] == {"type": "ROUTING", "direction": "HORIZONTAL", "pitch": 0.2}
+    assert index["sites"]["CoreSite"]["size"] == [0.2, 1.71]
+    inv = index["macros"]["INVX1"]
+    assert (inv["class"], inv["size"], inv["site"]) == ("CORE", [0.6, 1.71], "CoreSite")
+    assert inv["pins"]["VDD"] == {"direction": "inout", "use": "POWER"}
+    # Neither missing END swallows the next macro
+    assert set(index["macros"]["BROKEN"]["pins"]) == {"A"}
+    assert LEF[inv["offset"]:inv["offset"] + inv["length"]].rstrip().endswith("END VDD")
+    assert lef_index.load_index(str(path)) == index
+
+
+def test_compare_with_libs(log_env, tmp_path):
+    path = tmp_path / "cells.lef"
+    path.write_text(LEF)
+    lefs = [lef_index.load_index(str(path))]
+    problems = lef_index.compare_with_libs(lefs, lib(
+        INVX1={"pins": {"A": "input", "Y": "output", "EN": "input"}},
+        NAND2X1={"pins": {"A": "input"}},
+        SCAN_ONLY={"pins": {}},
+        FILLER={"pins": {}, "dont_use": True},
+    ))
+    assert ("error", "INVX1: LEF macro lacks pin(s) EN") in problems
+    assert ("error", "NAND2X1: site OtherSite is not defined in any LEF") in problems
+    # Cells without a macro do not block a run; dont_use cells are not reported at all
+    assert ("warning", "SCAN_ONLY: in the libraries but no LEF macro") in problems
+    assert not [p for p in problems if "FILLER" in p[1]]
+    assert ("warning", "BROKEN: LEF macro (CORE) has no library cell") in problems
@@ -0,0 +1,74 @@
+from utils import liberty_index
+from utils.techkit import load_techkit
+
+LIB = """library (demo_ss0p72v125c) {
+  time_unit : "1ns" ;
+  nom_voltage : 0.72 ;
+  nom_temperature : 125 ;
+  cell (INVX1) {
+    area : 1.2 ;
+    pg_pin (VDD) { pg_type : primary_power ; }
+    pin (A) { direction : input ; capacitance : 0.002 ; }
+    pin (Y) {
+      direction : output ;
+      function : "!A" ;
+      timing () { related_pin : "A" ; cell_rise (tmpl) { values ("0.1, 0.2") ; } }
+    }
+  }
+  cell (TIEHI) {
+    area : 0.8 ;
+    pin (Y) { direction : output ; function : "1" ; }
+  }
+  cell (FILL1) {
+    dont_use : true ;
+    area : 0.4 ;
+  }
+}
+"""
+
+TECHKIT = """set TECHKIT_TIE_HI_CELL TIEHI
+set TECHKIT_TIE_HI_PORT Z
+set TECHKIT_BUF_CELL_LIST {BUFX* INVX1}
+set TECHKIT_FILLER_CELLS "FILL*" ;# fillers
+set TECHKIT_DONT_USE_CELL_LIST \\
+    "SDFF* FILL1"
+"""
+
+
+def test_cells_pins_and_corner_are_indexed(log_env, tmp_path):
+    path = tmp_path / "demo_ss.lib"
+    path.write_text(LIB)
+    index = liberty_index.load_index(str(path))
+
+    assert index["library"] == "demo_ss0p72v125c"
+    assert index["corner"] == "slow"
+    assert index["header"]["nom_voltage"] == "0.72"
+    inv = index["cells"]["INVX1"]
+    assert (inv["area"], inv["dont_use"]) == (1.2, False)
+    # related_pin and cell_rise inside the timing group are not pins
+    assert inv["pins"] == {"VDD": "primary_power", "A": "input", "Y": "output"}
+    assert index["cells"]["FILL1"]["dont_use"]
+    assert liberty_index.cell_text(index, "TIEHI").endswith('function : "1" ; }\n  }')
+    assert liberty_index.load_index(str(path)) == index
+
+
+def test_techkit_is_checked_against_the_libraries(log_env, tmp_path):
+    (tmp_path / "demo.lib").write_text(LIB)
+    (tmp_path / "techkit.tcl").write_text(TECHKIT)
+    techkit = load_techkit(str(tmp_path / "techkit.tcl"))
+    assert techkit["TECHKIT_DONT_USE_CELL_LIST"] == "SDFF* FILL1"
+
+    problems = liberty_index.validate_techkit(liberty_index.index_libraries(str(tmp_path)), techkit)
+    assert sorted(problems) == [
+        ("error", "TECHKIT_BUF_CELL_LIST: 'BUFX*' matches no library cell"),
+        ("error", "TECHKIT_TIE_HI_PORT: TIEHI has no pin 'Z'"),
+        ("warning", "TECHKIT_DONT_USE_CELL_LIST: 'SDFF*' matches no library cell"),
+        ("warning", "TECHKIT_FILLER_CELLS: 'FILL*' is dont_use in the libraries"),
+    ]
+
+
+def test_corner_libs_fall_back_to_nominal_voltage(log_env, tmp_path):
+    for name, voltage in (("lib_a", "0.72"), ("lib_b", "0.88"), ("lib_c", "0.80")):
+        (tmp_path / f"{name}.lib").write_text(f"library ({name}) {{\n  nom_voltage : {voltage} ;\n}}\n")
+    picked = liberty_index.select_corner_libs(liberty_index.index_libraries(str(tmp_path)))
+    assert picked == {"slow": str(tmp_path / "lib_a.lib"), "fast": str(tmp_path / "lib_b.lib")}
@@ -0,0 +1,63 @@
+import sys
+import subprocess
+from utils.licenses import LicensePool
+from utils.process_runner import CancelToken, current_cancel
+
+FEATURES = {
+    "Genus_Synthesis": {"count": 2, "tools": ["genus"]},
+    "Innovus_Impl_System": {"count": 1, "tools": ["innovus", "genus_physical"]},
+    "Genus_Physical": {"count": 1, "tools": ["genus_physical"]},
+}
+
+
+def test_slots_are_limited_per_feature_and_reusable(tmp_path):
+    pool = LicensePool(FEATURES, lock_dir=str(tmp_path))
+    first, second = pool.try_acquire("genus"), pool.try_acquire("genus")
+    assert first and second
+    assert pool.try_acquire("genus") is None
+    # Tools without a declared feature never wait
+    assert pool.try_acquire("yosys") == []
+
+    pool.release(first)
+    assert pool.try_acquire("genus") is not None
+
+
+def test_a_tool_gets_all_its_features_or_none(tmp_path):
+    pool = LicensePool(FEATURES, lock_dir=str(tmp_path))
+    innovus = pool.try_acquire("innovus")
+    assert pool.try_acquire("genus_physical") is None
+    # The Genus_Physical slot taken on the way was handed back
+    pool.release(innovus)
+    assert pool.try_acquire("genus_physical") is not None
+
+
+def test_a_dead_holder_never_leaks_its_slot(tmp_path):
+    (tmp_path / "Innovus_Impl_System").mkdir()
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys, fcntl; f = open(sys.argv[1], 'a'); fcntl.flock(f, fcntl.LOCK_EX); print('held', flush=True); input()",
+         str(tmp_path / "Innovus_Impl_System" / "slot.0.lock")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        pool = LicensePool(FEATURES, lock_dir=str(tmp_path))
+        assert holder.stdout.readline() == "held\n"
+        assert pool.try_acquire("innovus") is None
+    finally:
+        holder.kill()
+        holder.wait()
+    assert pool.try_acquire("innovus") is not None
+
+
+def test_waiting_for_a_license_stops_when_the_job_is_cancelled(tmp_path):
+    pool = LicensePool(FEATURES, lock_dir=str(tmp_path))
+    held = pool.try_acquire("innovus")
+    token = CancelToken()
+    token.cancel()
+    reset = current_cancel.set(token)
+    try:
+        lease, waited = pool.acquire("innovus", poll=0.01)
+    finally:
+        current_cancel.reset(reset)
+    assert lease == [] and waited < 1
+    pool.release(held)
@@ -0,0 +1,17 @@
+import os
+from utils.log_parser import parse_log_file
+
+
+def test_parse_state_is_kept_in_the_cache(log_env, tmp_path):
+    logs = tmp_path / "shared"
+    logs.mkdir()
+    log = logs / "yosys.log"
+    log.write_text("Yosys 0.15\n   Number of cells:  12\n   Chip area for module '\\top': 40.5\nTotal ar")
+    assert parse_log_file(str(log))["qor"] == {"cells": 12, "area": 40.5}
+    assert os.listdir(logs) == ["yosys.log"]
+    assert len(os.listdir(os.path.join(log_env["LOGICLANCE_CACHE_DIR"], "logs"))) == 1
+
+    # Only the new part (and the unfinished line) is read on the next call
+    with open(log, "a") as f:
+        f.write("ea: 55.0\n")
+    assert parse_log_file(str(log))["qor"] == {"cells": 12, "area": 55.0}
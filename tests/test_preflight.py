@@ -0,0 +1,53 @@
+from cli.flow_runner import Stage
+from utils.preflight import run_preflight
+
+SCRIPT = """read_libs -max_libs $LIB_PATH/slow.lib -min_libs ${LIB_PATH}/fast.lib
+read_sdc ${SDC_PATH}/${DESIGN}_Constraints.sdc
+"""
+
+
+def project(tmp_path):
+    for name in ("rtl", "lib", "sdc"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "lib" / "slow.lib").write_text("library (slow) {}\n")
+    (tmp_path / "lib" / "fast.lib").write_text("")
+    (tmp_path / "synth.tcl").write_text(SCRIPT)
+    return {
+        "RTL_PATH": str(tmp_path / "rtl"),
+        "LIB_PATH": str(tmp_path / "lib"),
+        "SDC_PATH": str(tmp_path / "sdc"),
+        "DESIGN": "alu",
+    }
+
+
+def stage(tmp_path, env, binary="sh"):
+    return Stage("synthesis", "synthesis", "stub", binary, "", str(tmp_path / "synth.tcl"), [], env=env)
+
+
+def test_preflight_reports_what_the_scripts_would_miss(tmp_path, log_env):
+    env = project(tmp_path)
+    problems, seconds = run_preflight([stage(tmp_path, env, binary="no_such_tool_xyz")])
+    assert sorted(problems) == sorted([
+        ("error", f"synthesis: constraints {tmp_path}/sdc/alu_Constraints.sdc not found"),
+        ("error", "no_such_tool_xyz not found on PATH"),
+        ("warning", f"synthesis: {tmp_path}/lib/fast.lib is empty"),
+    ])
+    assert seconds < 10
+
+
+def test_preflight_follows_corner_and_sdc_overrides(tmp_path, log_env):
+    env = dict(project(tmp_path), MAX_LIB="ss.lib", MIN_LIB="ff.lib", SDC_FILE="func.sdc")
+    (tmp_path / "lib" / "ff.lib").write_text("library (ff) {}\n")
+    (tmp_path / "sdc" / "func.sdc").write_text("create_clock -period 1 clk\n")
+    problems, _ = run_preflight([stage(tmp_path, env)])
+    assert problems == [("error", f"synthesis: {tmp_path}/lib/ss.lib not found")]
+
+
+def test_batch_jobs_only_warn_about_missing_binaries(tmp_path, log_env, monkeypatch):
+    monkeypatch.delenv("RTL_PATH", raising=False)
+    env = project(tmp_path)
+    (tmp_path / "lib" / "fast.lib").write_text("library (fast) {}\n")
+    (tmp_path / "sdc" / "alu_Constraints.sdc").write_text("")
+    del env["RTL_PATH"]
+    problems, _ = run_preflight([stage(tmp_path, env, binary="no_such_tool_xyz")], local=False)
+    assert sorted(problems) == [("error", "RTL_PATH is not set"), ("warning", "no_such_tool_xyz not found on PATH")]
@@ -0,0 +1,38 @@
+from utils import process_runner
+from utils.process_runner import rotate_log, run_streaming
+
+
+def test_output_is_teed_to_the_log_line_by_line(tmp_path, capsys):
+    log_path = tmp_path / "synthesis" / "synthesis.log"
+    lines = []
+    cmd = "echo one; echo warn >&2; printf 'two\\nno newline'; exit 3"
+    code = run_streaming(cmd, str(log_path), on_line=lambda stream, line: lines.append((stream, line)), prefix="[s] ")
+
+    assert code == 3
+    assert ("stderr", "warn") in lines
+    assert [line for stream, line in lines if stream == "stdout"] == ["one", "two", "no newline"]
+    # Both streams land in the log as they arrive, so only each stream's own order is fixed
+    log = log_path.read_text()
+    assert "one\ntwo\nno newline" in log.replace("warn\n", "") and "warn\n" in log
+    out = capsys.readouterr()
+    assert "[s] one\n" in out.out and "[s] warn\n" in out.err
+
+
+def test_long_lines_are_passed_on_in_pieces(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_runner, "MAX_LINE", 10)
+    lines = []
+    # The unfinished line is handed on as soon as it outgrows MAX_LINE, not when it ends
+    run_streaming("printf '%0100d' 0; sleep 0.2; echo end", str(tmp_path / "x.log"), echo=False,
+                  on_line=lambda stream, line: lines.append(line))
+    assert lines == ["0" * 100, "end"]
+
+
+def test_rotate_log_keeps_the_last_backups(tmp_path):
+    log_path = tmp_path / "run.log"
+    for i in range(4):
+        log_path.write_text(f"run {i}")
+        rotate_log(str(log_path), backups=2)
+    assert not log_path.exists()
+    assert (tmp_path / "run.log.1").read_text() == "run 3"
+    assert (tmp_path / "run.log.2").read_text() == "run 2"
+    assert not (tmp_path / "run.log.3").exists()
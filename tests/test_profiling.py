@@ -0,0 +1,68 @@
+import os
+import time
+import pstats
+import threading
+from utils.profiling import StackSampler, profile_call, profiling_active
+
+
+def busy(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+def work():
+    worker = threading.Thread(target=busy, args=(0.2,), name="stage-worker")
+    worker.start()
+    busy(0.1)
+    worker.join()
+    # A nested profile_call just runs the function
+    return profile_call("inner", profiling_active)
+
+
+def test_profile_call_writes_pstats_and_folded_stacks(log_env, capsys):
+    assert profile_call("run synthesis", work) is True
+    assert not profiling_active()
+
+    profiles = os.path.join(log_env["LOG_PATH"], "profiles")
+    names = sorted(os.listdir(profiles))
+    assert [os.path.splitext(n)[1] for n in names] == [".folded", ".pstats"]
+    assert names[0].startswith("run_synthesis-")
+
+    stats = pstats.Stats(os.path.join(profiles, names[1]))
+    assert any(func == "busy" for _, _, func in stats.stats)
+    with open(os.path.join(profiles, names[0])) as f:
+        stacks = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+    # The thread started by the profiled command is sampled too
+    assert any(stack.startswith("stage-worker;") and "busy (test_profiling.py:" in stack for stack, _ in stacks)
+    assert all(count.isdigit() for _, count in stacks)
+    assert "⏱️ Profile of 'run synthesis'" in capsys.readouterr().out
+
+
+def test_samples_are_filed_under_the_innermost_known_activity():
+    sampler = StackSampler()
+    sampler.counts = {
+        "MainThread;run_stage (flow_runner.py:1);run_streaming (process_runner.py:1);_execute_child (subprocess.py:1)": 3,
+        "MainThread;run_stage (flow_runner.py:1);run_streaming (process_runner.py:1)": 2,
+        "MainThread;get_flow_setup (config_loader.py:1)": 1,
+        "MainThread;main (main.py:1)": 4,
+    }
+    assert sampler.categories() == {"subprocess startup": 3, "tool output": 2, "config parsing": 1, "other": 4}
+
+
+def test_enable_profiling_profiles_every_shell_command(log_env, monkeypatch):
+    from utils import profiling
+    from cli import logiclance_terminal
+    monkeypatch.setattr(profiling, "_enabled", False)
+    monkeypatch.delenv("LOGICLANCE_PROFILE", raising=False)
+    calls = []
+    monkeypatch.setattr(logiclance_terminal, "profile_call", lambda name, *a: calls.append(name) or True)
+    monkeypatch.setattr(logiclance_terminal, "_dispatch", lambda *a: True)
+    logiclance_terminal.dispatch_command("help", "demo")
+    assert calls == []
+    profiling.enable_profiling()
+    assert os.environ["LOGICLANCE_PROFILE"] == "1"
+    logiclance_terminal.dispatch_command("help", "demo")
+    assert calls == ["help"]
+    profiling.enable_profiling(False)
+    assert "LOGICLANCE_PROFILE" not in os.environ
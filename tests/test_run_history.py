@@ -0,0 +1,37 @@
+from utils import run_history
+
+
+def record(path, run_id, flow, script_hash, start, duration, exit_code=0, steps=None):
+    run_history.record_run(str(path), run_id, flow, "genus", script_hash, "sanjay", "host1",
+                           start, start + duration, exit_code, metrics={"steps": steps or {}})
+
+
+def test_regression_compares_the_latest_script_change(tmp_path):
+    path = tmp_path / "history.sqlite"
+    # A (slow) -> B (fast) -> A again (slow): the regression is B -> A
+    for i, (script, duration) in enumerate([("A", 200), ("A", 210), ("B", 100), ("B", 110), ("A", 205)]):
+        record(path, f"r{i}", "synthesis", script, 1000 + i * 1000, duration)
+    record(path, "r9", "synthesis", "C", 9000, 1, exit_code=1)
+
+    [(flow, before_hash, after_hash, before, after, ratio)] = run_history.regressions(str(path))
+    assert (flow, before_hash, after_hash, before, after) == ("synthesis", "B", "A", 100, 205)
+    assert ratio > 2
+
+
+def test_no_regression_without_a_slower_script_change(tmp_path):
+    path = tmp_path / "history.sqlite"
+    for i, (script, duration) in enumerate([("A", 100), ("B", 200), ("A", 100)]):
+        record(path, f"r{i}", "synthesis", script, 1000 + i * 1000, duration)
+    record(path, "lec", "lec", "L", 500, 50)
+    assert run_history.regressions(str(path)) == []
+
+
+def test_stats_only_count_passed_runs(tmp_path):
+    path = tmp_path / "history.sqlite"
+    for i, duration in enumerate([10, 20, 30, 40]):
+        record(path, f"r{i}", "synthesis", "A", i * 100, duration, steps={"syn_gen": {"wall_seconds": duration / 2}})
+    record(path, "failed", "synthesis", "A", 999, 500, exit_code=1)
+
+    assert run_history.runtime_stats(str(path)) == [("synthesis", "genus", 4, 20, 40, 40)]
+    assert run_history.slowest_steps(str(path)) == [("synthesis", "syn_gen", 4, 10, 20)]
+    assert [row[0] for row in run_history.recent_runs(str(path), limit=2)] == ["failed", "r3"]
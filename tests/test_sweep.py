@@ -0,0 +1,41 @@
+import json
+import pytest
+from cli.flow_runner import build_sweep_stages, sweep_points
+from utils.config_loader import clear_config_cache, get_flow_setup
+
+
+def test_sweep_points_are_the_cartesian_product():
+    points = sweep_points({
+        "SYN_EFF": ["low", "high"],
+        "corner": {"wc": {"MAX_LIB": "slow.lib"}, "bc 1v1": {"MAX_LIB": "fast.lib"}},
+    })
+    assert points == [
+        ("low-wc", {"SYN_EFF": "low", "MAX_LIB": "slow.lib"}),
+        ("low-bc_1v1", {"SYN_EFF": "low", "MAX_LIB": "fast.lib"}),
+        ("high-wc", {"SYN_EFF": "high", "MAX_LIB": "slow.lib"}),
+        ("high-bc_1v1", {"SYN_EFF": "high", "MAX_LIB": "fast.lib"}),
+    ]
+
+
+@pytest.fixture
+def flows(tmp_path):
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "flow_setup.json").write_text(json.dumps({"flows": {
+        "synthesis": {"tools": {"openlane": {"tool": "yosys", "script": "synth.tcl"}}},
+        "sta": {"tools": {"openlane": {"tool": "openSTA", "script": "sta.tcl"}}, "dependencies": ["synthesis"]},
+    }}))
+    clear_config_cache()
+    yield get_flow_setup(str(tmp_path)).flows
+    clear_config_cache()
+
+
+def test_every_point_and_top_is_an_independent_stage(tmp_path, flows, log_env):
+    stages = build_sweep_stages(flows, "sta", "openlane", str(tmp_path), {"SYN_EFF": ["low", "high"]}, tops=["alu", "cpu"])
+    assert sorted(stages) == ["sta.alu@high", "sta.alu@low", "sta.cpu@high", "sta.cpu@low"]
+
+    stage = stages["sta.cpu@low"]
+    # The swept flow's dependencies are not rerun per point
+    assert stage.deps == []
+    assert stage.design == "cpu"
+    assert stage.env["SYN_EFF"] == "low"
+    assert stage.env["OUTPUTS_PATH"] == str(tmp_path / "outputs" / "cpu" / "sweep" / "low")
@@ -0,0 +1,52 @@
+import os
+import shutil
+from utils import tool_discovery
+from utils.tool_discovery import discover_binaries, version_matches
+
+
+def install(directory, name, banner="echo yosys 0.15"):
+    directory.mkdir(exist_ok=True)
+    path = directory / name
+    path.write_text(f"#!/bin/sh\n{banner}\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_cache_is_keyed_on_path_and_its_directory_mtimes(tmp_path, log_env, monkeypatch):
+    bin_a, bin_b = tmp_path / "a", tmp_path / "b"
+    yosys = install(bin_a, "yosys")
+    bin_b.mkdir()
+    path = f"{bin_a}{os.pathsep}{bin_b}"
+
+    lookups = []
+    which = shutil.which
+    monkeypatch.setattr(tool_discovery.shutil, "which", lambda b, path=None: lookups.append(b) or which(b, path=path))
+
+    found = discover_binaries(["yosys", "verilator"], path=path)
+    assert found["yosys"]["path"] == yosys and found["verilator"]["path"] is None
+    assert sorted(lookups) == ["verilator", "yosys"]
+
+    # Warm cache: nothing is looked up again
+    lookups.clear()
+    assert discover_binaries(["yosys", "verilator"], path=path) == found
+    assert lookups == []
+
+    # Installing a binary changes its directory's mtime and so the key
+    verilator = install(bin_b, "verilator")
+    os.utime(bin_b, ns=(0, os.stat(bin_b).st_mtime_ns + 10**9))
+    assert discover_binaries(["verilator"], path=path)["verilator"]["path"] == verilator
+
+    # Another PATH is another key
+    lookups.clear()
+    assert discover_binaries(["yosys"], path=str(bin_b))["yosys"]["path"] is None
+    assert lookups == ["yosys"]
+
+
+def test_versions_are_detected_once_and_cached(tmp_path, log_env, monkeypatch):
+    install(tmp_path / "bin", "yosys", "echo 'Yosys 0.15 (git sha1 abc)'")
+    path = str(tmp_path / "bin")
+    assert discover_binaries(["yosys"], detect_versions=True, path=path)["yosys"]["version"] == "0.15"
+
+    monkeypatch.setattr(tool_discovery, "detect_version", lambda *args: "should not run")
+    assert discover_binaries(["yosys"], detect_versions=True, path=path)["yosys"]["version"] == "0.15"
+    assert version_matches("v0.15", "0.15") and not version_matches("231", "0.15")
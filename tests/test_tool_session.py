@@ -0,0 +1,90 @@
+import os
+import shutil
+import pytest
+from utils.tool_session import SessionError, ToolSession
+from .conftest import STUBS
+
+pytestmark = pytest.mark.skipif(shutil.which("tclsh") is None, reason="needs tclsh")
+
+FAKE_TOOL = os.path.join(STUBS, "fake_tool.tcl")
+
+
+@pytest.fixture
+def make_session(log_env):
+    sessions = []
+
+    def make(echo=False, max_jobs=20):
+        command = f"tclsh {FAKE_TOOL}" + (" -echo" if echo else "")
+        session = ToolSession("fake", max_jobs=max_jobs, command=command)
+        session.start(log_env)
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.stop()
+
+
+def run(session, tmp_path, body, design="top"):
+    """Run a Tcl script body in the session; returns (exit code, output lines)."""
+    script = tmp_path / "job.tcl"
+    script.write_text(body)
+    lines = []
+    env = dict(os.environ)
+    env.pop("DESIGN", None)
+    if design:
+        env["DESIGN"] = design
+    code = session.run_script(str(script), str(tmp_path / "job.log"), env, on_line=lambda _, line: lines.append(line))
+    return code, lines
+
+
+def test_exit_ends_the_job_not_the_session(make_session, tmp_path):
+    session = make_session()
+    pid = session.proc.pid
+    code, lines = run(session, tmp_path, 'puts "synthesizing $::env(DESIGN)"\nexit 3\nputs unreachable\n')
+    assert code == 3
+    assert "synthesizing top" in lines
+    assert "unreachable" not in lines
+    assert run(session, tmp_path, "puts again\n") == (0, ["again"])
+    assert session.proc.pid == pid
+
+
+def test_error_is_reported_with_exit_code_1(make_session, tmp_path):
+    code, lines = run(make_session(), tmp_path, "error boom\n")
+    assert code == 1
+    assert "Error: boom" in lines
+
+
+def test_echoed_commands_do_not_end_a_job_early(make_session, tmp_path):
+    session = make_session(echo=True)
+    assert session.ping()
+    code, lines = run(session, tmp_path, "after 200\nputs finished\nexit 4\n")
+    assert code == 4
+    assert "finished" in lines
+    # The next job starts clean: no sentinel of this one is left over
+    code, lines = run(session, tmp_path, "puts second\n")
+    assert code == 0
+    assert "second" in lines
+
+
+def test_session_is_recycled_after_max_jobs(make_session, tmp_path):
+    session = make_session(max_jobs=2)
+    pids = []
+    for _ in range(3):
+        assert run(session, tmp_path, "puts [pid]\n")[0] == 0
+        pids.append(session.proc.pid)
+    assert pids[0] == pids[1] != pids[2]
+
+
+def test_dead_session_is_restarted(make_session, tmp_path):
+    session = make_session()
+    pid = session.proc.pid
+    code, _ = run(session, tmp_path, "__ll_exit 5\n")
+    assert code == 5
+    assert run(session, tmp_path, "puts back\n") == (0, ["back"])
+    assert session.proc.pid != pid
+
+
+def test_jobs_without_design_are_refused(make_session, tmp_path):
+    with pytest.raises(SessionError):
+        run(make_session(), tmp_path, "gets stdin DESIGN\n", design=None)
@@ -0,0 +1,71 @@
+import os
+import json
+import pytest
+import threading
+import contextvars
+from utils import tracing
+from utils.tracing import record_span, span, trace_paths
+
+
+@pytest.fixture
+def traced(log_env, monkeypatch):
+    monkeypatch.setenv("LOGICLANCE_TRACE", "1")
+    monkeypatch.setattr(tracing, "_enabled", True)
+    monkeypatch.setenv("LOGICLANCE_TRACE_NAME", "test")
+    monkeypatch.setattr(tracing, "_trace_name", None)
+    monkeypatch.setattr(tracing, "_named", set())
+    return trace_paths()
+
+
+def read_spans(jsonl_path):
+    with open(jsonl_path) as f:
+        return {record["name"]: record for record in map(json.loads, f)}
+
+
+def test_spans_nest_across_threads_and_record_errors(traced):
+    jsonl_path, chrome_path = traced
+
+    def stage():
+        with span("stage", stage="synthesis") as s:
+            s.set(exit_code=0)
+
+    with span("flow.run", flows="synthesis"):
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(stage,), name="flow-worker")
+        worker.start()
+        worker.join()
+        record_span("license.queue", 100.0, 102.5, feature="Genus_Synthesis")
+        with pytest.raises(ValueError):
+            with span("config.load"):
+                raise ValueError("bad json")
+
+    spans = read_spans(jsonl_path)
+    run = spans["flow.run"]
+    assert run["parent"] is None
+    assert spans["stage"]["parent"] == run["id"] and spans["stage"]["thread"] == "flow-worker"
+    assert spans["stage"]["attrs"] == {"stage": "synthesis", "exit_code": 0}
+    assert spans["license.queue"]["duration"] == 2.5
+    assert spans["config.load"]["attrs"]["error"] == "ValueError('bad json')"
+
+    # The Chrome array stays open for other processes; closing it gives valid JSON
+    with open(chrome_path) as f:
+        events = json.loads(f.read().rstrip().rstrip(",") + "]")
+    assert [e["args"]["name"] for e in events if e["name"] == "thread_name"] == ["flow-worker", "MainThread"]
+    complete = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert complete["stage"]["cat"] == "stage" and complete["stage"]["args"]["parent"] == run["id"]
+    assert complete["license.queue"]["dur"] == 2500000
+
+
+def test_nothing_is_written_while_tracing_is_off(log_env):
+    with span("flow.run") as s:
+        s.set(ignored=True)
+    record_span("license.queue", 0, 1)
+    assert s is tracing.NO_SPAN
+    assert not os.path.exists(os.path.join(log_env["LOG_PATH"], "traces"))
+
+
+def test_trace_command_switches_tracing_and_the_environment(log_env):
+    from cli.commands import trace_command
+    assert trace_command("on") and tracing.tracing_enabled()
+    assert os.environ["LOGICLANCE_TRACE"] == "1"
+    assert trace_command("off") and not tracing.tracing_enabled()
+    assert "LOGICLANCE_TRACE" not in os.environ
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+from utils import user_index
+from utils.user_index import find_user, has_permission, password_hash
+
+HEADER = "name,email,password,linting,synthesis,lec,pnr,team\n"
+
+
+def write_csv(path, rows, mtime):
+    path.write_text(HEADER + "".join(rows))
+    os.utime(path, (mtime, mtime))
+
+
+def test_index_is_rebuilt_when_the_csv_changes(tmp_path, log_env):
+    csv_path = tmp_path / "employees.csv"
+    write_csv(csv_path, ["Sanjay,Sanjay@Example.com,abc123,no,yes,no,no,pd\n"], 1000)
+
+    user = find_user(str(csv_path), name="SANJAY")
+    assert user == {"name": "sanjay", "email": "sanjay@example.com", "permissions": 2, "team": "pd"}
+    assert has_permission(user, "synthesis") and not has_permission(user, "pnr")
+    assert find_user(str(csv_path), email="sanjay@example.com") == user
+    assert find_user(str(csv_path), name="priya") is None
+
+    write_csv(csv_path, ["sanjay,sanjay@example.com,abc123,no,yes,no,yes,pd\n",
+                         "priya,priya@example.com,def456,yes,no,no,no,\n"], 2000)
+    assert has_permission(find_user(str(csv_path), name="sanjay"), "pnr")
+    assert find_user(str(csv_path), name="priya")["team"] == ""
+
+
+def test_password_hash_stays_out_of_the_index(tmp_path, log_env):
+    csv_path = tmp_path / "employees.csv"
+    write_csv(csv_path, ["sanjay,sanjay@example.com,ABC123,no,yes,no,no,pd\n"], 1000)
+    assert "password" not in find_user(str(csv_path), name="sanjay")
+    assert password_hash(str(csv_path), "Sanjay") == "abc123"
+    assert password_hash(str(csv_path), "priya") == ""
+
+    conn = sqlite3.connect(user_index._index_path(str(csv_path)))
+    try:
+        dump = "\n".join(conn.iterdump())
+    finally:
+        conn.close()
+    assert "sanjay@example.com" in dump and "abc123" not in dump.lower()
+
+
+def test_password_hash_survives_a_csv_edited_under_the_index(tmp_path, log_env):
+    csv_path = tmp_path / "employees.csv"
+    write_csv(csv_path, ["sanjay,sanjay@example.com,abc123,no,yes,no,no,pd\n",
+                         "priya,priya@example.com,def456,yes,no,no,no,\n"], 1000)
+    assert password_hash(str(csv_path), "priya") == "def456"
+
+    # Same size and mtime, so the index is reused, but the rows moved
+    write_csv(csv_path, ["priya,priya@example.com,def456,yes,no,no,no,\n",
+                         "sanjay,sanjay@example.com,abc123,no,yes,no,no,pd\n"], 1000)
+    assert password_hash(str(csv_path), "priya") == "def456"
+    assert password_hash(str(csv_path), "sanjay") == "abc123"